@@ -0,0 +1,199 @@
+import time
+
+from krittika.config.krittika_config import KrittikaConfig
+from krittika.workload_manager import WorkloadManager
+from krittika.partition_manager import PartitionManager
+from krittika.static_utilities import StaticUtilities
+
+
+class AutoTuner:
+    '''
+        Searches the per layer (input parts, filter parts, unit, dataflow) of the LS mode.
+        Candidates are scored with a cheap cost model, the memory aware runtime of the
+        partition manager. A beam search over the layers keeps the best tables, and the top k
+        are refined with cycle accurate LS runs while the time budget lasts. LS runs the
+        layers one after another without the NoC, so the core placement is not searched.
+    '''
+    def __init__(self):
+        # Member objects
+        self.config_obj = KrittikaConfig()
+        self.workload_obj = WorkloadManager()
+
+        # Params
+        self.top_k = 3
+        self.beam_width = 8
+        self.time_budget = 60
+        self.dataflow_list = ['os', 'ws', 'is']
+        self.refine_fn = None       # refine_fn(partition_manager) -> cycles of a cycle accurate run
+
+        # State
+        self.layer_ids = []
+        self.layer_choices = {}     # layer id -> [[input parts, filter parts, unit, dataflow, cost], ...]
+        self.cost_model = PartitionManager()
+        self.candidates = []        # [cost, choice idx per layer]
+        self.refined_candidates = []
+        self.start_time = 0
+
+        self.best_table = []
+        self.best_cost = 0
+
+        # Flags
+        self.params_set = False
+        self.tuning_done = False
+
+    #
+    def set_params(self,
+                   config_obj=KrittikaConfig(),
+                   workload_obj=WorkloadManager(),
+                   top_k=3, beam_width=8, time_budget=60,
+                   refine_fn=None,
+                   runtime_estimator=None):
+        assert top_k > 0, 'top_k should be a positive integer'
+        assert beam_width >= top_k, 'Beam width should be at least top_k'
+        assert time_budget > 0, 'Time budget should be positive'
+        assert not config_obj.is_heterogeneous(), 'Auto tuning supports homogeneous cores only'
+
+        self.config_obj = config_obj
+        self.workload_obj = workload_obj
+        self.top_k = top_k
+        self.beam_width = beam_width
+        self.time_budget = time_budget
+        self.refine_fn = refine_fn
+        self.cost_model = PartitionManager()
+        self.cost_model.set_runtime_estimator(runtime_estimator)
+
+        self.params_set = True
+        self.tuning_done = False
+
+    #
+    def tune(self):
+        assert self.params_set
+        self.start_time = time.time()
+
+        self.create_layer_choices()
+        self.candidates = self.search_layers()
+
+        # Refine the top k with cycle accurate runs
+        self.refined_candidates = []
+        if self.refine_fn is not None:
+            for candidate in self.candidates[:self.top_k]:
+                if self.is_out_of_time():
+                    break
+                partition_obj = self.get_partition_manager(self.get_partition_table(candidate))
+                cycles = self.refine_fn(partition_obj)
+                self.refined_candidates += [[cycles] + candidate[1:]]
+
+        if len(self.refined_candidates) > 0:
+            best_candidate = min(self.refined_candidates, key=lambda x: x[0])
+        else:
+            best_candidate = self.candidates[0]
+
+        self.best_cost = best_candidate[0]
+        self.best_table = self.get_partition_table(best_candidate)
+        self.tuning_done = True
+
+    #
+    def is_out_of_time(self):
+        return time.time() - self.start_time > self.time_budget
+
+    #
+    def create_layer_choices(self):
+        num_cores = self.config_obj.get_num_cores()
+        partitions_list = StaticUtilities.get_partition_candidates(num_cores,
+                                                                   self.config_obj.get_partition_min_core_util())
+
+        use_matmul, use_vector = self.config_obj.get_compute_unit_valids()
+        unit_list = []
+        if use_matmul:
+            unit_list += ['matmul']
+        if use_vector:
+            unit_list += ['vector']
+        assert len(unit_list) > 0, 'No matmul or vector unit to run the layers on'
+
+        self.layer_ids = []
+        self.layer_choices = {}
+        for lid in range(self.workload_obj.get_num_layers()):
+            if not self.workload_obj.is_matmul_layer(lid):
+                continue
+
+            M, N, _ = self.workload_obj.get_transformed_mnk_dimensions(lid)
+            choices = []
+            for unit in unit_list:
+                for df in self.dataflow_list:
+                    arr_row, arr_col = PartitionManager.get_array_dims(self.config_obj, unit, df)
+                    df_part_list = self.cost_model.get_df_part_list(partitions_list, M, N, df, arr_row, arr_col)
+                    for input_parts, filter_parts in df_part_list:
+                        cost = self.get_layer_cost(lid, input_parts, filter_parts, unit, df)
+                        choices += [[input_parts, filter_parts, unit, df, cost]]
+
+            self.layer_ids += [lid]
+            self.layer_choices[lid] = choices
+
+    #
+    def get_layer_cost(self, layer_id=0, input_parts=1, filter_parts=1, unit='matmul', df='os'):
+        M, N, K = self.workload_obj.get_transformed_mnk_dimensions(layer_id)
+        arr_row, arr_col = PartitionManager.get_array_dims(self.config_obj, unit, df)
+
+        # The instances of a batched or grouped layer run one after another on the same parts
+        runtime = self.cost_model.get_layer_runtime(M, N, K, df, arr_row, arr_col, input_parts, filter_parts,
+                                                    config_obj=self.config_obj)
+        return runtime * self.workload_obj.get_layer_num_instances(layer_id)
+
+    #
+    def search_layers(self):
+        # Beam search over the layers, beams are [cost, choice idx per layer]
+        beams = [[0, []]]
+        for lid in self.layer_ids:
+            new_beams = []
+            for cost, choice_ids in beams:
+                for choice_idx in range(len(self.layer_choices[lid])):
+                    new_beams += [[cost + self.layer_choices[lid][choice_idx][4], choice_ids + [choice_idx]]]
+
+            new_beams.sort(key=lambda x: x[0])
+            beams = self.get_unique_candidates(new_beams)[:self.beam_width]
+
+        return beams
+
+    #
+    def get_unique_candidates(self, candidates):
+        # Keeps the best candidate of every (partial) partition table, so that the beams and
+        # the refine runs differ
+        unique_candidates = []
+        tables = []
+        for candidate in candidates:
+            table = self.get_partition_table(candidate)
+            if table not in tables:
+                tables += [table]
+                unique_candidates += [candidate]
+        return unique_candidates
+
+    #
+    def get_partition_table(self, candidate):
+        choice_ids = candidate[1]
+        partition_table = []
+        for idx in range(len(choice_ids)):
+            lid = self.layer_ids[idx]
+            input_parts, filter_parts, unit, df, _ = self.layer_choices[lid][choice_ids[idx]]
+            partition_table += [[lid, input_parts, filter_parts, unit, df]]
+        return partition_table
+
+    #
+    def get_partition_manager(self, partition_table=None):
+        if partition_table is None:
+            assert self.tuning_done
+            partition_table = self.best_table
+
+        partition_obj = PartitionManager()
+        partition_obj.set_params(config_obj=self.config_obj, workload_obj=self.workload_obj)
+        partition_obj.set_partition_table(partition_table)
+        return partition_obj
+
+    #
+    def get_best_cost(self):
+        assert self.tuning_done
+        return self.best_cost
+
+    #
+    def write_best_partition_table(self, filename):
+        assert self.tuning_done
+        self.get_partition_manager().write_current_partition_table(filename)
@@ -0,0 +1,123 @@
+import numpy as np
+
+
+class CompressedDemand:
+    '''
+        Row compressed (CSR) form of the demand matrices of a compute node. Every row is a
+        cycle and -1 means no request, so only the requested addresses and their columns are
+        kept per operand. A prefix count of the rows with any request answers whether a range
+        of cycles is idle in O(1), and idle ranges expand without touching the stored requests.
+    '''
+    def __init__(self):
+        # Per operand: values, column ids, row pointers and width
+        self.values = []
+        self.col_ids = []
+        self.row_ptrs = []
+        self.widths = []
+        self.dtypes = []
+
+        self.num_rows = 0
+        self.active_prefix = np.zeros(1, dtype=np.int64)
+        self.dense_nbytes = 0
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, demand_mats=()):
+        assert len(demand_mats) > 0, 'No demand matrices to compress'
+        num_rows = demand_mats[0].shape[0]
+        for demand_mat in demand_mats:
+            assert demand_mat.shape[0] == num_rows, 'Demand matrices out of sync'
+
+        self.values = []
+        self.col_ids = []
+        self.row_ptrs = []
+        self.widths = []
+        self.dtypes = []
+        self.num_rows = num_rows
+        self.dense_nbytes = 0
+
+        active_rows = np.zeros(num_rows, dtype=bool)
+        for demand_mat in demand_mats:
+            requested = demand_mat != -1
+            row_counts = requested.sum(axis=1)
+
+            self.values += [demand_mat[requested]]
+            self.col_ids += [np.nonzero(requested)[1].astype(np.int32)]
+            self.row_ptrs += [np.concatenate(([0], np.cumsum(row_counts))).astype(np.int64)]
+            self.widths += [demand_mat.shape[1]]
+            self.dtypes += [demand_mat.dtype]
+            self.dense_nbytes += demand_mat.nbytes
+
+            active_rows |= row_counts > 0
+
+        self.active_prefix = np.concatenate(([0], np.cumsum(active_rows))).astype(np.int64)
+        self.params_set = True
+
+    #
+    def get_num_rows(self):
+        return self.num_rows
+
+    #
+    def is_idle(self, row_start=0, row_end=0):
+        assert self.params_set
+        row_end = min(row_end, self.num_rows)
+        if row_end <= row_start:
+            return True
+        return self.active_prefix[row_end] == self.active_prefix[row_start]
+
+    #
+    def get_rows(self, row_start=0, row_end=0):
+        # Dense demand matrices of the cycles [row_start, row_end)
+        assert self.params_set
+        row_start = max(0, row_start)
+        row_end = min(row_end, self.num_rows)
+        num_rows = max(0, row_end - row_start)
+        idle = self.is_idle(row_start, row_end)
+
+        demand_mats = []
+        for values, col_ids, row_ptr, width, dtype in \
+                zip(self.values, self.col_ids, self.row_ptrs, self.widths, self.dtypes):
+            demand_mat = np.full((num_rows, width), -1, dtype=dtype)
+            if not idle:
+                first, last = row_ptr[row_start], row_ptr[row_end]
+                row_ids = np.repeat(np.arange(num_rows), np.diff(row_ptr[row_start:row_end + 1]))
+                demand_mat[row_ids, col_ids[first:last]] = values[first:last]
+            demand_mats += [demand_mat]
+
+        return tuple(demand_mats)
+
+    #
+    def get_dense(self):
+        return self.get_rows(0, self.num_rows)
+
+    #
+    def get_idle_runs(self):
+        # Run lengths of the idle cycles as [start row, length]
+        assert self.params_set
+        active = np.diff(self.active_prefix) > 0
+        edges = np.diff(np.concatenate(([1], active.astype(np.int8), [1])))
+        starts = np.nonzero(edges == -1)[0]
+        ends = np.nonzero(edges == 1)[0]
+        return [[int(start), int(end - start)] for start, end in zip(starts, ends)]
+
+    #
+    def get_density(self):
+        # Fraction of the demand entries which are requests
+        assert self.params_set
+        num_entries = sum([self.num_rows * width for width in self.widths])
+        if num_entries == 0:
+            return 0
+        return sum([len(values) for values in self.values]) / num_entries
+
+    #
+    def get_nbytes(self):
+        nbytes = self.active_prefix.nbytes
+        for values, col_ids, row_ptr in zip(self.values, self.col_ids, self.row_ptrs):
+            nbytes += values.nbytes + col_ids.nbytes + row_ptr.nbytes
+        return nbytes
+
+    #
+    def get_dense_nbytes(self):
+        return self.dense_nbytes
@@ -7,6 +7,9 @@ from krittika.compute.mat_mul.systolic_mat_mul_os import SystolicMatMulOS
 from krittika.compute.mat_mul.systolic_mat_mul_ws import SystolicMatMulWS
 from krittika.compute.mat_mul.systolic_mat_mul_is import SystolicMatMulIS
 from krittika.compute.simd.simd import simd
+from krittika.compute.compressed_demand import CompressedDemand
+from krittika.compute.fold_demand import FoldDemand
+from krittika.static_utilities import StaticUtilities
 
 
 class ComputeNode:
@@ -28,6 +31,11 @@ class ComputeNode:
         self.filter_matrix = np.ones((1, 1))
         self.ofmap_matrix = np.ones((1, 1))
 
+        # Demand kept in CSR form instead of the dense matrices of the compute unit
+        self.compressed_demand = None
+        # Demand regenerated per fold instead of the dense matrices of the compute unit
+        self.fold_demand = None
+
         # Flags
         self.params_set = False
         self.operands_valid = False
@@ -111,7 +119,8 @@ class ComputeNode:
         elif compute_unit == 'simd':
             self.selected_compute_node = simd()
             num_simd_units = self.config_obj.get_simd_length()
-            self.selected_compute_node.set_params(num_units=num_simd_units, simd_op = optype)
+            self.selected_compute_node.set_params(num_units=num_simd_units, simd_op = optype,
+                                                  op_table=self.config_obj.get_simd_op_table())
 
 
         self.params_set = True
@@ -144,7 +153,13 @@ class ComputeNode:
                 )
             elif self.compute_unit =='simd':
                 self.selected_compute_node.set_operands(op_matrix=ifmap_opmat)
-                self.selected_compute_node.calc_simd_unit()
+
+    #
+    def set_simd_timing(self, compute_cycles=0, mapping_efficiency=0, compute_utilization=0):
+        assert self.compute_unit == 'simd' and self.operands_valid
+        self.selected_compute_node.set_timing(compute_cycles=compute_cycles,
+                                              mapping_efficiency=mapping_efficiency,
+                                              compute_utilization=compute_utilization)
 
     #
     def calc_demand_matrices(self):
@@ -155,11 +170,79 @@ class ComputeNode:
 
     #
     def get_demand_matrices(self):
+        if self.fold_demand is not None:
+            return self.fold_demand.get_rows(0, self.fold_demand.get_num_rows())
+
+        if self.compressed_demand is not None:
+            return self.compressed_demand.get_dense()
+
         if not self.matrices_valid:
             self.calc_demand_matrices()
 
         return self.selected_compute_node.get_demand_matrices()
 
+    #
+    def compress_demand_matrices(self, max_density=0.5):
+        # Keeps the demand in CSR form and releases the dense matrices when at most
+        # max_density of the entries are requests. Returns True if compressed.
+        assert self.compute_unit in ['matmul', 'vector'], 'Only matmul and vector demand can be compressed'
+        if self.compressed_demand is not None:
+            return True
+
+        compressed_demand = CompressedDemand()
+        compressed_demand.set_params(self.get_demand_matrices())
+        if compressed_demand.get_density() > max_density:
+            return False
+
+        self.compressed_demand = compressed_demand
+        StaticUtilities.release_demand_matrices(self.selected_compute_node.compute_unit)
+        return True
+
+    #
+    def enable_fold_demand(self):
+        # Drops the dense matrices and generates the demand of each fold when its rows are asked for.
+        # Kept only if the generated folds line up with the dense matrices. Returns True if enabled.
+        assert self.compute_unit in ['matmul', 'vector'], 'Only matmul and vector demand can be generated per fold'
+        if self.fold_demand is not None:
+            return True
+
+        fold_demand = FoldDemand()
+        fold_demand.set_params(compute_unit=self.selected_compute_node.compute_unit,
+                               compute_unit_cfg=self.selected_compute_node.compute_unit_cfg)
+        if not fold_demand.matches(self.get_demand_matrices()):
+            return False
+
+        self.fold_demand = fold_demand
+        StaticUtilities.release_demand_matrices(self.selected_compute_node.compute_unit)
+        return True
+
+    #
+    def is_demand_per_fold(self):
+        return self.fold_demand is not None
+
+    #
+    def is_demand_compressed(self):
+        return self.compressed_demand is not None
+
+    #
+    def get_num_demand_rows(self):
+        if self.fold_demand is not None:
+            return self.fold_demand.get_num_rows()
+        if self.compressed_demand is not None:
+            return self.compressed_demand.get_num_rows()
+        return self.get_demand_matrices()[0].shape[0]
+
+    #
+    def get_demand_rows(self, row_start=0, row_end=0):
+        # Demand of the cycles [row_start, row_end), expanded or generated only for these rows
+        if self.fold_demand is not None:
+            return self.fold_demand.get_rows(row_start, row_end)
+        if self.compressed_demand is not None:
+            return self.compressed_demand.get_rows(row_start, row_end)
+
+        demand_mats = self.get_demand_matrices()
+        return tuple([demand_mat[row_start:row_end] for demand_mat in demand_mats])
+
     #
     def get_prefetch_matrices(self):
         if not self.matrices_valid:
@@ -167,6 +250,17 @@ class ComputeNode:
 
         return self.selected_compute_node.get_fetch_matrices()
 
+    #
+    def release_ifmap_operand(self, ifmap_opmat):
+        # Swaps the dense ifmap for ifmap_opmat, e.g. the implicit im2col block it was materialized from,
+        # once the demand and prefetch matrices are built. Folds generated later materialize only their rows.
+        assert self.compute_unit in ['matmul', 'vector'], 'Only matmul and vector operands can be released'
+        self.get_prefetch_matrices()
+
+        dense_ifmap = self.ifmap_matrix
+        for holder in [self, self.selected_compute_node, self.selected_compute_node.compute_unit]:
+            StaticUtilities.release_operand_matrix(holder, dense_ifmap, ifmap_opmat)
+
     #
     def get_num_compute(self):
         assert self.operands_valid
@@ -0,0 +1,173 @@
+import numpy as np
+
+from krittika.static_utilities import StaticUtilities
+
+
+class Im2colMatrix:
+    '''
+        The im2col ifmap address matrix of a conv layer, ofmap pixels x window elements, kept as
+        the layer geometry and a block of rows and columns. Slicing returns a smaller block without
+        computing any address; materialize() computes the addresses of the block, the same ones the
+        scalesim operand matrix holds for it, with -1 for the window elements outside the ifmap.
+    '''
+    def __init__(self):
+        # Layer geometry
+        self.ifmap_rows, self.ifmap_cols = 1, 1
+        self.filter_cols = 1
+        self.num_channels = 1
+        self.row_stride, self.col_stride = 1, 1
+        self.ofmap_cols = 1
+        self.ifmap_offset = 0
+
+        # Block of the layer matrix this object stands for
+        self.row_start, self.row_end = 0, 1
+        self.col_start, self.col_end = 0, 1
+
+        self.ndim = 2
+        self.dtype = np.dtype(np.int32)
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, ifmap_dims=(1, 1), filter_cols=1, num_channels=1, strides=(1, 1),
+                   ofmap_dims=(1, 1), window_size=1, ifmap_offset=0):
+        self.ifmap_rows, self.ifmap_cols = int(ifmap_dims[0]), int(ifmap_dims[1])
+        self.filter_cols = int(filter_cols)
+        self.num_channels = int(num_channels)
+        self.row_stride, self.col_stride = int(strides[0]), int(strides[1])
+        self.ofmap_cols = int(ofmap_dims[1])
+        self.ifmap_offset = int(ifmap_offset)
+
+        self.row_start, self.row_end = 0, int(ofmap_dims[0]) * self.ofmap_cols
+        self.col_start, self.col_end = 0, int(window_size)
+
+        # Same address width as the compacted operand matrices
+        max_addr = self.ifmap_offset + self.ifmap_rows * self.ifmap_cols * self.num_channels
+        self.dtype = StaticUtilities.get_address_dtype(np.array([-1, max_addr]))
+        self.params_set = True
+
+    #
+    @property
+    def shape(self):
+        return self.row_end - self.row_start, self.col_end - self.col_start
+
+    #
+    @property
+    def size(self):
+        return self.shape[0] * self.shape[1]
+
+    #
+    def __getitem__(self, key):
+        # Blocks only: [rows] or [rows, cols] with unit step slices
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        assert len(key) == 2 and all(isinstance(k, slice) for k in key), 'Only blocks of the im2col matrix can be taken'
+
+        row_start, row_end, row_step = key[0].indices(self.shape[0])
+        col_start, col_end, col_step = key[1].indices(self.shape[1])
+        assert row_step == 1 and col_step == 1, 'Only blocks of the im2col matrix can be taken'
+
+        block = Im2colMatrix()
+        block.__dict__.update(self.__dict__)
+        block.row_start = self.row_start + row_start
+        block.row_end = self.row_start + max(row_start, row_end)
+        block.col_start = self.col_start + col_start
+        block.col_end = self.col_start + max(col_start, col_end)
+        return block
+
+    #
+    def materialize(self):
+        assert self.params_set
+        ofmap_px = np.arange(self.row_start, self.row_end, dtype=np.int64)[:, np.newaxis]
+        window_elem = np.arange(self.col_start, self.col_end, dtype=np.int64)[np.newaxis, :]
+
+        # Top left ifmap pixel of the window of every ofmap pixel
+        ofmap_row, ofmap_col = np.divmod(ofmap_px, self.ofmap_cols)
+        i_row, i_col = ofmap_row * self.row_stride, ofmap_col * self.col_stride
+        window_addr = (i_row * self.ifmap_cols + i_col) * self.num_channels
+
+        # Position of every element within the window
+        c_row, k = np.divmod(window_elem, self.filter_cols * self.num_channels)
+        c_col, c_ch = np.divmod(k, self.num_channels)
+        internal_addr = (c_row * self.ifmap_cols + c_col) * self.num_channels + c_ch
+
+        valid = np.logical_and(c_row + i_row < self.ifmap_rows, c_col + i_col < self.ifmap_cols)
+        addr_matrix = np.where(valid, window_addr + internal_addr + self.ifmap_offset, -1)
+        return addr_matrix.astype(self.dtype)
+
+    #
+    def __array__(self, dtype=None, copy=None):
+        addr_matrix = self.materialize()
+        if dtype is not None:
+            return addr_matrix.astype(dtype)
+        return addr_matrix
+
+
+class ConvOperandMatrix:
+    '''
+        Operand matrices of a conv or gemm layer, in place of the scalesim operand matrix. The
+        ifmap operand is an Im2colMatrix, so the ofmap pixels x window addresses of the layer are
+        never held at once; the partitions take blocks of it and compute only their own addresses.
+        The filter and ofmap matrices are built as scalesim builds them.
+    '''
+    def __init__(self):
+        self.layer_id = 0
+        self.conv_window_size = 1
+        self.num_filters = 1
+        self.ofmap_px_per_filt = 1
+        self.filter_rows, self.filter_cols = 1, 1
+        self.num_channels = 1
+        self.ifmap_offset, self.filter_offset, self.ofmap_offset = 0, 10000000, 20000000
+
+        self.ifmap_addr_matrix = Im2colMatrix()
+        self.filter_addr_matrix = np.ones((1, 1), dtype=np.int32)
+        self.ofmap_addr_matrix = np.ones((1, 1), dtype=np.int32)
+
+        # Flags
+        self.params_set_flag = False
+        self.matrices_ready_flag = False
+
+    #
+    def set_params(self, config_obj, topoutil_obj, layer_id=0):
+        # Same arguments as the scalesim operand matrix
+        self.layer_id = layer_id
+        self.ifmap_offset, self.filter_offset, self.ofmap_offset = config_obj.get_offsets()
+
+        self.filter_rows, self.filter_cols = topoutil_obj.get_layer_filter_dims(layer_id)
+        self.num_channels = topoutil_obj.get_layer_num_channels(layer_id)
+        self.num_filters = topoutil_obj.get_layer_num_filters(layer_id)
+        self.conv_window_size = int(topoutil_obj.get_layer_window_size(layer_id))
+        ofmap_rows, ofmap_cols = topoutil_obj.get_layer_ofmap_dims(layer_id)
+        self.ofmap_px_per_filt = int(ofmap_rows) * int(ofmap_cols)
+
+        self.ifmap_addr_matrix = Im2colMatrix()
+        self.ifmap_addr_matrix.set_params(ifmap_dims=topoutil_obj.get_layer_ifmap_dims(layer_id),
+                                          filter_cols=self.filter_cols,
+                                          num_channels=self.num_channels,
+                                          strides=topoutil_obj.get_layer_strides(layer_id),
+                                          ofmap_dims=(int(ofmap_rows), int(ofmap_cols)),
+                                          window_size=self.conv_window_size,
+                                          ifmap_offset=self.ifmap_offset)
+        self.params_set_flag = True
+
+    #
+    def create_operand_matrices(self):
+        assert self.params_set_flag, 'Parameters not set yet. Run set_params()'
+
+        window_elem = np.arange(self.conv_window_size)[:, np.newaxis]
+        filters = np.arange(self.num_filters)[np.newaxis, :]
+        filter_addr = filters * self.filter_rows * self.filter_cols * self.num_channels + window_elem
+        self.filter_addr_matrix = StaticUtilities.to_address_matrix(filter_addr + self.filter_offset)
+
+        ofmap_px = np.arange(self.ofmap_px_per_filt)[:, np.newaxis]
+        self.ofmap_addr_matrix = StaticUtilities.to_address_matrix(self.num_filters * ofmap_px + filters
+                                                                   + self.ofmap_offset)
+        self.matrices_ready_flag = True
+        return 0
+
+    #
+    def get_all_operand_matrix(self):
+        if not self.matrices_ready_flag:
+            self.create_operand_matrices()
+        return self.ifmap_addr_matrix, self.filter_addr_matrix, self.ofmap_addr_matrix
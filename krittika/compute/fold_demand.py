@@ -0,0 +1,160 @@
+import math
+import numpy as np
+from scalesim.compute.systolic_compute_os import systolic_compute_os
+from scalesim.compute.systolic_compute_ws import systolic_compute_ws
+from scalesim.compute.systolic_compute_is import systolic_compute_is
+
+from krittika.static_utilities import StaticUtilities
+
+
+class FoldDemand:
+    '''
+        Generates the demand matrices of a systolic compute unit one fold at a time. A fold is
+        computed as a layer of its own on a fresh compute unit, with the operands cut down to the
+        rows and columns mapped in that fold, so only the requested folds are ever held. Folds are
+        numbered in the order the compute unit concatenates them: column folds outside, row folds inside.
+    '''
+    def __init__(self):
+        self.valid_dataflows = {systolic_compute_os: 'os', systolic_compute_ws: 'ws', systolic_compute_is: 'is'}
+
+        # Compute unit the folds are generated with
+        self.compute_unit_class = systolic_compute_os
+        self.compute_unit_cfg = None
+        self.dataflow = 'os'
+
+        # Operand matrices of the whole layer
+        self.ifmap_op_mat = np.ones((1, 1))
+        self.filter_op_mat = np.ones((1, 1))
+        self.ofmap_op_mat = np.ones((1, 1))
+
+        # Fold geometry
+        self.arr_row = 1
+        self.arr_col = 1
+        self.Sr = 1
+        self.Sc = 1
+        self.row_fold = 1
+        self.col_fold = 1
+        self.fold_rows = 0
+
+        # Last generated fold, consecutive tiles of one fold reuse it
+        self.cached_fold_id = -1
+        self.cached_fold_demand = ()
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, compute_unit=None, compute_unit_cfg=None):
+        assert type(compute_unit) in self.valid_dataflows, 'Folds can only be generated for systolic compute units'
+
+        self.compute_unit_class = type(compute_unit)
+        self.compute_unit_cfg = compute_unit_cfg
+        self.dataflow = self.valid_dataflows[self.compute_unit_class]
+
+        self.ifmap_op_mat = compute_unit.ifmap_op_mat
+        self.filter_op_mat = compute_unit.filter_op_mat
+        self.ofmap_op_mat = compute_unit.ofmap_op_mat
+
+        # Dimensions mapped along the rows and columns of the array, as in the compute units
+        if self.dataflow == 'os':
+            self.Sr, self.Sc = self.ifmap_op_mat.shape[0], self.filter_op_mat.shape[1]
+        elif self.dataflow == 'ws':
+            self.Sr, self.Sc = self.ifmap_op_mat.shape[1], self.filter_op_mat.shape[1]
+        else:
+            self.Sr, self.Sc = self.ifmap_op_mat.shape[1], self.ifmap_op_mat.shape[0]
+
+        self.arr_row, self.arr_col = self.compute_unit_cfg.get_array_dims()
+        self.row_fold = math.ceil(self.Sr / self.arr_row)
+        self.col_fold = math.ceil(self.Sc / self.arr_col)
+
+        self.cached_fold_id = -1
+        self.cached_fold_demand = ()
+        self.params_set = True
+        self.fold_rows = self.get_fold_demand(0)[0].shape[0]
+
+    #
+    def get_num_folds(self):
+        return self.row_fold * self.col_fold
+
+    #
+    def get_num_rows(self):
+        return self.fold_rows * self.get_num_folds()
+
+    #
+    def get_fold_operands(self, fold_id=0):
+        assert self.params_set
+        assert 0 <= fold_id < self.get_num_folds(), 'Fold ' + str(fold_id) + ' out of range'
+
+        fc, fr = divmod(fold_id, self.row_fold)
+        row_start, row_end = fr * self.arr_row, min((fr + 1) * self.arr_row, self.Sr)
+        col_start, col_end = fc * self.arr_col, min((fc + 1) * self.arr_col, self.Sc)
+
+        if self.dataflow == 'os':
+            return self.ifmap_op_mat[row_start:row_end, :], \
+                   self.filter_op_mat[:, col_start:col_end], \
+                   self.ofmap_op_mat[row_start:row_end, col_start:col_end]
+        elif self.dataflow == 'ws':
+            return self.ifmap_op_mat[:, row_start:row_end], \
+                   self.filter_op_mat[row_start:row_end, col_start:col_end], \
+                   self.ofmap_op_mat[:, col_start:col_end]
+        return self.ifmap_op_mat[col_start:col_end, row_start:row_end], \
+               self.filter_op_mat[row_start:row_end, :], \
+               self.ofmap_op_mat[col_start:col_end, :]
+
+    #
+    def get_fold_demand(self, fold_id=0):
+        if fold_id == self.cached_fold_id:
+            return self.cached_fold_demand
+
+        # An implicit operand is materialized for this fold only
+        ifmap_fold, filter_fold, ofmap_fold = [np.asarray(op_mat) for op_mat in self.get_fold_operands(fold_id)]
+
+        fold_unit = self.compute_unit_class()
+        fold_unit.set_params(config_obj=self.compute_unit_cfg,
+                             ifmap_op_mat=ifmap_fold,
+                             filter_op_mat=filter_fold,
+                             ofmap_op_mat=ofmap_fold)
+        fold_unit.create_ifmap_demand_mat()
+        fold_unit.create_filter_demand_mat()
+        fold_unit.create_ofmap_demand_mat()
+        StaticUtilities.compact_address_matrices(fold_unit)
+
+        self.cached_fold_id = fold_id
+        self.cached_fold_demand = (fold_unit.ifmap_demand_matrix,
+                                   fold_unit.filter_demand_matrix,
+                                   fold_unit.ofmap_demand_matrix)
+        return self.cached_fold_demand
+
+    #
+    def get_rows(self, row_start=0, row_end=0):
+        # Demand of the cycles [row_start, row_end), built from the folds these rows fall in
+        assert self.params_set
+        row_start = max(0, row_start)
+        row_end = min(row_end, self.get_num_rows())
+        if row_end <= row_start:
+            return tuple([demand_mat[:0] for demand_mat in self.get_fold_demand(0)])
+
+        fold_start = row_start // self.fold_rows
+        fold_end = (row_end - 1) // self.fold_rows + 1
+        offset = fold_start * self.fold_rows
+
+        if fold_end - fold_start == 1:
+            fold_demand = self.get_fold_demand(fold_start)
+            return tuple([demand_mat[row_start - offset:row_end - offset] for demand_mat in fold_demand])
+
+        fold_demands = [self.get_fold_demand(fold_id) for fold_id in range(fold_start, fold_end)]
+        return tuple([np.concatenate(operand_demands)[row_start - offset:row_end - offset]
+                      for operand_demands in zip(*fold_demands)])
+
+    #
+    def matches(self, demand_mats=()):
+        # Checks the folds against the demand matrices of the whole layer, before these are dropped
+        if demand_mats[0].shape[0] != self.get_num_rows():
+            return False
+
+        for fold_id in {0, self.get_num_folds() - 1}:
+            row_start = fold_id * self.fold_rows
+            for fold_mat, demand_mat in zip(self.get_fold_demand(fold_id), demand_mats):
+                if not np.array_equal(fold_mat, demand_mat[row_start:row_start + self.fold_rows]):
+                    return False
+        return True
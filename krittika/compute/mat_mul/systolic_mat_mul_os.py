@@ -2,8 +2,10 @@ import numpy as np
 from scalesim.scale_config import scale_config
 from scalesim.compute.systolic_compute_os import systolic_compute_os
 
+from krittika.static_utilities import StaticUtilities
+
 # Treat this as a macro for initialization
-dummy_matrix = np.ones((1, 1)) * -1
+dummy_matrix = np.full((1, 1), -1, dtype=np.int32)
 
 
 class SystolicMatMulOS:
@@ -91,6 +93,7 @@ class SystolicMatMulOS:
         self.create_input_operand_demand_matrices()
         self.create_out_operand_demand_matrix()
         self.compute_unit.demand_mat_ready_flag=True
+        StaticUtilities.compact_address_matrices(self.compute_unit)
 
     #
     def get_mat1_operand_demand_matrix(self):
@@ -124,6 +127,10 @@ class SystolicMatMulOS:
 
     #
     def get_fetch_matrices(self):
+        # Creates the prefetch matrices once (in float64, by scalesim) and keeps them as integers
+        self.compute_unit.get_prefetch_matrices()
+        StaticUtilities.compact_address_matrices(self.compute_unit)
+
         inp1_mat_fetch_mat = self.get_mat1_operand_fetch_matrix()
         inp2_mat_fetch_mat = self.get_mat2_operand_fetch_matrix()
 
@@ -1,5 +1,6 @@
 import numpy as np
 
+from krittika.config.krittika_config import KrittikaConfig
 from krittika.compute.compute_node import ComputeNode
 
 
@@ -12,19 +13,40 @@ class ScaledOutComputeUnit:
         self.grid_cols = 1
         self.layout_mat = np.ones((1,1)) * -1
 
+        # Supported placements: row_major, col_major, snake
+        # Logical node i sits at placement_order[i], a (row, col) grid position
+        self.valid_placements = ['row_major', 'col_major', 'snake']
+        self.placement = 'row_major'
+        self.placement_order = []
+        # Hops between two physical nodes, eg. PlacementOptimizer.get_hop_count for the topology
+        # of the network. Manhattan distance on the grid if not set.
+        self.hop_count_fn = None
+
         self.compute_node_op = 'vector'
         self.compute_node_df = 'os'
+        self.config_obj = KrittikaConfig()
 
         self.params_set = False
 
     #
     def set_params(self, total_nodes=1,
                    grid_rows=1, grid_cols=1,
-                   compute_node_op='vector', compute_node_df='os'):
+                   compute_node_op='vector', compute_node_df='os',
+                   config_obj=KrittikaConfig(),
+                   placement='row_major',
+                   hop_count_fn=None):
+        assert grid_rows > 0 and grid_cols > 0, 'Grid dimensions should be positive'
+        assert total_nodes <= grid_rows * grid_cols, \
+            str(total_nodes) + ' nodes do not fit on a ' + str(grid_rows) + 'x' + str(grid_cols) + ' grid'
+        assert placement in self.valid_placements, 'Invalid placement: ' + placement
+
         self.num_compute_nodes = total_nodes
+        self.config_obj = config_obj
 
         self.grid_rows = grid_rows
         self.grid_cols = grid_cols
+        self.placement = placement
+        self.hop_count_fn = hop_count_fn
 
         self.compute_node_op = compute_node_op
         self.compute_node_df = compute_node_df
@@ -38,6 +60,135 @@ class ScaledOutComputeUnit:
     def create_compute_node_obj_list(self):
         assert self.params_set
 
-        for _ in range(self.num_compute_nodes):
+        self.compute_node_obj_list = []
+        for node_id in range(self.num_compute_nodes):
+            # Every node is built from the config of its core type
+            node_config = self.config_obj.get_core_config(node_id)
+            node_op = self.get_node_compute_unit(node_config)
+
             new_compute_node = ComputeNode()
+            new_compute_node.set_params(config=node_config,
+                                        compute_unit=node_op,
+                                        dataflow=self.compute_node_df)
+            self.compute_node_obj_list += [new_compute_node]
+
+    #
+    def get_node_compute_unit(self, node_config):
+        # compute_node_op if the node has that unit, else the first unit the node has
+        matmul_present, vector_present = node_config.get_compute_unit_valids()
+        available_units = []
+        if matmul_present:
+            available_units += ['matmul']
+        if vector_present:
+            available_units += ['vector']
+        available_units += ['simd']
+
+        if self.compute_node_op in available_units:
+            return self.compute_node_op
+        return available_units[0]
+
+    #
+    def get_compute_node(self, node_id=0):
+        assert self.params_set
+        return self.compute_node_obj_list[node_id]
+
+    #
+    def set_placement(self, placement='row_major'):
+        assert self.params_set
+        assert placement in self.valid_placements, 'Invalid placement: ' + placement
+
+        self.placement = placement
+        self.update_layout_mat()
+
+    #
+    def update_layout_mat(self):
+        # layout_mat holds the logical node id at every grid position, -1 if no compute node
+        assert self.params_set
+
+        self.placement_order = self.get_placement_order(self.placement)
+        self.layout_mat = np.ones((self.grid_rows, self.grid_cols)) * -1
+        for node_id in range(self.num_compute_nodes):
+            row, col = self.placement_order[node_id]
+            self.layout_mat[row][col] = node_id
+
+    #
+    def get_placement_order(self, placement='row_major'):
+        positions = []
+        if placement == 'row_major':
+            for row in range(self.grid_rows):
+                positions += [(row, col) for col in range(self.grid_cols)]
+
+        elif placement == 'col_major':
+            for col in range(self.grid_cols):
+                positions += [(row, col) for row in range(self.grid_rows)]
+
+        else:   # placement == 'snake': odd rows run backwards so neighbours stay one hop apart
+            for row in range(self.grid_rows):
+                cols = list(range(self.grid_cols))
+                if row % 2 == 1:
+                    cols.reverse()
+                positions += [(row, col) for col in cols]
+
+        return positions
+
+    #
+    def get_node_position(self, node_id=0):
+        assert self.params_set
+        return self.placement_order[node_id]
+
+    #
+    def get_physical_id(self, node_id=0):
+        # Physical nodes of the NoC are numbered row major over the grid
+        row, col = self.get_node_position(node_id)
+        return row * self.grid_cols + col
+
+    #
+    def get_mapping_dict(self):
+        # Logical to physical mapping over the whole grid, for the NoC mapping_dict.
+        # Logical ids past the compute nodes (eg. the DRAM node) take the remaining positions.
+        assert self.params_set
+
+        mapping_dict = {}
+        for node_id in range(self.grid_rows * self.grid_cols):
+            mapping_dict[node_id] = self.get_physical_id(node_id)
+        return mapping_dict
+
+    #
+    def get_hop_count(self, src_node=0, dest_node=0):
+        if self.hop_count_fn is not None:
+            return self.hop_count_fn(self.get_physical_id(src_node), self.get_physical_id(dest_node))
+
+        src_row, src_col = self.get_node_position(src_node)
+        dest_row, dest_col = self.get_node_position(dest_node)
+        return abs(src_row - dest_row) + abs(src_col - dest_col)
+
+    #
+    def get_total_hops(self, node_pairs=None):
+        # node_pairs: list of [src, dest, weight] or [src, dest], defaults to the LP chain 0 -> 1 -> ...
+        if node_pairs is None:
+            node_pairs = [[node_id, node_id + 1] for node_id in range(self.num_compute_nodes - 1)]
+
+        total_hops = 0
+        for pair in node_pairs:
+            weight = 1
+            if len(pair) > 2:
+                weight = pair[2]
+            total_hops += weight * self.get_hop_count(pair[0], pair[1])
+        return total_hops
+
+    #
+    def choose_best_placement(self, node_pairs=None):
+        # Keeps the placement with the fewest weighted hops between the communicating nodes
+        assert self.params_set
+
+        best_placement = self.placement
+        best_hops = self.get_total_hops(node_pairs)
+        for placement in self.valid_placements:
+            self.set_placement(placement)
+            hops = self.get_total_hops(node_pairs)
+            if hops < best_hops:
+                best_hops = hops
+                best_placement = placement
 
+        self.set_placement(best_placement)
+        return best_placement
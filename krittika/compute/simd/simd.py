@@ -1,6 +1,7 @@
 import numpy as np
 import math
 from krittika.config.krittika_config import KrittikaConfig
+from krittika.compute.simd.simd_timing import SimdTiming
 
 dummy_matrix = np.ones((1, 1)) * -1
 
@@ -11,14 +12,19 @@ class simd:
         self.topology_obj = None
         self.simd_op = "RELU"
         self.avg_mapping_efficiency = 0
+        self.avg_compute_utilization = 0
+        self.compute_cycles = 0
+        self.timing_obj = SimdTiming()
         self.op_matrix = dummy_matrix
         self.params_set = False
         self.operands_valid = False
+        self.timing_valid = False
 
-    def set_params(self, num_units=1, simd_op="RELU"):
+    def set_params(self, num_units=1, simd_op="RELU", op_table=None):
         assert num_units > 0, 'Invalid number of units'
         self.simd_length = num_units
-        self.simd_op = simd_op
+        self.simd_op = simd_op.upper()
+        self.timing_obj.set_params(simd_length=num_units, op_table=op_table)
         self.params_set = True
 
     def set_operands(self, op_matrix=dummy_matrix):
@@ -26,6 +32,22 @@ class simd:
         assert op_matrix.shape[0] > 0 and op_matrix.ndim == 2, 'Input vector must be two-dimensional'
         self.op_matrix = op_matrix
         self.operands_valid = True
+        self.timing_valid = False
+
+    def calc_compute_cycles(self):
+        # Times the op from the operand shape, the values are never evaluated
+        assert self.operands_valid, 'Set the operands first'
+        num_rows, num_cols = self.op_matrix.shape
+        self.set_timing(compute_cycles=self.timing_obj.get_cycles(self.simd_op, num_rows, num_cols),
+                        mapping_efficiency=self.timing_obj.get_mapping_efficiency(num_rows, num_cols),
+                        compute_utilization=self.timing_obj.get_compute_utilization(self.simd_op, num_rows, num_cols))
+
+    def set_timing(self, compute_cycles=0, mapping_efficiency=0, compute_utilization=0):
+        # Timing computed for all the partitions of a layer at once
+        self.compute_cycles = int(compute_cycles)
+        self.avg_mapping_efficiency = float(mapping_efficiency)
+        self.avg_compute_utilization = float(compute_utilization)
+        self.timing_valid = True
 
     def calc_simd_unit(self):
         assert self.operands_valid, 'Set the operands first'
@@ -64,8 +86,18 @@ class simd:
 
     def get_avg_mapping_efficiency(self):
         assert self.operands_valid, 'Set the operands first'
+        if not self.timing_valid:
+            self.calc_compute_cycles()
         return self.avg_mapping_efficiency
 
+    def get_avg_compute_utilization(self):
+        assert self.operands_valid, 'Set the operands first'
+        if not self.timing_valid:
+            self.calc_compute_cycles()
+        return self.avg_compute_utilization
+
     def get_compute_cycles(self):
         assert self.operands_valid, 'Set the operands first'
+        if not self.timing_valid:
+            self.calc_compute_cycles()
         return self.compute_cycles
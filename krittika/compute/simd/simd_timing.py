@@ -0,0 +1,83 @@
+import numpy as np
+import math
+
+
+class SimdTiming:
+    '''
+        Cycle model of the SIMD unit. Each op has a pipeline latency, the cycles one vector
+        instruction of simd_length lanes occupies the unit, and a number of reduction passes
+        (SOFTMAX reduces the max and the sum before it normalizes). Every method takes the
+        operand rows as a scalar or an array, so all the partitions of a layer are timed at once.
+    '''
+    def __init__(self):
+        # Op -> [latency, cycles per vector, reduction passes]
+        self.default_op_table = {
+            'RELU': [1, 1, 0],
+            'BATCH_NORM': [2, 1, 0],
+            'ELU': [4, 1, 0],
+            'SELU': [4, 1, 0],
+            'TANH': [4, 1, 0],
+            'SIGMOID': [4, 1, 0],
+            'SOFTSIGN': [4, 1, 0],
+            'SINUSOID': [4, 1, 0],
+            'SOFTPLUS': [4, 2, 0],
+            'GELU': [6, 2, 0],
+            'SWISH': [5, 2, 0],
+            'MISH': [8, 3, 0],
+            'SOFTMAX': [4, 2, 2],
+        }
+        self.op_table = dict(self.default_op_table)
+        self.simd_length = 1
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, simd_length=1, op_table=None):
+        assert simd_length > 0, 'SIMD length must be greater than 0'
+        self.simd_length = simd_length
+
+        self.op_table = dict(self.default_op_table)
+        if op_table is not None:
+            for op, op_params in op_table.items():
+                assert len(op_params) == 3 and min(op_params) >= 0 and op_params[1] > 0, \
+                    'Invalid SIMD timing for ' + str(op) + ': ' + str(op_params)
+                self.op_table[op.upper()] = list(op_params)
+
+        self.params_set = True
+
+    #
+    def get_op_params(self, op='RELU'):
+        assert op.upper() in self.op_table, 'Unsupported SIMD operation ' + str(op)
+        return self.op_table[op.upper()]
+
+    #
+    def get_num_vectors(self, num_rows, num_cols=1):
+        # Vector instructions to cover the operand, lanes run along the rows of the matrix
+        return np.ceil(np.asarray(num_rows) * num_cols / self.simd_length).astype(np.int64)
+
+    #
+    def get_cycles(self, op='RELU', num_rows=1, num_cols=1):
+        assert self.params_set
+        latency, cycles_per_vector, reduction_passes = self.get_op_params(op)
+        num_vectors = self.get_num_vectors(num_rows, num_cols)
+
+        # Element wise passes are pipelined, a reduction pass also combines the lanes in a tree
+        cycles = latency + num_vectors * cycles_per_vector
+        tree_depth = math.ceil(math.log2(self.simd_length)) if self.simd_length > 1 else 0
+        cycles = cycles + reduction_passes * (num_vectors + tree_depth)
+
+        return np.where(num_vectors > 0, cycles, 0)
+
+    #
+    def get_mapping_efficiency(self, num_rows, num_cols=1):
+        # Fraction of the issued lanes which hold an element
+        num_vectors = self.get_num_vectors(num_rows, num_cols)
+        num_elems = np.asarray(num_rows) * num_cols
+        return np.where(num_vectors > 0, num_elems / np.maximum(num_vectors * self.simd_length, 1), 0)
+
+    #
+    def get_compute_utilization(self, op='RELU', num_rows=1, num_cols=1):
+        cycles = self.get_cycles(op, num_rows, num_cols)
+        num_elems = np.asarray(num_rows) * num_cols
+        return np.where(cycles > 0, num_elems / np.maximum(cycles * self.simd_length, 1), 0)
@@ -0,0 +1,32 @@
+import unittest
+from simd_timing import SimdTiming
+import numpy as np
+
+class TestSIMDTiming(unittest.TestCase):
+    def setUp(self):
+        self.timing = SimdTiming()
+        self.timing.set_params(simd_length=4)
+
+    def test_elementwise(self):
+        # 10x3 operand = 30 elements = 8 vectors, RELU takes 1 cycle per vector after 1 cycle of latency
+        self.assertEqual(self.timing.get_cycles('relu', 10, 3), 9)
+        self.assertEqual(self.timing.get_cycles('GELU', 10, 3), 6 + 8 * 2)
+        np.testing.assert_almost_equal(self.timing.get_mapping_efficiency(10, 3), 30 / 32)
+
+    def test_softmax_reductions(self):
+        # Two reduction passes over the 8 vectors, each with a 2 level tree across the lanes
+        self.assertEqual(self.timing.get_cycles('SOFTMAX', 10, 3), 4 + 8 * 2 + 2 * (8 + 2))
+
+    def test_all_parts_at_once(self):
+        part_rows = np.array([4, 4, 2, 0])
+        cycles = self.timing.get_cycles('TANH', part_rows, 2)
+        np.testing.assert_array_equal(cycles, [4 + 2, 4 + 2, 4 + 1, 0])
+        np.testing.assert_array_equal(self.timing.get_compute_utilization('TANH', part_rows, 2)[-1], 0)
+
+    def test_op_table_override(self):
+        self.timing.set_params(simd_length=4, op_table={'relu': [3, 2, 0]})
+        self.assertEqual(self.timing.get_cycles('RELU', 8, 1), 3 + 2 * 2)
+        self.assertEqual(self.timing.get_cycles('TANH', 8, 1), 4 + 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from krittika.compute.compressed_demand import CompressedDemand
+
+
+class TestCompressedDemand(unittest.TestCase):
+    def setUp(self):
+        # Skewed fill and drain: requests on a diagonal band, idle cycles in between
+        self.ifmap = np.full((12, 4), -1, dtype=np.int32)
+        self.filter = np.full((12, 4), -1, dtype=np.int32)
+        self.ofmap = np.full((12, 4), -1, dtype=np.int32)
+        for row in range(4):
+            self.ifmap[row, row] = 100 + row
+            self.filter[row, :row + 1] = 200 + row
+        self.ofmap[10, 1] = 300
+        self.ofmap[11, 2:] = 301
+
+        self.demand = CompressedDemand()
+        self.demand.set_params((self.ifmap, self.filter, self.ofmap))
+
+    def test_round_trip(self):
+        for dense, original in zip(self.demand.get_dense(), (self.ifmap, self.filter, self.ofmap)):
+            np.testing.assert_array_equal(dense, original)
+            self.assertEqual(dense.dtype, original.dtype)
+
+        for dense, original in zip(self.demand.get_rows(2, 11), (self.ifmap, self.filter, self.ofmap)):
+            np.testing.assert_array_equal(dense, original[2:11])
+
+    def test_idle_ranges(self):
+        self.assertTrue(self.demand.is_idle(4, 10))
+        self.assertFalse(self.demand.is_idle(3, 10))
+        self.assertEqual(self.demand.get_idle_runs(), [[4, 6]])
+
+        idle_rows = self.demand.get_rows(5, 8)
+        self.assertTrue(all((rows == -1).all() and rows.shape == (3, 4) for rows in idle_rows))
+
+    def test_smaller_than_dense(self):
+        self.assertLess(self.demand.get_density(), 0.2)
+        self.assertLess(self.demand.get_nbytes(), self.demand.get_dense_nbytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from scalesim.scale_config import scale_config
+from scalesim.compute.operand_matrix import operand_matrix
+from krittika.workload_manager import WorkloadManager
+from krittika.compute.conv_operand_matrix import ConvOperandMatrix
+
+
+class TestConvOperandMatrix(unittest.TestCase):
+    def setUp(self):
+        # Stride 2 conv whose last windows run past the ifmap
+        topo_file = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        topo_file.write('conv, 9, 8, 3, 2, 3, 5, 2\n')
+        topo_file.close()
+        self.addCleanup(os.remove, topo_file.name)
+
+        workload = WorkloadManager()
+        workload.read_topologies(workload_filename=topo_file.name)
+        # Same config the simulator builds the operand matrices with
+        conf_list = scale_config.get_default_conf_as_list()
+        conf_list[10] = 'CALC'
+        conf_list.append(10)
+        config = scale_config()
+        config.update_from_list(conf_list=conf_list)
+
+        self.ref = operand_matrix()
+        self.ref.set_params(config_obj=config, topoutil_obj=workload, layer_id=0)
+        self.ref.create_operand_matrices()
+        self.conv = ConvOperandMatrix()
+        self.conv.set_params(config_obj=config, topoutil_obj=workload, layer_id=0)
+
+    def test_matches_scalesim(self):
+        for matrix, ref_matrix in zip(self.conv.get_all_operand_matrix(), self.ref.get_all_operand_matrix()):
+            self.assertEqual(matrix.shape, ref_matrix.shape)
+            np.testing.assert_array_equal(np.asarray(matrix), ref_matrix)
+
+    def test_blocks(self):
+        ifmap, _, _ = self.conv.get_all_operand_matrix()
+        ref_ifmap, _, _ = self.ref.get_all_operand_matrix()
+        block = ifmap[3:7][1:3, 4:]
+        self.assertEqual(block.shape, (2, ref_ifmap.shape[1] - 4))
+        np.testing.assert_array_equal(block.materialize(), ref_ifmap[4:6, 4:])
+        self.assertEqual(ifmap[5:5].size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
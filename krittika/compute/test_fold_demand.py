@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from krittika.compute.mat_mul.systolic_mat_mul_os import SystolicMatMulOS
+from krittika.compute.mat_mul.systolic_mat_mul_ws import SystolicMatMulWS
+from krittika.compute.mat_mul.systolic_mat_mul_is import SystolicMatMulIS
+from krittika.compute.fold_demand import FoldDemand
+
+
+class TestFoldDemand(unittest.TestCase):
+    def get_layer_demand(self, mat_mul_class):
+        # 7x5 by 5x6 layer on a 3x4 array, every dimension leaves a partial fold
+        mat_mul = mat_mul_class()
+        mat_mul.set_params(arr_row=3, arr_col=4)
+        mat_mul.set_operands(op_inmat1=np.arange(7 * 5).reshape(7, 5),
+                             op_inmat2=np.arange(5 * 6).reshape(5, 6) + 1000,
+                             op_outmat=np.arange(7 * 6).reshape(7, 6) + 2000)
+        mat_mul.create_all_operand_demand_matrix()
+
+        fold_demand = FoldDemand()
+        fold_demand.set_params(compute_unit=mat_mul.compute_unit, compute_unit_cfg=mat_mul.compute_unit_cfg)
+        return fold_demand, mat_mul.get_demand_matrices()
+
+    def test_folds_match_layer(self):
+        for mat_mul_class in [SystolicMatMulOS, SystolicMatMulWS, SystolicMatMulIS]:
+            fold_demand, demand_mats = self.get_layer_demand(mat_mul_class)
+            self.assertEqual(fold_demand.get_num_rows(), demand_mats[0].shape[0])
+            self.assertTrue(fold_demand.matches(demand_mats))
+
+            for fold_id in range(fold_demand.get_num_folds()):
+                row_start = fold_id * fold_demand.fold_rows
+                for fold_mat, demand_mat in zip(fold_demand.get_fold_demand(fold_id), demand_mats):
+                    np.testing.assert_array_equal(fold_mat, demand_mat[row_start:row_start + fold_demand.fold_rows])
+
+    def test_rows_across_folds(self):
+        fold_demand, demand_mats = self.get_layer_demand(SystolicMatMulWS)
+        row_start = fold_demand.fold_rows - 3
+        row_end = 2 * fold_demand.fold_rows + 1
+        for rows, demand_mat in zip(fold_demand.get_rows(row_start, row_end), demand_mats):
+            np.testing.assert_array_equal(rows, demand_mat[row_start:row_end])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,10 @@ import numpy as np
 from scalesim.scale_config import scale_config
 from scalesim.compute.systolic_compute_ws import systolic_compute_ws
 
+from krittika.static_utilities import StaticUtilities
+
 # Treat this as a macro for initialization
-dummy_matrix = np.ones((1, 1)) * -1
+dummy_matrix = np.full((1, 1), -1, dtype=np.int32)
 
 
 class VectorWS:
@@ -90,6 +92,8 @@ class VectorWS:
         self.create_mat_operand_demand_matrix()
         self.create_vec_operand_demand_matrix()
         self.create_out_operand_demand_matrix()
+        self.compute_unit.demand_mat_ready_flag = True
+        StaticUtilities.compact_address_matrices(self.compute_unit)
 
     #
     def get_mat_operand_demand_matrix(self):
@@ -123,6 +127,10 @@ class VectorWS:
 
     #
     def get_fetch_matrices(self):
+        # Creates the prefetch matrices once (in float64, by scalesim) and keeps them as integers
+        self.compute_unit.get_prefetch_matrices()
+        StaticUtilities.compact_address_matrices(self.compute_unit)
+
         inp_vec_fetch_mat = self.get_vec_operand_fetch_matrix()
         inp_mat_fetch_mat = self.get_mat_operand_fetch_matrix()
 
@@ -139,12 +147,12 @@ class VectorWS:
         return self.compute_unit.get_avg_compute_utilization()
 
     #
-    def get_mat_reads(self):
+    def get_mat1_reads(self):
         assert self.operands_valid, 'Set the operands first'
         return self.compute_unit.get_ifmap_requests()
 
     #
-    def get_vec_reads(self):
+    def get_mat2_reads(self):
         assert self.operands_valid, 'Set the operands first'
         return self.compute_unit.get_filter_requests()
 
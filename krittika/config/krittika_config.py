@@ -1,3 +1,4 @@
+import copy
 from configparser import ConfigParser
 
 
@@ -19,6 +20,8 @@ class KrittikaConfig:
         self.vector_default_dataflow = 'ws'
 
         self.simd_length = 1
+        # Op -> [latency, cycles per vector, reduction passes], overrides the SIMD timing defaults
+        self.simd_op_table = {}
 
         self.default_ifmap_offset = 0
         self.default_filter_offset = 10 ** 7
@@ -27,6 +30,8 @@ class KrittikaConfig:
         # Supported partition modes:
         # USER, IFMAP, FILTER, AUTO (Best effort first filter, then inputs)
         self.partition_mode = 'AUTO'
+        # Fraction of the cores the automatic partitions have to use, below 1 allows padded splits
+        self.partition_min_core_util = 1.0
 
         self.per_unit_ifmap_sram_size_kb = 1
         self.per_unit_filter_sram_size_kb = 1
@@ -39,6 +44,22 @@ class KrittikaConfig:
         self.per_unit_user_filter_interface_bw = 1
         self.per_unit_user_ofmap_interface_bw = 1
 
+        # DRAM shared by the cores, off (0 words/cycle) unless a [DRAM] section sets it.
+        # The bandwidth and the latency are per channel.
+        self.shared_dram_bw = [0]
+        self.dram_num_channels = 1
+        self.dram_interleaving = 'LINE'
+        self.dram_channel_latency = [0]
+        self.dram_arbitration_policy = 'ROUND_ROBIN'
+        self.dram_burst_words = 16
+        self.dram_row_words = 512
+        self.dram_row_miss_latency = 0
+
+        # Heterogeneous cores: [CORE TYPE <name>] sections override the values above
+        # for the cores they list. Cores which are not listed keep the values above.
+        self.core_type_overrides = {}
+        self.core_type_of_core = {}
+
         # Flags
         self.config_valid = False
 
@@ -94,6 +115,10 @@ class KrittikaConfig:
             'Invalid partition mode ' + part_strategy + '. Supported vals: [USER, AUTO, IFMAP, FILTER, CONST_DF]'
         self.partition_mode = part_strategy
 
+        min_core_util = float(cfg.get(section, 'Partition Min Core Utilization', fallback='1.0'))
+        assert 0 < min_core_util <= 1, 'Partition min core utilization should be in (0, 1]'
+        self.partition_min_core_util = min_core_util
+
         section = 'MEMORY'
         ifmap_offset = int(cfg.get(section, 'IFMAP Offset'))
         filter_offset = int(cfg.get(section, 'FILTER Offset'))
@@ -138,6 +163,72 @@ class KrittikaConfig:
 
         self.config_valid = True
 
+        self.simd_op_table = {}
+        if cfg.has_section('SIMD'):
+            for op, op_params in cfg.items('SIMD'):
+                self.simd_op_table[op.upper()] = [int(x.strip()) for x in op_params.split(',')]
+
+        if cfg.has_section('DRAM'):
+            self.read_dram_section(cfg, 'DRAM')
+
+        self.core_type_overrides = {}
+        self.core_type_of_core = {}
+        for section in cfg.sections():
+            if section.startswith('CORE TYPE '):
+                self.read_core_type_section(cfg, section)
+
+    #
+    def read_dram_section(self, cfg, section):
+        num_channels = int(cfg.get(section, 'Channels', fallback='1'))
+        assert num_channels > 0, 'DRAM needs at least one channel'
+        # One value for all the channels or one value per channel
+        shared_dram_bw = [float(x) for x in cfg.get(section, 'Shared BW (Words/Cycle)', fallback='0').split(',')]
+        channel_latency = [int(x) for x in cfg.get(section, 'Channel Latency', fallback='0').split(',')]
+        assert len(shared_dram_bw) in [1, num_channels], 'Need one BW value for all the channels or one per channel'
+        assert len(channel_latency) in [1, num_channels], \
+            'Need one latency value for all the channels or one per channel'
+        assert min(shared_dram_bw) >= 0, 'Invalid BW value'
+        assert min(shared_dram_bw) > 0 or max(shared_dram_bw) == 0, 'Every DRAM channel needs a bandwidth'
+        assert min(channel_latency) >= 0, 'Invalid channel latency'
+        interleaving = cfg.get(section, 'Interleaving', fallback='LINE').strip().upper()
+        assert interleaving in ['LINE', 'PAGE', 'OPERAND'], \
+            'Invalid interleaving: ' + interleaving + '. Valid interleavings are [LINE, PAGE, OPERAND]'
+        policy = cfg.get(section, 'Arbitration Policy', fallback='ROUND_ROBIN').strip().upper()
+        assert policy in ['ROUND_ROBIN', 'FR_FCFS'], \
+            'Invalid arbitration policy: ' + policy + '. Valid policies are [ROUND_ROBIN, FR_FCFS]'
+        burst_words = int(cfg.get(section, 'Burst Words', fallback='16'))
+        row_words = int(cfg.get(section, 'Row Words', fallback='512'))
+        row_miss_latency = int(cfg.get(section, 'Row Miss Latency', fallback='0'))
+        assert burst_words > 0 and row_words >= burst_words, 'A DRAM row should hold at least one burst'
+        assert row_miss_latency >= 0, 'Invalid row miss latency'
+
+        self.shared_dram_bw = shared_dram_bw
+        self.dram_num_channels = num_channels
+        self.dram_interleaving = interleaving
+        self.dram_channel_latency = channel_latency
+        self.dram_arbitration_policy = policy
+        self.dram_burst_words = burst_words
+        self.dram_row_words = row_words
+        self.dram_row_miss_latency = row_miss_latency
+
+    #
+    def read_core_type_section(self, cfg, section):
+        type_name = section[len('CORE TYPE '):].strip()
+        core_ids = [int(x.strip()) for x in cfg.get(section, 'Core Ids').split(',')]
+
+        overrides = {}
+        for key in self.get_core_type_keys():
+            if cfg.has_option(section, key):
+                val = cfg.get(section, key)
+                if key in ['MatMul Core Present', 'Vector Core Present']:
+                    overrides[key] = val in ['true', 'True', 'TRUE']
+                elif key in ['MatMul Default Dataflow', 'Vector Default Dataflow']:
+                    overrides[key] = val.strip()
+                else:
+                    overrides[key] = int(val)
+
+        self.add_core_type(type_name=type_name, core_ids=core_ids, overrides=overrides)
+
     # ------ SET METHODS ------
     #
     def set_config_vals(self,
@@ -203,6 +294,40 @@ class KrittikaConfig:
         self.matmul_present = matmul_valid
         self.vector_present = vector_valid
 
+    #
+    def set_num_cores(self, num_cores=1):
+        assert self.config_valid
+        assert num_cores > 0, 'Number of cores should be a positive integer'
+
+        self.num_compute_cores = num_cores
+
+    #
+    def add_core_type(self, type_name='', core_ids=None, overrides=None):
+        # overrides maps the config file keys of get_core_type_keys() to the values of this core type
+        assert self.config_valid
+        assert type_name != '', 'Please provide a valid core type name'
+        assert type_name not in self.core_type_overrides, 'Core type ' + type_name + ' is defined twice'
+        assert core_ids is not None and len(core_ids) > 0, 'Core type ' + type_name + ' has no cores'
+        if overrides is None:
+            overrides = {}
+
+        for key in overrides:
+            assert key in self.get_core_type_keys(), 'Invalid core type key: ' + key
+        for key in ['MatMul Default Dataflow', 'Vector Default Dataflow']:
+            if key in overrides:
+                assert overrides[key] in ['os', 'ws', 'is'], 'Invalid dataflow: ' + str(overrides[key])
+        for key in overrides:
+            if key not in ['MatMul Core Present', 'Vector Core Present',
+                           'MatMul Default Dataflow', 'Vector Default Dataflow']:
+                assert overrides[key] > 0, 'Invalid value for ' + key + ' in core type ' + type_name
+
+        for core_id in core_ids:
+            assert 0 <= core_id < self.num_compute_cores, 'Core id ' + str(core_id) + ' does not exist'
+            assert core_id not in self.core_type_of_core, 'Core ' + str(core_id) + ' has more than one type'
+            self.core_type_of_core[core_id] = type_name
+
+        self.core_type_overrides[type_name] = dict(overrides)
+
     #
     def set_matmul_dims(self, arr_row=1, arr_col=1):
         assert self.config_valid and self.matmul_present
@@ -326,6 +451,11 @@ class KrittikaConfig:
         assert self.config_valid
         return self.simd_length
 
+    #
+    def get_simd_op_table(self):
+        assert self.config_valid
+        return self.simd_op_table
+
     #
     def get_operand_offsets(self):
         assert self.config_valid
@@ -336,6 +466,11 @@ class KrittikaConfig:
         assert self.config_valid
         return self.partition_mode
 
+    #
+    def get_partition_min_core_util(self):
+        assert self.config_valid
+        return self.partition_min_core_util
+
     #
     def is_autopartition(self):
         return self.partition_mode != 'USER'
@@ -359,6 +494,102 @@ class KrittikaConfig:
                self.per_unit_user_filter_interface_bw, \
                self.per_unit_user_ofmap_interface_bw
 
+    #
+    def is_shared_dram(self):
+        return max(self.shared_dram_bw) > 0
+
+    #
+    def get_shared_dram_bandwidth(self):
+        # Per channel
+        assert self.config_valid
+        return self.shared_dram_bw
+
+    #
+    def get_dram_channel_params(self):
+        # Number of channels, interleaving, per channel latency
+        assert self.config_valid
+        return self.dram_num_channels, self.dram_interleaving, self.dram_channel_latency
+
+    #
+    def get_dram_arbitration_policy(self):
+        assert self.config_valid
+        return self.dram_arbitration_policy
+
+    #
+    def get_dram_burst_params(self):
+        # Burst words, row words, row miss latency
+        assert self.config_valid
+        return self.dram_burst_words, self.dram_row_words, self.dram_row_miss_latency
+
+    #
+    def is_heterogeneous(self):
+        return len(self.core_type_overrides) > 0
+
+    #
+    def get_core_type(self, core_id=0):
+        # Cores without a [CORE TYPE] section belong to the 'default' type
+        assert self.config_valid
+        return self.core_type_of_core.get(core_id, 'default')
+
+    #
+    def get_core_type_names(self):
+        assert self.config_valid
+        type_names = []
+        for core_id in range(self.num_compute_cores):
+            type_name = self.get_core_type(core_id)
+            if type_name not in type_names:
+                type_names += [type_name]
+        return type_names
+
+    #
+    def get_cores_of_type(self, type_name='default'):
+        assert self.config_valid
+        return [core_id for core_id in range(self.num_compute_cores) if self.get_core_type(core_id) == type_name]
+
+    #
+    def get_core_type_config(self, type_name='default'):
+        # A homogeneous config with the values of this core type
+        assert self.config_valid
+
+        core_type_config = copy.deepcopy(self)
+        core_type_config.core_type_overrides = {}
+        core_type_config.core_type_of_core = {}
+        if type_name == 'default':
+            return core_type_config
+
+        assert type_name in self.core_type_overrides, 'Unknown core type ' + type_name
+        overrides = self.core_type_overrides[type_name]
+        attr_names = self.get_core_type_keys()
+        for key in overrides:
+            setattr(core_type_config, attr_names[key], overrides[key])
+
+        return core_type_config
+
+    #
+    def get_core_config(self, core_id=0):
+        return self.get_core_type_config(self.get_core_type(core_id))
+
+    #
+    @staticmethod
+    def get_core_type_keys():
+        # Config file key -> attribute, for the values which can differ across cores
+        return {
+            'MatMul Core Present': 'matmul_present',
+            'MatMul ArrRow': 'matmul_arr_row',
+            'MatMul ArrCol': 'matmul_arr_col',
+            'MatMul Default Dataflow': 'matmul_default_dataflow',
+            'Vector Core Present': 'vector_present',
+            'Vector Dim': 'vector_dim',
+            'Vector Default Dataflow': 'vector_default_dataflow',
+            'simd length': 'simd_length',
+            'Per Core IFMAP SRAM Size KB': 'per_unit_ifmap_sram_size_kb',
+            'Per Core FILTER SRAM Size KB': 'per_unit_filter_sram_size_kb',
+            'Per Core OFMAP SRAM Size KB': 'per_unit_ofmap_sram_size_kb',
+            'Per Core User IFMAP buf interface BW (Words/Cycle)': 'per_unit_user_ifmap_interface_bw',
+            'Per Core User FILTER buf interface BW (Words/Cycle)': 'per_unit_user_filter_interface_bw',
+            'Per Core User OFMAP buf interface BW (Words/Cycle)': 'per_unit_user_ofmap_interface_bw',
+        }
+
     #
     def write_config_file(self, filename='krittika_config.cfg'):
         assert self.config_valid
@@ -384,7 +615,9 @@ class KrittikaConfig:
             cp.set(section, 'Vector Dim', str(self.vector_dim))
             cp.set(section, 'Vector Default Dataflow', str(self.vector_default_dataflow))
 
+        cp.set(section, 'simd length', str(self.simd_length))
         cp.set(section, 'Partition Strategy', str(self.partition_mode))
+        cp.set(section, 'Partition Min Core Utilization', str(self.partition_min_core_util))
 
         section = 'MEMORY'
         cp.add_section(section)
@@ -406,6 +639,31 @@ class KrittikaConfig:
         cp.set(section, 'Per Core User OFMAP buf interface BW (Words/Cycle)',
                             str(self.per_unit_user_ofmap_interface_bw))
 
+        if self.is_shared_dram():
+            section = 'DRAM'
+            cp.add_section(section)
+            cp.set(section, 'Channels', str(self.dram_num_channels))
+            cp.set(section, 'Shared BW (Words/Cycle)', ', '.join([str(x) for x in self.shared_dram_bw]))
+            cp.set(section, 'Channel Latency', ', '.join([str(x) for x in self.dram_channel_latency]))
+            cp.set(section, 'Interleaving', str(self.dram_interleaving))
+            cp.set(section, 'Arbitration Policy', str(self.dram_arbitration_policy))
+            cp.set(section, 'Burst Words', str(self.dram_burst_words))
+            cp.set(section, 'Row Words', str(self.dram_row_words))
+            cp.set(section, 'Row Miss Latency', str(self.dram_row_miss_latency))
+
+        if len(self.simd_op_table) > 0:
+            section = 'SIMD'
+            cp.add_section(section)
+            for op, op_params in self.simd_op_table.items():
+                cp.set(section, op, ', '.join([str(x) for x in op_params]))
+
+        for type_name in self.core_type_overrides:
+            section = 'CORE TYPE ' + type_name
+            cp.add_section(section)
+            cp.set(section, 'Core Ids', ', '.join([str(x) for x in self.get_cores_of_type(type_name)]))
+            for key, val in self.core_type_overrides[type_name].items():
+                cp.set(section, key, str(val))
+
         with open(filename, 'w') as configfile:
             cp.write(configfile)
 
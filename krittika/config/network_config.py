@@ -48,6 +48,7 @@ class NetworkConfig:
         self.rows = []
         self.cols = []
         self.mapping_dict = {}
+        self.mapping_en = False
 
         self.congestion_aware = None
 
@@ -130,6 +131,12 @@ class NetworkConfig:
                 self.logger.error(f"Valid options are: {valid_topologies}")
                 raise ValueError(f"Invalid topology {topo}")
 
+        if self.mapping_en:
+            physical_cores = list(self.mapping_dict.values())
+            if len(set(physical_cores)) != len(physical_cores):
+                self.logger.error(f"Mapping is not a permutation: {self.mapping_dict}")
+                raise ValueError("Two logical cores are mapped to the same physical core")
+
     def get_cpp_config(self):
         """
         Get the network configuration to a C++ style config file.
@@ -158,8 +165,54 @@ class NetworkConfig:
 
         return config_string
 
+    def write_network_config(self, filename):
+        """
+        Write the network configuration, including the mapping section, to a cfg file.
+
+        Args:
+            filename (str): The path to the configuration file.
+
+        Returns:
+            None
+        """
+        cfg = ConfigParser()
+
+        section = "Network Configuration"
+        cfg.add_section(section)
+        cfg.set(section, "topology", ", ".join(self.topology))
+        cfg.set(section, "npus_count", ", ".join([str(x) for x in self.npus_count]))
+        cfg.set(section, "bandwidth", ", ".join([str(x) for x in self.bandwidth]))
+        cfg.set(section, "latency", ", ".join([str(x) for x in self.latency]))
+        cfg.set(section, "congestion_aware", str(self.congestion_aware).lower())
+        cfg.set(section, "rows", ", ".join([str(x) for x in self.rows]))
+        cfg.set(section, "cols", ", ".join([str(x) for x in self.cols]))
+        cfg.set(section, "mapping_en", str(self.mapping_en))
+
+        section = "logical_to_physical_mapping"
+        cfg.add_section(section)
+        for key in sorted(self.mapping_dict):
+            cfg.set(section, str(key), str(self.mapping_dict[key]))
+
+        with open(filename, "w") as configfile:
+            cfg.write(configfile)
+        self.logger.debug(f"Network config written to {os.path.abspath(filename)}")
+
     def get_logical_to_physical_mapping(self):
         return self.mapping_dict
 
+    def set_logical_to_physical_mapping(self, mapping_dict):
+        """
+        Replace the logical to physical core mapping and enable it.
+
+        Args:
+            mapping_dict (dict): Logical core id to physical core id.
+
+        Returns:
+            None
+        """
+        self.mapping_dict = dict(mapping_dict)
+        self.mapping_en = True
+        self.logger.debug(f"Logical to physical mapping set to: {self.mapping_dict}")
+
     def get_mapping_en(self):
         return self.mapping_en
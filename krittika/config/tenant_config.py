@@ -0,0 +1,121 @@
+from configparser import ConfigParser
+
+
+class TenantConfig:
+    def __init__(self):
+
+        # Physical node which serves the DRAM requests of all the tenants
+        self.dram_node = 0
+
+        # One entry per tenant: [name, topology file, partition file, priority, num cores]
+        self.tenant_list = []
+
+        # Flags
+        self.config_valid = False
+
+    #
+    def read_tenant_config(self, filename):
+
+        cfg = ConfigParser()
+        cfg.read(filename)
+
+        section = 'GENERAL'
+        if cfg.has_section(section):
+            self.dram_node = int(cfg.get(section, 'DRAM Node', fallback='0'))
+            assert self.dram_node >= 0, 'DRAM node id cannot be negative'
+
+        for section in cfg.sections():
+            if section == 'GENERAL':
+                continue
+
+            topology_file = cfg.get(section, 'Topology')
+            partition_file = cfg.get(section, 'Partition File', fallback='')
+            priority = int(cfg.get(section, 'Priority', fallback='0'))
+            num_cores = int(cfg.get(section, 'Num Cores'))
+            assert num_cores > 0, 'Tenant ' + section + ' needs at least one core'
+
+            self.tenant_list += [[section, topology_file, partition_file, priority, num_cores]]
+
+        assert len(self.tenant_list) > 0, 'No tenants found in ' + str(filename)
+        self.config_valid = True
+
+    #
+    def add_tenant(self, name='', topology_file='', partition_file='', priority=0, num_cores=1):
+        assert name != '', 'Please provide a valid tenant name'
+        assert topology_file != '', 'Please provide a topology file for the tenant'
+        assert num_cores > 0, 'Tenant ' + name + ' needs at least one core'
+
+        self.tenant_list += [[name, topology_file, partition_file, priority, num_cores]]
+        self.config_valid = True
+
+    #
+    def set_dram_node(self, dram_node=0):
+        assert dram_node >= 0, 'DRAM node id cannot be negative'
+        self.dram_node = dram_node
+
+    # ------ GET METHODS ------
+    #
+    def get_num_tenants(self):
+        assert self.config_valid
+        return len(self.tenant_list)
+
+    #
+    def get_tenant_name(self, tenant_id=0):
+        assert self.config_valid
+        return self.tenant_list[tenant_id][0]
+
+    #
+    def get_tenant_topology_file(self, tenant_id=0):
+        assert self.config_valid
+        return self.tenant_list[tenant_id][1]
+
+    #
+    def get_tenant_partition_file(self, tenant_id=0):
+        assert self.config_valid
+        return self.tenant_list[tenant_id][2]
+
+    #
+    def get_tenant_priority(self, tenant_id=0):
+        assert self.config_valid
+        return self.tenant_list[tenant_id][3]
+
+    #
+    def get_tenant_num_cores(self, tenant_id=0):
+        assert self.config_valid
+        return self.tenant_list[tenant_id][4]
+
+    #
+    def get_dram_node(self):
+        return self.dram_node
+
+    #
+    def get_tenant_ids_by_priority(self):
+        # Higher priority value goes first, ties keep the file order
+        assert self.config_valid
+        tenant_ids = list(range(len(self.tenant_list)))
+        return sorted(tenant_ids, key=lambda tid: -self.tenant_list[tid][3])
+
+    #
+    def get_core_allocation(self, total_cores=1):
+        # Hands out contiguous core ids in priority order. Tenants get disjoint sets
+        # while the quotas fit, after that the allocation wraps around and the
+        # cores are time shared with the higher priority tenants.
+        assert self.config_valid
+
+        core_allocation = {}
+        next_core = 0
+        for tenant_id in self.get_tenant_ids_by_priority():
+            num_cores = self.get_tenant_num_cores(tenant_id)
+            assert num_cores <= total_cores, \
+                'Tenant ' + self.get_tenant_name(tenant_id) + ' asks for more cores than available'
+
+            core_allocation[tenant_id] = [(next_core + i) % total_cores for i in range(num_cores)]
+            next_core = (next_core + num_cores) % total_cores
+
+        return core_allocation
+
+    #
+    def is_time_shared(self, total_cores=1):
+        assert self.config_valid
+        requested_cores = sum([self.get_tenant_num_cores(tid) for tid in range(len(self.tenant_list))])
+        return requested_cores > total_cores
@@ -0,0 +1,92 @@
+import numpy as np
+
+from krittika.workload_manager import WorkloadManager
+
+
+class DecodeWorkload:
+    '''
+        Autoregressive decode of a transformer_block topology. Decode step t (1 based) runs every
+        block on one token against a KV cache of kv_len + t entries, so only the score and context
+        matmuls change from step to step. A few evenly spaced steps are simulated and the cycles of
+        the others are interpolated between them, which gives the per token latency curve.
+    '''
+    def __init__(self):
+        self.block_shapes = []
+        self.num_tokens = 1
+        self.num_samples = 1
+
+        # Cycles of the simulated steps: step -> cycles
+        self.step_cycles = {}
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, prompt_workload=WorkloadManager(), num_tokens=1, num_samples=8):
+        # prompt_workload is the workload of the prompt, made of transformer_block rows only
+        assert num_tokens > 0, 'Number of decode tokens should be positive'
+        assert num_samples > 1 or num_tokens == 1, 'At least two steps are needed to interpolate the others'
+        num_block_layers = sum([len(prompt_workload.get_block_layer_ids(block_id))
+                                for block_id in range(prompt_workload.get_num_blocks())])
+        assert prompt_workload.get_num_blocks() > 0 and num_block_layers == prompt_workload.get_num_layers(), \
+            'Decode runs topologies of transformer_block rows only'
+
+        self.block_shapes = [prompt_workload.get_block_shape(block_id)
+                             for block_id in range(prompt_workload.get_num_blocks())]
+        self.num_tokens = num_tokens
+        self.num_samples = min(num_samples, num_tokens)
+        self.step_cycles = {}
+        self.params_set = True
+
+    #
+    def get_sample_steps(self):
+        # Evenly spaced steps with the first and the last one
+        assert self.params_set
+        return sorted(set(np.rint(np.linspace(1, self.num_tokens, self.num_samples)).astype(int).tolist()))
+
+    #
+    def get_step_kv_len(self, step=1, block_id=0):
+        _, _, _, _, kv_len = self.block_shapes[block_id]
+        return kv_len + step
+
+    #
+    def get_step_rows(self, step=1):
+        assert self.params_set
+        assert 1 <= step <= self.num_tokens, 'Invalid decode step ' + str(step)
+        rows = []
+        for block_id in range(len(self.block_shapes)):
+            _, d_model, heads, d_ff, _ = self.block_shapes[block_id]
+            rows += ['transformer_block, ' + ', '.join([str(x) for x in [1, d_model, heads, d_ff,
+                                                                         self.get_step_kv_len(step, block_id)]])]
+        return rows
+
+    #
+    def create_step_workload(self, step=1):
+        # The GEMV shaped layers of one decode step, repeated blocks are tagged as in the prompt
+        step_workload = WorkloadManager()
+        step_workload.read_topology_rows(self.get_step_rows(step))
+        return step_workload
+
+    #
+    def set_step_cycles(self, step=1, cycles=0):
+        assert 1 <= step <= self.num_tokens, 'Invalid decode step ' + str(step)
+        self.step_cycles[step] = cycles
+
+    #
+    def get_token_cycles(self):
+        # Cycles of every step, linear between the simulated ones
+        assert len(self.step_cycles) > 0, 'No decode step simulated yet'
+        sampled_steps = sorted(self.step_cycles)
+        sampled_cycles = [self.step_cycles[step] for step in sampled_steps]
+        return np.interp(np.arange(1, self.num_tokens + 1), sampled_steps, sampled_cycles)
+
+    #
+    def save_decode_report(self, filename=''):
+        token_cycles = self.get_token_cycles()
+        decode_report = open(filename, 'w')
+        decode_report.write('Token, KV Len, Cycles, Simulated,\n')
+        for step in range(1, self.num_tokens + 1):
+            log = ', '.join([str(x) for x in [step, self.get_step_kv_len(step), int(round(token_cycles[step - 1])),
+                                              int(step in self.step_cycles)]])
+            decode_report.write(log + ',\n')
+        decode_report.close()
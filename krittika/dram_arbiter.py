@@ -0,0 +1,223 @@
+import math
+import numpy as np
+
+
+class DramArbiter:
+    '''
+        The DRAM shared by all the cores, made of one or more channels. The DRAM words requested
+        by the cores for a round of tiles are mapped to the channels by the address interleaving:
+        LINE: consecutive bursts go to consecutive channels
+        PAGE: consecutive rows go to consecutive channels
+        OPERAND: the channels are split between the ifmap, filter and ofmap address ranges
+                 (from the operand offsets), the rows of an operand are spread over its channels
+        Every channel serves its bursts one at a time at its own bandwidth. A burst holds the words
+        of one DRAM row, a burst to another row than the open one of its channel pays the row miss
+        latency. A word is delivered the channel latency after the channel served it. The next burst
+        of a channel is picked by the arbitration policy:
+        ROUND_ROBIN: the requests with pending bursts take turns
+        FR_FCFS: bursts to the open row first, the oldest request otherwise
+    '''
+    def __init__(self):
+        # Params
+        self.num_channels = 1
+        self.interleaving = 'LINE'
+        self.bandwidth = [1]
+        self.channel_latency = [0]
+        self.operand_offsets = [0, 10 ** 7, 2 * 10 ** 7]
+        self.policy = 'ROUND_ROBIN'
+        self.burst_words = 16
+        self.row_words = 512
+        self.row_miss_latency = 0
+
+        # State of the channels, carried from one round to the next
+        self.open_row = [-1]
+        self.last_served = [-1]
+        self.busy_until = [0]
+
+        # Stats: Per channel
+        self.words_served = [0]
+        self.busy_cycles = [0]
+        self.row_hits = [0]
+        self.row_misses = [0]
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, bandwidth=1, policy='ROUND_ROBIN', burst_words=16, row_words=512, row_miss_latency=0,
+                   num_channels=1, interleaving='LINE', channel_latency=0,
+                   operand_offsets=(0, 10 ** 7, 2 * 10 ** 7)):
+        # bandwidth and channel_latency are one value for all the channels or one value per channel
+        assert num_channels > 0, 'DRAM needs at least one channel'
+        bandwidth = self.get_channel_values(bandwidth, num_channels)
+        channel_latency = self.get_channel_values(channel_latency, num_channels)
+        assert min(bandwidth) > 0, 'DRAM bandwidth should be positive'
+        assert min(channel_latency) >= 0, 'Channel latency cannot be negative'
+        assert policy in ['ROUND_ROBIN', 'FR_FCFS'], 'Invalid arbitration policy: ' + str(policy)
+        assert interleaving in ['LINE', 'PAGE', 'OPERAND'], 'Invalid interleaving: ' + str(interleaving)
+        assert burst_words > 0 and row_words >= burst_words, 'A DRAM row should hold at least one burst'
+        assert row_miss_latency >= 0, 'Row miss latency cannot be negative'
+        assert len(operand_offsets) == 3, 'Need the ifmap, filter and ofmap offsets'
+
+        self.num_channels = num_channels
+        self.interleaving = interleaving
+        self.bandwidth = bandwidth
+        self.channel_latency = channel_latency
+        self.operand_offsets = list(operand_offsets)
+        self.policy = policy
+        self.burst_words = burst_words
+        self.row_words = row_words
+        self.row_miss_latency = row_miss_latency
+
+        self.params_set = True
+        self.reset()
+
+    #
+    @staticmethod
+    def get_channel_values(values, num_channels):
+        if not isinstance(values, (list, tuple)):
+            return [values] * num_channels
+        if len(values) == 1:
+            return list(values) * num_channels
+        assert len(values) == num_channels, 'Need one value for all the channels or one per channel'
+        return list(values)
+
+    #
+    def reset(self):
+        self.open_row = [-1] * self.num_channels
+        self.last_served = [-1] * self.num_channels
+        self.busy_until = [0] * self.num_channels
+
+        self.words_served = [0] * self.num_channels
+        self.busy_cycles = [0] * self.num_channels
+        self.row_hits = [0] * self.num_channels
+        self.row_misses = [0] * self.num_channels
+
+    #
+    def get_channel_addrs(self, addrs):
+        # Channel of every address and its address within that channel
+        addrs = np.asarray(addrs, dtype=np.int64).ravel()
+        unit_words = self.burst_words if self.interleaving == 'LINE' else self.row_words
+        base = np.zeros(addrs.shape, dtype=np.int64)
+        first_channel = np.zeros(addrs.shape, dtype=np.int64)
+        num_groups = 1
+        if self.interleaving == 'OPERAND':
+            # Operand k owns the channels c with c % num_groups == k % num_groups
+            num_groups = min(self.num_channels, 3)
+            offsets = np.asarray(self.operand_offsets, dtype=np.int64)
+            operand_order = np.argsort(offsets, kind='stable')
+            positions = np.searchsorted(offsets[operand_order], addrs, side='right') - 1
+            operands = operand_order[np.maximum(positions, 0)]
+            base = offsets[operands]
+            first_channel = operands % num_groups
+
+        group_size = (self.num_channels - first_channel + num_groups - 1) // num_groups
+        units = (addrs - base) // unit_words
+        channels = first_channel + (units % group_size) * num_groups
+        local_addrs = base + (units // group_size) * unit_words + (addrs - base) % unit_words
+        return channels, local_addrs
+
+    #
+    def get_channel_words(self, addrs):
+        # Words of every channel in a DRAM trace, each valid entry is one word
+        addrs = np.asarray(addrs).ravel()
+        channels, _ = self.get_channel_addrs(addrs[addrs >= 0])
+        return np.bincount(channels, minlength=self.num_channels).tolist()
+
+    #
+    def get_bursts(self, addrs):
+        # (channel, row, words) of the bursts a request is cut into, in address order
+        addrs = np.asarray(addrs).ravel()
+        addrs = np.unique(addrs[addrs >= 0]).astype(np.int64)
+        if addrs.size == 0:
+            return []
+
+        channels, local_addrs = self.get_channel_addrs(addrs)
+        burst_keys = (local_addrs // self.burst_words) * self.num_channels + channels
+        burst_keys, burst_words = np.unique(burst_keys, return_counts=True)
+        channels = burst_keys % self.num_channels
+        rows = (burst_keys // self.num_channels) * self.burst_words // self.row_words
+        return list(zip(channels.tolist(), rows.tolist(), burst_words.tolist()))
+
+    #
+    def pick_request(self, channel, ready, queues, heads, issue_times):
+        if self.policy == 'FR_FCFS':
+            row_hits = [req for req in ready if queues[req][heads[req]][0] == self.open_row[channel]]
+            candidates = row_hits if len(row_hits) > 0 else ready
+            return min(candidates, key=lambda req: (issue_times[req], req))
+
+        # ROUND_ROBIN: the first ready request after the one served last
+        num_requests = len(queues)
+        return min(ready, key=lambda req: (req - self.last_served[channel] - 1) % num_requests)
+
+    #
+    def arbitrate_channel(self, channel, issue_times, queues):
+        # queues[i] are the (row, words) bursts of request i on this channel.
+        # Returns the cycle the last burst of every request is served at, -1 if it has none.
+        heads = [0] * len(queues)
+        served_times = [-1] * len(queues)
+        num_pending = sum([len(queue) for queue in queues])
+
+        now = self.busy_until[channel]
+        while num_pending > 0:
+            pending = [req for req in range(len(queues)) if heads[req] < len(queues[req])]
+            ready = [req for req in pending if issue_times[req] <= now]
+            if len(ready) == 0:
+                now = min([issue_times[req] for req in pending])
+                continue
+
+            req = self.pick_request(channel, ready, queues, heads, issue_times)
+            row, words = queues[req][heads[req]]
+            heads[req] += 1
+            num_pending -= 1
+
+            # A burst is busy for a fraction of a cycle when the channel moves more words than it holds
+            cycles = words / self.bandwidth[channel]
+            if row == self.open_row[channel]:
+                self.row_hits[channel] += 1
+            else:
+                cycles += self.row_miss_latency
+                self.row_misses[channel] += 1
+                self.open_row[channel] = row
+
+            now += cycles
+            served_times[req] = now
+            self.last_served[channel] = req
+            self.words_served[channel] += words
+            self.busy_cycles[channel] += cycles
+
+        self.busy_until[channel] = now
+        return served_times
+
+    #
+    def arbitrate(self, issue_times, requests):
+        # issue_times[i] is the cycle request i is issued at, requests[i] its DRAM word addresses.
+        # Returns the cycle the last word of every request is delivered at (its issue time if it has none).
+        assert self.params_set
+        assert len(issue_times) == len(requests)
+
+        channel_queues = [[[] for _ in requests] for _ in range(self.num_channels)]
+        for req in range(len(requests)):
+            for channel, row, words in self.get_bursts(requests[req]):
+                channel_queues[channel][req] += [(row, words)]
+
+        done_times = list(issue_times)
+        for channel in range(self.num_channels):
+            served_times = self.arbitrate_channel(channel, issue_times, channel_queues[channel])
+            for req in range(len(requests)):
+                if served_times[req] >= 0:
+                    delivered = math.ceil(served_times[req] + self.channel_latency[channel])
+                    done_times[req] = max(done_times[req], delivered)
+
+        return done_times
+
+    #
+    def get_channel_stats(self, channel=0):
+        # Words served, busy cycles, row hits, row misses of one channel
+        return self.words_served[channel], math.ceil(self.busy_cycles[channel]), \
+            self.row_hits[channel], self.row_misses[channel]
+
+    #
+    def get_stats(self):
+        # Words served, busy cycles, row hits, row misses summed over the channels
+        return sum(self.words_served), math.ceil(sum(self.busy_cycles)), sum(self.row_hits), sum(self.row_misses)
@@ -0,0 +1,119 @@
+class ForwardingBuffer:
+    '''
+        The LP hand-off from one pipeline stage to the next. The ofmap SRAM writes of the producer
+        are forwarded over the NoC into the ifmap SRAM of the consumer instead of going to DRAM.
+        The consumer ifmap SRAM holds depth forwarded tiles, the one it reads and the ones waiting.
+        A producer tile is pushed once it is written and the consumer freed the tile depth places
+        before it, until then it waits in the producer ofmap SRAM (back-pressure).
+    '''
+    def __init__(self):
+        # Params
+        self.capacity_words = 1         # Consumer ifmap SRAM
+        self.drain_capacity_words = 1   # Producer ofmap SRAM
+        self.tile_words = 1
+        self.depth = 1
+
+        # Per tile: cycle it was written, pushed into the consumer SRAM and freed by the consumer
+        self.ready_times = {}
+        self.push_times = {}
+        self.free_times = {}
+        self.backpressure_cycles = 0
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, capacity_words=1, tile_words=1, drain_capacity_words=1):
+        assert capacity_words > 0 and drain_capacity_words > 0, 'SRAM capacity should be positive'
+        assert tile_words >= 0, 'Tile words cannot be negative'
+
+        self.capacity_words = capacity_words
+        self.drain_capacity_words = drain_capacity_words
+        self.tile_words = tile_words
+        # A tile larger than the SRAM streams through it, one tile at a time
+        self.depth = max(1, capacity_words // max(tile_words, 1))
+
+        self.params_set = True
+        self.reset()
+
+    #
+    def reset(self):
+        self.ready_times = {}
+        self.push_times = {}
+        self.free_times = {}
+        self.backpressure_cycles = 0
+
+    #
+    def get_depth(self):
+        return self.depth
+
+    #
+    def push(self, tile_id=0, ready_time=0):
+        # Cycle the producer tile enters the consumer SRAM, it was written at ready_time
+        assert self.params_set
+        push_time = max(ready_time, self.free_times.get(tile_id - self.depth, 0))
+        self.ready_times[tile_id] = ready_time
+        self.push_times[tile_id] = push_time
+        self.backpressure_cycles += push_time - ready_time
+        return push_time
+
+    #
+    def get_push_time(self, tile_id=0):
+        return self.push_times.get(tile_id, 0)
+
+    #
+    def get_held_until(self, tile_id=0):
+        # Cycle a tile held back in the producer ofmap SRAM left it, 0 if it was pushed once written
+        push_time = self.push_times.get(tile_id, 0)
+        if push_time > self.ready_times.get(tile_id, 0):
+            return push_time
+        return 0
+
+    #
+    def free(self, tile_id=0, done_time=0):
+        self.free_times[tile_id] = done_time
+
+    #
+    @staticmethod
+    def get_active_frac(capacity_words, in_flight_words):
+        # The part of a double buffered SRAM left active when in_flight_words are held for the hand-off,
+        # within the fractions the scratchpad accepts
+        in_flight_frac = min(in_flight_words, capacity_words) / capacity_words
+        return min(0.99, max(0.5, 1 - in_flight_frac))
+
+    #
+    def get_rd_active_frac(self):
+        # The consumer fills one forwarded tile while it reads the other
+        return self.get_active_frac(self.capacity_words, self.tile_words)
+
+    #
+    def get_wr_active_frac(self):
+        # The producer drains one written tile to the NoC while it writes the next
+        return self.get_active_frac(self.drain_capacity_words, self.tile_words)
+
+    #
+    def get_occupancy(self):
+        # Peak and time averaged words held in the consumer SRAM, from push to free
+        events = [(self.push_times[tile_id], 1) for tile_id in self.push_times if tile_id in self.free_times]
+        events += [(self.free_times[tile_id], -1) for tile_id in self.push_times if tile_id in self.free_times]
+        if len(events) == 0:
+            return 0, 0
+
+        events.sort()
+        num_tiles = 0
+        peak_tiles = 0
+        tile_cycles = 0
+        prev_time = events[0][0]
+        for time, delta in events:
+            tile_cycles += num_tiles * (time - prev_time)
+            num_tiles += delta
+            peak_tiles = max(peak_tiles, num_tiles)
+            prev_time = time
+
+        span = events[-1][0] - events[0][0]
+        avg_tiles = tile_cycles / span if span > 0 else peak_tiles
+        return peak_tiles * self.tile_words, avg_tiles * self.tile_words
+
+    #
+    def get_backpressure_cycles(self):
+        return self.backpressure_cycles
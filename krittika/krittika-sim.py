@@ -16,6 +16,15 @@ if __name__ == '__main__':
         --verbose: Verbosity of the run (Default: True)
         --savetrace: If True then saves the traces (Default: True) 
         --n : Path to network config file
+        --batches: Number of input batches streamed through the LP pipeline (Default: 1)
+        --tenants: Path to tenant config file, co-schedules several workloads (Default: None)
+        --placement: Core placement on the NoC grid: row_major, col_major, snake or auto (Default: network config mapping)
+        --mapping_out: Writes a network config with the core mapping optimized for this run's NoC traffic (Default: None)
+        --tune: Time budget in seconds to jointly tune partitions and dataflows, needs an automatic partition strategy, runs the LS mode (Default: 0, off)
+        --calibration: Samples file of earlier runs, calibrates the partition cost model and collects this run (Default: None)
+        --fuse: If True then activation layers run as post-ops of the conv/gemm before them in layer sequential runs (Default: False)
+        --decode_tokens: Tokens to generate after the transformer_block prompt of -t, writes the per token latency (Default: 0, off)
+        --decode_samples: Decode steps simulated cycle accurately, the others are interpolated (Default: 8)
     '''
 
     sample_wrapper.py_common_bridge_sanity()
@@ -52,6 +61,52 @@ if __name__ == '__main__':
                         help='Flag to indicate if the traces should be saved'
                         )
 
+    parser.add_argument('--batches', metavar='Batches', type=int,
+                        default=1,
+                        help='Number of input batches streamed through the LP pipeline'
+                        )
+
+    parser.add_argument('--tenants', metavar='Tenant config file', type=str,
+                        default='',
+                        help='Path to the tenant config file, -t and -p are ignored when set'
+                        )
+
+    parser.add_argument('--placement', metavar='Core placement', type=str,
+                        default='',
+                        choices=['', 'row_major', 'col_major', 'snake', 'auto'],
+                        help='Placement of the cores on the NoC grid, overrides the mapping in the network config'
+                        )
+
+    parser.add_argument('--mapping_out', metavar='Optimized network config file', type=str,
+                        default='',
+                        help='Path to write the network config with the core mapping optimized for this run'
+                        )
+
+    parser.add_argument('--tune', metavar='Tuning time budget', type=float,
+                        default=0,
+                        help='Seconds to spend tuning partitions and dataflows'
+                        )
+
+    parser.add_argument('--calibration', metavar='Calibration samples file', type=str,
+                        default='',
+                        help='Path to the runtime calibration samples, this run is appended to it'
+                        )
+
+    parser.add_argument('--fuse', metavar='Operator fusion', type=bool,
+                        default=False,
+                        help='Flag to fuse activation layers into the layer producing their input'
+                        )
+
+    parser.add_argument('--decode_tokens', metavar='Decode tokens', type=int,
+                        default=0,
+                        help='Number of tokens to decode after the prompt topology'
+                        )
+
+    parser.add_argument('--decode_samples', metavar='Decode samples', type=int,
+                        default=8,
+                        help='Number of decode steps simulated, the others are interpolated'
+                        )
+
     file_path = os.path.abspath(__file__)
     default_network_config_file = os.path.join(os.path.dirname(file_path), '../configs/network.cfg')
     parser.add_argument('-n', metavar='Network config file', type=str,
@@ -69,6 +124,15 @@ if __name__ == '__main__':
 
     verbosity = args.verbose
     save_traces_flag = args.savetrace
+    num_batches = args.batches
+    tenant_config_file = args.tenants
+    core_placement = args.placement
+    mapping_output_file = args.mapping_out
+    tune_time_budget = args.tune
+    calibration_file = args.calibration
+    fuse_operators = args.fuse
+    decode_tokens = args.decode_tokens
+    decode_samples = args.decode_samples
 
     krittika = Simulator()
     krittika.set_params(
@@ -78,7 +142,16 @@ if __name__ == '__main__':
         custom_partition_filename=partition_file,
         reports_dir_path=logs_top_path,
         verbose=verbosity,
-        save_traces=save_traces_flag
+        save_traces=save_traces_flag,
+        num_batches=num_batches,
+        tenant_config_filename=tenant_config_file,
+        core_placement=core_placement,
+        mapping_output_filename=mapping_output_file,
+        tune_time_budget=tune_time_budget,
+        calibration_filename=calibration_file,
+        fuse_operators=fuse_operators,
+        decode_tokens=decode_tokens,
+        decode_samples=decode_samples
     )
 
     krittika.run()
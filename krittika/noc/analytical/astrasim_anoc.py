@@ -13,6 +13,8 @@ class AstraSimANoC(KrittikaNoC):
         self.mapping_dict = network_config.get_logical_to_physical_mapping()
         self.tracking_id =[]
         self.pushed_in_time =[]
+        # Bytes posted per (logical src, logical dest), input of the placement optimizer
+        self.traffic_matrix = {}
         # TODO5REE: Too much repetition, move it to a logger class
         self.logging_level = logging.CRITICAL
         self.logger = logging.getLogger(__name__ + "." + self.__class__.__name__)
@@ -49,6 +51,7 @@ class AstraSimANoC(KrittikaNoC):
         sample_wrapper.py_noc_setup(file_path_str)
 
     def post(self, clk, src, dest, data_size) -> int:
+        self.traffic_matrix[(src, dest)] = self.traffic_matrix.get((src, dest), 0) + data_size
 
         if self.mapping_en:
             physical_src = self.mapping_dict[src]
@@ -85,3 +88,9 @@ class AstraSimANoC(KrittikaNoC):
             physical_dest = dest
         
         return sample_wrapper.py_get_static_latency(physical_src, physical_dest, size)
+
+    def get_traffic_matrix(self):
+        return self.traffic_matrix
+
+    def reset_traffic_matrix(self):
+        self.traffic_matrix = {}
@@ -0,0 +1,193 @@
+import math
+import random
+
+from krittika.config.network_config import NetworkConfig
+
+
+class PlacementOptimizer:
+    '''
+        Searches for the logical to physical core mapping which minimises the
+        traffic weighted hop count of a run. The traffic comes from the NoC posts
+        of the run (bytes per logical src -> dest), the hop counts from the topology
+        of the network config. Greedy pairwise swaps are followed by simulated annealing.
+    '''
+    def __init__(self):
+        # Member objects
+        self.network_config_obj = NetworkConfig()
+
+        # Params
+        self.traffic_matrix = {}
+        self.num_nodes = 1
+        self.num_iterations = 2000
+        self.initial_temperature = 1.0
+        self.cooling_rate = 0.995
+        self.seed = 0
+
+        # State
+        self.initial_mapping = {}
+        self.initial_cost = 0
+        self.best_mapping = {}
+        self.best_cost = 0
+
+        # Flags
+        self.params_set = False
+        self.optimization_done = False
+
+    #
+    def set_params(self, network_config_obj=NetworkConfig(), traffic_matrix=None,
+                   num_iterations=2000, initial_temperature=1.0, cooling_rate=0.995, seed=0):
+        # traffic_matrix: {(logical src, logical dest): bytes}
+        assert traffic_matrix is not None, 'Please provide the traffic matrix of a run'
+        assert num_iterations >= 0, 'Number of iterations cannot be negative'
+        assert 0 < cooling_rate < 1, 'Cooling rate should be between 0 and 1'
+
+        self.network_config_obj = network_config_obj
+        self.traffic_matrix = traffic_matrix
+        self.num_nodes = self.get_num_physical_nodes()
+        self.num_iterations = num_iterations
+        self.initial_temperature = initial_temperature
+        self.cooling_rate = cooling_rate
+        self.seed = seed
+
+        for src, dest in traffic_matrix:
+            assert 0 <= src < self.num_nodes and 0 <= dest < self.num_nodes, \
+                'Traffic between ' + str(src) + ' and ' + str(dest) + ' is outside the network'
+
+        self.params_set = True
+        self.optimization_done = False
+
+    #
+    def get_num_physical_nodes(self):
+        topology = self.network_config_obj.topology[0]
+        if topology == 'Mesh':
+            return self.network_config_obj.rows[0] * self.network_config_obj.cols[0]
+        return self.network_config_obj.npus_count[0]
+
+    #
+    def get_hop_count(self, src=0, dest=0):
+        # Hops between two physical nodes on the first dimension of the network
+        if src == dest:
+            return 0
+
+        topology = self.network_config_obj.topology[0]
+        if topology == 'Ring':
+            dist = abs(src - dest)
+            return min(dist, self.num_nodes - dist)
+        elif topology == 'Mesh':
+            cols = self.network_config_obj.cols[0]
+            return abs(src // cols - dest // cols) + abs(src % cols - dest % cols)
+        elif topology == 'HyperCube':
+            return bin(src ^ dest).count('1')
+        elif topology == 'Switch':
+            return 2    # Up to the switch and back down
+        else:   # FullyConnected, Bus
+            return 1
+
+    #
+    def get_mapping_cost(self, mapping):
+        cost = 0
+        for (src, dest), num_bytes in self.traffic_matrix.items():
+            cost += num_bytes * self.get_hop_count(mapping[src], mapping[dest])
+        return cost
+
+    #
+    def get_start_mapping(self):
+        # The mapping in the network config if it is a valid permutation, the identity otherwise
+        mapping = self.network_config_obj.get_logical_to_physical_mapping()
+        if self.network_config_obj.get_mapping_en() and len(mapping) == self.num_nodes:
+            try:
+                self.validate_mapping(mapping, self.num_nodes)
+                return dict(mapping)
+            except ValueError:
+                pass
+
+        return {node_id: node_id for node_id in range(self.num_nodes)}
+
+    #
+    def optimize(self):
+        assert self.params_set
+
+        rng = random.Random(self.seed)
+        mapping = self.get_start_mapping()
+        self.initial_mapping = dict(mapping)
+        self.initial_cost = self.get_mapping_cost(mapping)
+
+        mapping, cost = self.run_greedy_swaps(mapping, self.initial_cost)
+        best_mapping, best_cost = dict(mapping), cost
+
+        # Simulated annealing on random swaps to get out of the local minimum
+        temperature = self.initial_temperature * max(cost, 1)
+        for _ in range(self.num_iterations):
+            if self.num_nodes < 2:
+                break
+            a, b = rng.sample(range(self.num_nodes), 2)
+            self.swap(mapping, a, b)
+            new_cost = self.get_mapping_cost(mapping)
+
+            delta = new_cost - cost
+            if delta <= 0 or (temperature > 0 and rng.random() < math.exp(-delta / temperature)):
+                cost = new_cost
+                if cost < best_cost:
+                    best_mapping, best_cost = dict(mapping), cost
+            else:
+                self.swap(mapping, a, b)
+
+            temperature *= self.cooling_rate
+
+        self.best_mapping, self.best_cost = self.run_greedy_swaps(best_mapping, best_cost)
+        self.validate_mapping(self.best_mapping, self.num_nodes)
+        self.optimization_done = True
+
+        return self.best_mapping
+
+    #
+    def run_greedy_swaps(self, mapping, cost):
+        # Applies the best improving swap until no swap improves the cost
+        improved = True
+        while improved:
+            improved = False
+            best_swap = None
+            best_swap_cost = cost
+            for a in range(self.num_nodes):
+                for b in range(a + 1, self.num_nodes):
+                    self.swap(mapping, a, b)
+                    new_cost = self.get_mapping_cost(mapping)
+                    self.swap(mapping, a, b)
+                    if new_cost < best_swap_cost:
+                        best_swap_cost = new_cost
+                        best_swap = (a, b)
+
+            if best_swap is not None:
+                self.swap(mapping, best_swap[0], best_swap[1])
+                cost = best_swap_cost
+                improved = True
+
+        return mapping, cost
+
+    #
+    @staticmethod
+    def swap(mapping, a, b):
+        mapping[a], mapping[b] = mapping[b], mapping[a]
+
+    #
+    @staticmethod
+    def validate_mapping(mapping, num_nodes):
+        if sorted(mapping.keys()) != list(range(num_nodes)):
+            raise ValueError(f"Mapping should cover the logical cores 0 to {num_nodes - 1}")
+        if sorted(mapping.values()) != list(range(num_nodes)):
+            raise ValueError(f"Mapping is not a permutation of the physical cores: {mapping}")
+
+    #
+    def get_best_mapping(self):
+        assert self.optimization_done
+        return self.best_mapping
+
+    #
+    def get_best_cost(self):
+        assert self.optimization_done
+        return self.best_cost
+
+    #
+    def get_initial_cost(self):
+        assert self.optimization_done
+        return self.initial_cost
@@ -0,0 +1,47 @@
+import unittest
+from krittika.config.network_config import NetworkConfig
+from krittika.noc.placement_optimizer import PlacementOptimizer
+
+
+class TestPlacementOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.network_config = NetworkConfig()
+        self.network_config.topology = ['Mesh']
+        self.network_config.npus_count = [8]
+        self.network_config.rows = [4]
+        self.network_config.cols = [2]
+
+        # LP chain 0 -> 1 -> ... -> 7
+        self.chain_traffic = {(i, i + 1): 100 for i in range(7)}
+
+    def test_mesh_hops(self):
+        optimizer = PlacementOptimizer()
+        optimizer.set_params(network_config_obj=self.network_config, traffic_matrix={})
+        self.assertEqual(optimizer.get_hop_count(0, 7), 4)
+        self.assertEqual(optimizer.get_hop_count(2, 3), 1)
+        self.assertEqual(optimizer.get_hop_count(5, 5), 0)
+
+    def test_chain_is_one_hop_per_link(self):
+        optimizer = PlacementOptimizer()
+        optimizer.set_params(network_config_obj=self.network_config, traffic_matrix=self.chain_traffic)
+        mapping = optimizer.optimize()
+
+        PlacementOptimizer.validate_mapping(mapping, 8)
+        self.assertEqual(optimizer.get_initial_cost(), 1000)
+        self.assertEqual(optimizer.get_best_cost(), 700)
+
+    def test_starts_from_config_mapping(self):
+        self.network_config.set_logical_to_physical_mapping({0: 0, 1: 7, 2: 1, 3: 6, 4: 2, 5: 5, 6: 3, 7: 4})
+        optimizer = PlacementOptimizer()
+        optimizer.set_params(network_config_obj=self.network_config, traffic_matrix=self.chain_traffic,
+                             num_iterations=0)
+        optimizer.optimize()
+        self.assertGreater(optimizer.get_initial_cost(), optimizer.get_best_cost())
+
+    def test_invalid_mapping(self):
+        with self.assertRaises(ValueError):
+            PlacementOptimizer.validate_mapping({0: 0, 1: 0}, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,9 +9,19 @@ class PartitionManager:
     def __init__(self):
         self.partition_table_cols = ['LayerID', 'InputParts', 'FilterParts', 'ComputeUnit', 'Dataflow']
         self.partition_table = []
+        self.layer_core_types = {}
+        # Core groups the instances of a batched or grouped layer are spread over, 1 if not listed
+        self.layer_instance_parts = {}
+        # User tables whose layer ids repeat are taken one row per layer, in order
+        self.positional_rows = False
         self.config = KrittikaConfig()
         self.workload = topologies()
 
+        # Score the partitions with the SRAM capacity and interface bandwidth as well
+        self.memory_aware_cost = True
+        # Calibrated estimator (RuntimeEstimator) which replaces the analytical models when set
+        self.runtime_estimator = None
+
         # Flags
         self.params_valid = False
         self.partition_table_valid = False
@@ -28,8 +38,15 @@ class PartitionManager:
     #
     def create_partition_table(self):
         partition_mode = self.config.get_partition_mode()
+        # The table is built again when the workload changes (decode steps)
+        self.partition_table = []
+        self.layer_core_types = {}
+        self.layer_instance_parts = {}
+        self.positional_rows = False
 
-        if partition_mode == 'IFMAP':
+        if self.config.is_heterogeneous():
+            self.create_opt_heterogeneous_part_table()
+        elif partition_mode == 'IFMAP':
             self.create_opt_ifmap_part_table()
         elif partition_mode == 'FILTER':
             self.create_opt_filter_part_table()
@@ -44,17 +61,18 @@ class PartitionManager:
     def create_opt_auto_part_table(self):
         num_cores = self.config.get_num_cores()
         num_layers = self.workload.get_num_layers()
-        partitions_list = StaticUtilities.get_factors_as_pairs(num_cores)
+        partitions_list = StaticUtilities.get_partition_candidates(num_cores,
+                                                                   self.config.get_partition_min_core_util())
         dataflow_list = ['os', 'is', 'ws']
         layer_params = self.workload.get_layer_params()
         for lid in range(num_layers):
-            layer_params = self.workload.get_layer_params(lid)
-            if (layer_params[0] in ['conv', 'gemm']):
+            if self.workload.is_matmul_layer(lid):
                 opt_unit, opt_dataflow, input_parts, filter_parts \
                     = self.search_layer_opt_config( layer_id=lid,
                                                 part_list=partitions_list,
                                                 matmul_dataflow_list=dataflow_list,
-                                                vec_dataflow_list=dataflow_list
+                                                vec_dataflow_list=dataflow_list,
+                                                search_instance_parts=True
                                                 )
 
                 entry = [lid, input_parts, filter_parts, opt_unit, opt_dataflow]
@@ -64,18 +82,19 @@ class PartitionManager:
     def create_opt_const_df_part_table(self):
         num_cores = self.config.get_num_cores()
         num_layers = self.workload.get_num_layers()
-        partitions_list = StaticUtilities.get_factors_as_pairs(num_cores)
+        partitions_list = StaticUtilities.get_partition_candidates(num_cores,
+                                                                   self.config.get_partition_min_core_util())
         matmul_dataflow_list = [self.config.get_matmul_dataflow()]
         vector_dataflow_list = [self.config.get_vector_dataflow()]
 
         for lid in range(num_layers):
-            layer_params = self.workload.get_layer_params(lid)
-            if (layer_params[0] in ['conv', 'gemm']):
+            if self.workload.is_matmul_layer(lid):
                 opt_unit, opt_dataflow, input_parts, filter_parts \
                     = self.search_layer_opt_config( layer_id=lid,
                                                 part_list=partitions_list,
                                                 matmul_dataflow_list=matmul_dataflow_list,
-                                                vec_dataflow_list=vector_dataflow_list
+                                                vec_dataflow_list=vector_dataflow_list,
+                                                search_instance_parts=True
                                                 )
 
                 entry = [lid, input_parts, filter_parts, opt_unit, opt_dataflow]
@@ -90,8 +109,7 @@ class PartitionManager:
         vector_dataflow_list = [self.config.get_vector_dataflow()]
 
         for lid in range(num_layers):
-            layer_params = self.workload.get_layer_params(lid)
-            if (layer_params[0] in ['conv', 'gemm']):
+            if self.workload.is_matmul_layer(lid):
                 opt_unit, opt_dataflow, input_parts, filter_parts \
                     = self.search_layer_opt_config(layer_id=lid,
                                                part_list=partitions_list,
@@ -111,8 +129,7 @@ class PartitionManager:
         vector_dataflow_list = [self.config.get_vector_dataflow()]
 
         for lid in range(num_layers):
-            layer_params = self.workload.get_layer_params(lid)
-            if (layer_params[0] in ['conv', 'gemm']):
+            if self.workload.is_matmul_layer(lid):
                 opt_unit, opt_dataflow, input_parts, filter_parts \
                     = self.search_layer_opt_config(layer_id=lid,
                                                part_list=partitions_list,
@@ -123,57 +140,161 @@ class PartitionManager:
             entry = [lid, input_parts, filter_parts, opt_unit, opt_dataflow]
             self.partition_table += [entry]
 
+    #
+    def create_opt_heterogeneous_part_table(self):
+        # Every layer goes to the core type with the lowest analytical runtime,
+        # partitioned over the cores of that type
+        partition_mode = self.config.get_partition_mode()
+        num_layers = self.workload.get_num_layers()
+
+        for lid in range(num_layers):
+            if self.workload.is_matmul_layer(lid):
+                opt_runtime = 10 ** 10
+                opt_entries = []
+                opt_core_type = ''
+                for type_name in self.config.get_core_type_names():
+                    type_config = self.config.get_core_type_config(type_name)
+                    use_matmul, use_vector = type_config.get_compute_unit_valids()
+                    if not (use_matmul or use_vector):
+                        continue    # SIMD only cores cannot run conv and gemm layers
+
+                    num_cores = len(self.config.get_cores_of_type(type_name))
+                    if partition_mode == 'IFMAP':
+                        partitions_list = [[num_cores, 1]]
+                    elif partition_mode == 'FILTER':
+                        partitions_list = [[1, num_cores]]
+                    else:
+                        partitions_list = StaticUtilities.get_partition_candidates(
+                            num_cores, self.config.get_partition_min_core_util())
+
+                    if partition_mode == 'AUTO':
+                        matmul_dataflow_list = ['os', 'is', 'ws']
+                        vector_dataflow_list = ['os', 'is', 'ws']
+                    else:
+                        matmul_dataflow_list = [type_config.matmul_default_dataflow]
+                        vector_dataflow_list = [type_config.vector_default_dataflow]
+
+                    runtime, entries = self.search_layer_opt_runtime(layer_id=lid,
+                                                                     part_list=partitions_list,
+                                                                     matmul_dataflow_list=matmul_dataflow_list,
+                                                                     vec_dataflow_list=vector_dataflow_list,
+                                                                     config_obj=type_config)
+                    if runtime < opt_runtime:
+                        opt_runtime = runtime
+                        opt_entries = entries
+                        opt_core_type = type_name
+
+                assert opt_core_type != '', 'No core type can run layer ' + str(lid)
+                opt_unit, opt_dataflow, input_parts, filter_parts = opt_entries
+
+                entry = [lid, input_parts, filter_parts, opt_unit, opt_dataflow]
+                self.partition_table += [entry]
+                self.layer_core_types[lid] = opt_core_type
+
     #
     def search_layer_opt_config(self, layer_id=0, part_list=None,
-                                matmul_dataflow_list=None, vec_dataflow_list=None):
+                                matmul_dataflow_list=None, vec_dataflow_list=None,
+                                search_instance_parts=False):
+        if search_instance_parts and self.workload.get_layer_num_instances(layer_id) > 1:
+            _, opt_part_entries, instance_parts = \
+                self.search_instance_layer_opt_runtime(layer_id=layer_id,
+                                                       matmul_dataflow_list=matmul_dataflow_list,
+                                                       vec_dataflow_list=vec_dataflow_list)
+            self.layer_instance_parts[layer_id] = instance_parts
+            return opt_part_entries
+
+        _, opt_part_entries = self.search_layer_opt_runtime(layer_id=layer_id, part_list=part_list,
+                                                            matmul_dataflow_list=matmul_dataflow_list,
+                                                            vec_dataflow_list=vec_dataflow_list)
+        return opt_part_entries
+
+    #
+    def search_instance_layer_opt_runtime(self, layer_id=0, matmul_dataflow_list=None, vec_dataflow_list=None):
+        # The instances of a batched or grouped layer are an extra partition axis. The cores are
+        # split into instance_parts groups, each group runs its share of the instances one after
+        # another with the input and filter parts of one instance over the cores of the group.
+        num_cores = self.config.get_num_cores()
+        num_instances = self.workload.get_layer_num_instances(layer_id)
+
+        opt_runtime = 10 ** 10
+        opt_part_entries = []
+        opt_instance_parts = 1
+        for instance_parts in range(1, min(num_cores, num_instances) + 1):
+            group_cores = num_cores // instance_parts
+            if instance_parts * group_cores < self.config.get_partition_min_core_util() * num_cores:
+                continue
+
+            part_list = StaticUtilities.get_partition_candidates(group_cores,
+                                                                 self.config.get_partition_min_core_util())
+            runtime, part_entries = self.search_layer_opt_runtime(layer_id=layer_id, part_list=part_list,
+                                                                  matmul_dataflow_list=matmul_dataflow_list,
+                                                                  vec_dataflow_list=vec_dataflow_list)
+            runtime *= math.ceil(num_instances / instance_parts)
+            if runtime < opt_runtime:
+                opt_runtime = runtime
+                opt_part_entries = part_entries
+                opt_instance_parts = instance_parts
+
+        return opt_runtime, opt_part_entries, opt_instance_parts
+
+    #
+    def search_layer_opt_runtime(self, layer_id=0, part_list=None,
+                                 matmul_dataflow_list=None, vec_dataflow_list=None,
+                                 config_obj=None):
+        # Returns the best runtime and [unit, dataflow, input parts, filter parts] for the
+        # units of config_obj (the global config if None)
         assert not layer_id < 0
         assert part_list is not None
+        if config_obj is None:
+            config_obj = self.config
 
         opt_matmul_part_entries = []
         opt_vector_part_entries = []
         opt_matmul_runtime = 10 ** 10
         opt_vector_runtime = 10 ** 10
 
-        use_matmul, use_vector = self.config.get_compute_unit_valids()
+        use_matmul, use_vector = config_obj.get_compute_unit_valids()
         if use_matmul:
             assert matmul_dataflow_list is not None
             opt_matmul_runtime, opt_matmul_part_entries =  \
                 self.search_matmul_layer_opt_config(layer_id=layer_id, part_list=part_list,
-                                                    dataflow_list=matmul_dataflow_list)
+                                                    dataflow_list=matmul_dataflow_list,
+                                                    config_obj=config_obj)
 
         if use_vector:
             assert vec_dataflow_list is not None
             opt_vector_runtime, opt_vector_part_entries = \
                 self.search_vector_layer_opt_config(layer_id=layer_id, part_list=part_list,
-                                                    dataflow_list=vec_dataflow_list)
+                                                    dataflow_list=vec_dataflow_list,
+                                                    config_obj=config_obj)
 
         if use_matmul and use_vector:
             if opt_matmul_runtime < opt_vector_runtime:
-                return opt_matmul_part_entries
+                return opt_matmul_runtime, opt_matmul_part_entries
             else:
-                return opt_vector_part_entries
+                return opt_vector_runtime, opt_vector_part_entries
         elif use_matmul:
-            return opt_matmul_part_entries
+            return opt_matmul_runtime, opt_matmul_part_entries
         else:
-            return opt_vector_part_entries
+            return opt_vector_runtime, opt_vector_part_entries
 
     #
-    def search_matmul_layer_opt_config(self, layer_id=0, part_list=None, dataflow_list=None):
+    def search_matmul_layer_opt_config(self, layer_id=0, part_list=None, dataflow_list=None, config_obj=None):
         min_runtime = 10 ** 10
         M, N, K = self.workload.get_transformed_mnk_dimensions(layer_id)
 
-        arr_row, arr_col = self.config.get_matmul_dims()
+        if config_obj is None:
+            config_obj = self.config
+        arr_row, arr_col = self.get_array_dims(config_obj, 'matmul')
 
         opt_df = 'os'
         opt_input_part = 1
         opt_filter_part = 1
 
-        for part_pair in part_list:
-            input_part = part_pair[0]
-            filter_part = part_pair[1]
-
-            for df in dataflow_list:
-                runtime = self.get_mat_mul_analytical_runtime(M, N, K, df, arr_row, arr_col, input_part, filter_part)
+        for df in dataflow_list:
+            for input_part, filter_part in self.get_df_part_list(part_list, M, N, df, arr_row, arr_col):
+                runtime = self.get_layer_runtime(M, N, K, df, arr_row, arr_col, input_part, filter_part,
+                                                 config_obj=config_obj)
 
                 if runtime < min_runtime:
                     min_runtime = runtime
@@ -184,28 +305,22 @@ class PartitionManager:
         return min_runtime, ['matmul', opt_df, opt_input_part, opt_filter_part]
 
     #
-    def search_vector_layer_opt_config(self, layer_id=0, part_list=None, dataflow_list=None):
+    def search_vector_layer_opt_config(self, layer_id=0, part_list=None, dataflow_list=None, config_obj=None):
         min_runtime = 10 ** 10
         M, N, K = self.workload.get_transformed_mnk_dimensions(layer_id)
 
-        num_vec_units = self.config.get_vector_dim()
+        if config_obj is None:
+            config_obj = self.config
 
         opt_df = 'os'
         opt_input_part = 1
         opt_filter_part = 1
 
-        for part_pair in part_list:
-            input_part = part_pair[0]
-            filter_part = part_pair[1]
-
-            for df in dataflow_list:
-                if df == 'os' or df == 'is':
-                    arr_row, arr_col = [num_vec_units, 1]
-                else:   # df == 'ws':
-                    arr_row, arr_col = [1, num_vec_units]
-
-                runtime = self.get_mat_mul_analytical_runtime(M, N, K, df, arr_row, arr_col, input_part,
-                                                              filter_part)
+        for df in dataflow_list:
+            arr_row, arr_col = self.get_array_dims(config_obj, 'vector', df)
+            for input_part, filter_part in self.get_df_part_list(part_list, M, N, df, arr_row, arr_col):
+                runtime = self.get_layer_runtime(M, N, K, df, arr_row, arr_col, input_part, filter_part,
+                                                 config_obj=config_obj)
 
                 if runtime < min_runtime:
                     min_runtime = runtime
@@ -215,13 +330,61 @@ class PartitionManager:
 
         return min_runtime, ['vector', opt_df, opt_input_part, opt_filter_part]
 
+    #
+    def get_layer_runtime(self, M=1, N=1, K=1, df='os',
+                          arr_row=1, arr_col=1,
+                          input_part=1, filt_part=1,
+                          config_obj=None):
+        # Runtime used to rank the partitions, memory aware unless disabled
+        if config_obj is None:
+            config_obj = self.config
+
+        if self.runtime_estimator is not None:
+            sram_words = [kb * 1024 for kb in config_obj.get_per_unit_sram_sizes_kb()]
+            bandwidths = [0, 0, 0]
+            if config_obj.get_bandwidth_use_mode() == 'USER':
+                bandwidths = config_obj.get_interface_bandwidths()
+            return self.runtime_estimator.get_runtime(M, N, K, df, arr_row, arr_col, input_part, filt_part,
+                                                      sram_words=sram_words, bandwidths=bandwidths)
+
+        if not self.memory_aware_cost or config_obj.get_bandwidth_use_mode() != 'USER':
+            # In CALC mode the bandwidth is sized to the demand, only compute matters
+            return self.get_mat_mul_analytical_runtime(M, N, K, df, arr_row, arr_col, input_part, filt_part)
+
+        sram_words = [kb * 1024 for kb in config_obj.get_per_unit_sram_sizes_kb()]
+        bandwidths = config_obj.get_interface_bandwidths()
+        return self.get_mat_mul_memory_aware_runtime(M, N, K, df, arr_row, arr_col, input_part, filt_part,
+                                                     sram_words=sram_words, bandwidths=bandwidths)
+
+    #
+    def set_runtime_estimator(self, runtime_estimator=None):
+        self.runtime_estimator = runtime_estimator
+
+    #
+    def get_df_part_list(self, part_list, M=1, N=1, df='os', arr_row=1, arr_col=1):
+        # Drops the pairs with more parts than the dataflow can keep the arrays busy with,
+        # these would be evaluated with merged parts but run with all of them
+        max_input_part, max_filter_part = self.get_max_parts(M, N, df, arr_row, arr_col)
+        pruned = StaticUtilities.prune_part_candidates(part_list, max_input_part, max_filter_part)
+        if len(pruned) == 0:
+            return part_list
+        return pruned
+
     #
     @staticmethod
-    def get_mat_mul_analytical_runtime(M=1, N=1, K=1, df='os',
-                                       arr_row=1, arr_col=1,
-                                       input_part=1, filt_part=1):
-        assert df in ['os', 'is', 'ws']
+    def get_array_dims(config_obj, unit='matmul', df='os'):
+        # Rows and cols the layer is mapped on, a vector unit is a column (os, is) or a row (ws)
+        if unit == 'matmul':
+            return config_obj.get_matmul_dims()
+
+        num_vec_units = config_obj.get_vector_dim()
+        if df == 'ws':
+            return 1, num_vec_units
+        return num_vec_units, 1
 
+    #
+    @staticmethod
+    def get_max_parts(M=1, N=1, df='os', arr_row=1, arr_col=1):
         if df == 'os':
             max_input_part = math.floor(M/arr_row)
             max_filter_part = math.floor(N/arr_col)
@@ -234,12 +397,92 @@ class PartitionManager:
             max_input_part = math.floor(M/arr_col)
             max_filter_part = N
 
+        return max(1, max_input_part), max(1, max_filter_part)
+
+    #
+    @staticmethod
+    def get_part_dims(M=1, N=1, df='os', arr_row=1, arr_col=1, input_part=1, filt_part=1):
+        # Rows and cols of one part, parts which would leave the array idle are merged
+        max_input_part, max_filter_part = PartitionManager.get_max_parts(M, N, df, arr_row, arr_col)
+
         input_part = min(max_input_part, input_part)
         filter_part = min(max_filter_part, filt_part)
 
         Mprime = math.ceil(M/input_part)
         Nprime = math.ceil(N/filter_part)
 
+        return Mprime, Nprime
+
+    #
+    @staticmethod
+    def get_mat_mul_memory_aware_runtime(M=1, N=1, K=1, df='os',
+                                         arr_row=1, arr_col=1,
+                                         input_part=1, filt_part=1,
+                                         sram_words=(1, 1, 1), bandwidths=(1, 1, 1)):
+        # Roofline over the compute runtime and the DRAM traffic of one part.
+        # Every operand is fetched once when it fits in half of its (double buffered) SRAM.
+        # Otherwise the part that does not fit is fetched again for every fold which
+        # reuses the operand. The operands use their own interfaces in parallel.
+        compute_runtime = PartitionManager.get_mat_mul_analytical_runtime(M, N, K, df, arr_row, arr_col,
+                                                                          input_part, filt_part)
+        dram_words = PartitionManager.get_part_dram_words(M, N, K, df, arr_row, arr_col,
+                                                          input_part, filt_part, sram_words)
+
+        memory_runtime = 0
+        for words, bw in zip(dram_words, bandwidths):
+            memory_runtime = max(memory_runtime, math.ceil(words / bw))
+
+        return max(compute_runtime, memory_runtime)
+
+    #
+    @staticmethod
+    def get_part_dram_words(M=1, N=1, K=1, df='os',
+                            arr_row=1, arr_col=1,
+                            input_part=1, filt_part=1,
+                            sram_words=(1, 1, 1)):
+        # Returns the ifmap, filter and ofmap DRAM words of one part
+        Mprime, Nprime = PartitionManager.get_part_dims(M, N, df, arr_row, arr_col, input_part, filt_part)
+
+        ifmap_words = Mprime * K
+        filter_words = K * Nprime
+        ofmap_words = Mprime * Nprime
+
+        # Number of folds that use each operand again
+        if df == 'os':
+            ifmap_reuse = math.ceil(Nprime / arr_col)
+            filter_reuse = math.ceil(Mprime / arr_row)
+            ofmap_reuse = 1
+        elif df == 'ws':
+            ifmap_reuse = math.ceil(Nprime / arr_col)
+            filter_reuse = 1
+            ofmap_reuse = math.ceil(K / arr_row)     # Partial sums across the K folds
+        else: # df == 'is'
+            ifmap_reuse = 1
+            filter_reuse = math.ceil(Mprime / arr_col)
+            ofmap_reuse = math.ceil(K / arr_row)
+
+        dram_words = []
+        for words, reuse, sram in zip([ifmap_words, filter_words, ofmap_words],
+                                      [ifmap_reuse, filter_reuse, ofmap_reuse],
+                                      sram_words):
+            capacity = sram / 2
+            if words <= capacity or reuse == 1:
+                dram_words += [words]
+            else:
+                spill_frac = (words - capacity) / words
+                dram_words += [words * (1 + (reuse - 1) * spill_frac)]
+
+        return dram_words
+
+    #
+    @staticmethod
+    def get_mat_mul_analytical_runtime(M=1, N=1, K=1, df='os',
+                                       arr_row=1, arr_col=1,
+                                       input_part=1, filt_part=1):
+        assert df in ['os', 'is', 'ws']
+
+        Mprime, Nprime = PartitionManager.get_part_dims(M, N, df, arr_row, arr_col, input_part, filt_part)
+
         if df == 'os':
             Sr, Sc, T = [Mprime, Nprime, K]
         elif df == 'ws':
@@ -252,11 +495,24 @@ class PartitionManager:
 
         return runtime
 
+    #
+    def set_partition_table(self, partition_table=None):
+        # Entries follow partition_table_cols, eg. a table searched outside the partitioner
+        assert partition_table is not None and len(partition_table) > 0, 'Partition table is empty'
+        for entry in partition_table:
+            assert len(entry) == len(self.partition_table_cols), 'Invalid partition table entry ' + str(entry)
+            assert entry[3] in ['matmul', 'vector']
+            assert entry[4] in ['os', 'ws', 'is']
+
+        self.partition_table = [list(entry) for entry in partition_table]
+        self.positional_rows = False
+        self.partition_table_valid = True
+
     #
     def get_layer_partitions(self, layer_id=0):
         assert self.partition_table_valid, 'Partition table is not valid'
 
-        partition_data = self.partition_table[layer_id]
+        partition_data = self.get_layer_entry(layer_id)
         input_part = partition_data[1]
         filter_part = partition_data[2]
 
@@ -266,14 +522,73 @@ class PartitionManager:
     def get_opt_compute_params(self, layer_id=0):
         assert self.partition_table_valid, 'Partition table is not valid'
 
-        partition_data = self.partition_table[layer_id]
+        partition_data = self.get_layer_entry(layer_id)
         opt_compute_unit = partition_data[3]
         opt_dataflow = partition_data[4]
         return opt_compute_unit, opt_dataflow
 
     #
-    def read_user_partition_table(self, filename=''):
+    def get_layer_entry(self, layer_id=0):
+        # Only conv and gemm layers have entries, so the table is searched by layer id.
+        # User tables without usable ids are taken one row per layer, as they are written.
+        if self.positional_rows:
+            assert layer_id < len(self.partition_table), 'No partition entry for layer ' + str(layer_id)
+            return self.partition_table[layer_id]
 
+        for entry in self.partition_table:
+            if entry[0] == layer_id:
+                return entry
+        assert False, 'No partition entry for layer ' + str(layer_id)
+
+    #
+    def get_layer_instance_parts(self, layer_id=0):
+        return self.layer_instance_parts.get(layer_id, 1)
+
+    #
+    def get_layer_instances_per_part(self, layer_id=0, single_core=False):
+        # Instances one core runs back to back, all of them when the layer has a single core (LP)
+        num_instances = self.workload.get_layer_num_instances(layer_id)
+        if single_core:
+            return num_instances
+        return math.ceil(num_instances / self.get_layer_instance_parts(layer_id))
+
+    #
+    def get_layer_core_type(self, layer_id=0):
+        assert self.partition_table_valid, 'Partition table is not valid'
+        return self.layer_core_types.get(layer_id, 'default')
+
+    #
+    def get_core_type_compute_params(self, layer_id=0, type_name='default'):
+        # Unit and dataflow of the layer run whole on one core of type_name, eg. an LP stage
+        # pinned to its core. The table entry is kept when it was picked for that core type.
+        if self.get_layer_core_type(layer_id) == type_name:
+            return self.get_opt_compute_params(layer_id)
+
+        type_config = self.config.get_core_type_config(type_name)
+        use_matmul, use_vector = type_config.get_compute_unit_valids()
+        assert use_matmul or use_vector, 'Core type ' + type_name + ' cannot run layer ' + str(layer_id)
+
+        if self.config.get_partition_mode() == 'AUTO':
+            matmul_dataflow_list = ['os', 'is', 'ws']
+            vector_dataflow_list = ['os', 'is', 'ws']
+        else:
+            matmul_dataflow_list = [type_config.matmul_default_dataflow]
+            vector_dataflow_list = [type_config.vector_default_dataflow]
+
+        _, opt_entries = self.search_layer_opt_runtime(layer_id=layer_id, part_list=[[1, 1]],
+                                                       matmul_dataflow_list=matmul_dataflow_list,
+                                                       vec_dataflow_list=vector_dataflow_list,
+                                                       config_obj=type_config)
+        return opt_entries[0], opt_entries[1]
+
+    #
+    def get_layer_cores(self, layer_id=0):
+        # Core ids the parts of this layer are mapped to, in part order
+        return self.config.get_cores_of_type(self.get_layer_core_type(layer_id))
+
+    #
+    def read_user_partition_table(self, filename=''):
+        # An optional sixth column names the core type of the layer on heterogeneous chips
         f = open(filename, 'r')
         first = True
 
@@ -282,6 +597,11 @@ class PartitionManager:
                 first = False
             else:
                 elems = row.strip().split(',')
+                core_type = ''
+                if len(elems) == len(self.partition_table_cols) + 1:
+                    core_type = elems[-1].strip()
+                    elems = elems[:-1]
+
                 entry = [int(e.strip()) for e in elems[0:-2]]
                 df = elems[-1].strip()
                 unit = elems[-2].strip()
@@ -290,8 +610,13 @@ class PartitionManager:
 
                 entry += [unit, df]
 
+                if core_type != '':
+                    self.layer_core_types[entry[0]] = core_type
                 self.partition_table += [entry]
+        f.close()
 
+        layer_ids = [entry[0] for entry in self.partition_table]
+        self.positional_rows = len(set(layer_ids)) < len(layer_ids)
         self.partition_table_valid = True
 
     #
@@ -300,12 +625,17 @@ class PartitionManager:
 
         f = open(filename, 'w')
 
-        header = ', '.join(self.partition_table_cols) + '\n'
-        f.write(header)
+        write_core_types = len(self.layer_core_types) > 0
+        header = ', '.join(self.partition_table_cols)
+        if write_core_types:
+            header += ', CoreType'
+        f.write(header + '\n')
 
         for entry in self.partition_table:
-            log = ', '.join([str(x) for x in entry]) + '\n'
-            f.write(log)
+            log = ', '.join([str(x) for x in entry])
+            if write_core_types:
+                log += ', ' + self.layer_core_types.get(entry[0], 'default')
+            f.write(log + '\n')
 
         f.close()
 
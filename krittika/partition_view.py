@@ -0,0 +1,101 @@
+import math
+import numpy as np
+
+
+class PartitionView:
+    '''
+        Splits the operand matrices of a layer into input x filter parts without copying.
+        The bounds of a part follow from its index, and its operands are views of the layer
+        matrices: the ifmap part is a block of rows (contiguous), the filter part a block of
+        columns (strided by the filter width) and the ofmap part the intersection of the two.
+        Part (i, j) has index i * num filter parts + j, the order of the compute nodes.
+    '''
+    def __init__(self):
+        # Layer operand matrices
+        self.ifmap_matrix = np.zeros((1, 1))
+        self.filter_matrix = np.zeros((1, 1))
+        self.ofmap_matrix = np.zeros((1, 1))
+
+        # Params
+        self.num_input_part = 1
+        self.num_filter_part = 1
+        self.input_rows_per_part = 1
+        self.filter_cols_per_part = 1
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self,
+                   ifmap_matrix=np.zeros((1, 1)),
+                   filter_matrix=np.zeros((1, 1)),
+                   ofmap_matrix=np.zeros((1, 1)),
+                   num_input_part=1, num_filter_part=1):
+        assert num_input_part > 0 and num_filter_part > 0, 'Number of parts should be positive'
+        assert ifmap_matrix.shape[1] == filter_matrix.shape[0], 'Inner dimensions do not match'
+        assert ofmap_matrix.shape == (ifmap_matrix.shape[0], filter_matrix.shape[1]), \
+            'The outer dimensions of the operands and the output should match'
+
+        self.ifmap_matrix = ifmap_matrix
+        self.filter_matrix = filter_matrix
+        self.ofmap_matrix = ofmap_matrix
+
+        self.input_rows_per_part = math.ceil(ifmap_matrix.shape[0] / num_input_part)
+        self.filter_cols_per_part = math.ceil(filter_matrix.shape[1] / num_filter_part)
+        # Parts past the last row or column would be empty, the cores left over stay idle
+        self.num_input_part = max(1, math.ceil(ifmap_matrix.shape[0] / self.input_rows_per_part))
+        self.num_filter_part = max(1, math.ceil(filter_matrix.shape[1] / self.filter_cols_per_part))
+
+        self.params_set = True
+
+    #
+    def get_num_parts(self):
+        assert self.params_set
+        return self.num_input_part * self.num_filter_part
+
+    #
+    def get_part_bounds(self, part_idx=0):
+        # Row range of the ifmap and ofmap, column range of the filter and ofmap
+        assert self.params_set
+        assert 0 <= part_idx < self.get_num_parts(), 'Invalid part index ' + str(part_idx)
+
+        inp_part = part_idx // self.num_filter_part
+        filt_part = part_idx % self.num_filter_part
+
+        row_start = inp_part * self.input_rows_per_part
+        row_end = min(row_start + self.input_rows_per_part, self.ifmap_matrix.shape[0])
+        col_start = filt_part * self.filter_cols_per_part
+        col_end = min(col_start + self.filter_cols_per_part, self.filter_matrix.shape[1])
+
+        return row_start, row_end, col_start, col_end
+
+    #
+    def get_part_operands(self, part_idx=0):
+        row_start, row_end, col_start, col_end = self.get_part_bounds(part_idx)
+
+        ifmap_part = self.ifmap_matrix[row_start:row_end, :]
+        filter_part = self.filter_matrix[:, col_start:col_end]
+        ofmap_part = self.ofmap_matrix[row_start:row_end, col_start:col_end]
+
+        return ifmap_part, filter_part, ofmap_part
+
+    #
+    def get_part_layout(self, part_idx=0):
+        # Bounds and memory layout of the views of a part
+        row_start, row_end, col_start, col_end = self.get_part_bounds(part_idx)
+        ifmap_part, filter_part, ofmap_part = self.get_part_operands(part_idx)
+
+        layout = {'row_start': row_start, 'row_end': row_end,
+                  'col_start': col_start, 'col_end': col_end}
+        for name, view in [('ifmap', ifmap_part), ('filter', filter_part), ('ofmap', ofmap_part)]:
+            layout[name + '_contiguous'] = view.flags['C_CONTIGUOUS']
+            layout[name + '_strides'] = view.strides
+        return layout
+
+    #
+    def is_zero_copy(self, part_idx=0):
+        ifmap_part, filter_part, ofmap_part = self.get_part_operands(part_idx)
+        views = [(ifmap_part, self.ifmap_matrix), (filter_part, self.filter_matrix), (ofmap_part, self.ofmap_matrix)]
+        # An implicit operand is never copied, its blocks hold no addresses
+        return all(view.size == 0 or not isinstance(view, np.ndarray) or np.shares_memory(view, matrix)
+                   for view, matrix in views)
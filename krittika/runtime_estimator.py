@@ -0,0 +1,199 @@
+import os
+import math
+import numpy as np
+
+from krittika.partition_manager import PartitionManager
+
+
+class RuntimeEstimator:
+    '''
+        Runtime model calibrated on the COMPUTE_REPORT results of earlier cycle accurate
+        runs. Every sample is a (layer shape, partition, dataflow, array, SRAM, bandwidth)
+        point with its total and stall cycles. The cycles are fitted with least squares on
+        features of the analytical model of the partition manager: compute cycles, DRAM
+        cycles and the DRAM cycles in excess of compute. Until it is fitted the estimator
+        returns the roofline of the partition manager.
+    '''
+    def __init__(self):
+        self.sample_cols = ['M', 'N', 'K', 'Dataflow', 'ArrRow', 'ArrCol', 'InputParts', 'FilterParts',
+                            'IfmapSramWords', 'FilterSramWords', 'OfmapSramWords',
+                            'IfmapBW', 'FilterBW', 'OfmapBW', 'TotalCycles', 'StallCycles']
+        self.feature_names = ['Compute', 'Memory', 'Excess', 'Const']
+
+        # State
+        self.samples = []
+        self.total_coeffs = np.array([1.0, 0.0, 1.0, 0.0])     # compute + excess = roofline
+        self.stall_coeffs = np.array([0.0, 0.0, 1.0, 0.0])
+        self.min_samples = len(self.feature_names)
+
+        # Flags
+        self.fitted = False
+
+    #
+    def add_sample(self, M=1, N=1, K=1, df='os',
+                   arr_row=1, arr_col=1,
+                   input_part=1, filt_part=1,
+                   sram_words=(1, 1, 1), bandwidths=(0, 0, 0),
+                   total_cycles=0, stall_cycles=0):
+        # A bandwidth of 0 stands for CALC mode, where the interfaces never stall
+        assert df in ['os', 'ws', 'is']
+        assert total_cycles >= 0 and stall_cycles >= 0, 'Cycles cannot be negative'
+
+        self.samples += [[M, N, K, df, arr_row, arr_col, input_part, filt_part]
+                         + list(sram_words) + list(bandwidths) + [total_cycles, stall_cycles]]
+        self.fitted = False
+
+    #
+    def add_report_samples(self, compute_report_filename='',
+                           config_obj=None, workload_obj=None, partition_obj=None,
+                           single_core=False):
+        # Pairs the per layer cycles of a COMPUTE_REPORT with the shape, partition and
+        # config the layer ran with. In LP (single_core) layer i ran unpartitioned on core i.
+        assert os.path.isfile(compute_report_filename), 'No compute report at ' + compute_report_filename
+
+        f = open(compute_report_filename, 'r')
+        first = True
+        for row in f:
+            if first:
+                first = False
+                continue
+
+            elems = [e.strip() for e in row.strip().split(',') if e.strip() != '']
+            layer_id = int(elems[0])
+            total_cycles = float(elems[1])
+            stall_cycles = float(elems[2])
+
+            if not workload_obj.is_matmul_layer(layer_id):
+                continue
+
+            # The cycles of a batched or grouped layer are of all the instances a core ran
+            num_instances = partition_obj.get_layer_instances_per_part(layer_id=layer_id, single_core=single_core)
+            total_cycles /= num_instances
+            stall_cycles /= num_instances
+
+            M, N, K = workload_obj.get_transformed_mnk_dimensions(layer_id)
+            unit, df = partition_obj.get_opt_compute_params(layer_id=layer_id)
+            if single_core:
+                input_part, filt_part = 1, 1
+                core_config = config_obj.get_core_config(layer_id)
+            else:
+                input_part, filt_part = partition_obj.get_layer_partitions(layer_id=layer_id)
+                core_config = config_obj.get_core_type_config(partition_obj.get_layer_core_type(layer_id))
+
+            arr_row, arr_col = PartitionManager.get_array_dims(core_config, unit, df)
+            sram_words, bandwidths = self.get_memory_params(core_config)
+            self.add_sample(M, N, K, df, arr_row, arr_col, input_part, filt_part,
+                            sram_words, bandwidths, total_cycles, stall_cycles)
+        f.close()
+
+    #
+    @staticmethod
+    def get_sample_params(sample):
+        # Arguments of get_features for a stored sample
+        return sample[:8] + [sample[8:11], sample[11:14]]
+
+    #
+    @staticmethod
+    def get_memory_params(config_obj):
+        sram_words = [kb * 1024 for kb in config_obj.get_per_unit_sram_sizes_kb()]
+        if config_obj.get_bandwidth_use_mode() != 'USER':
+            return sram_words, [0, 0, 0]
+        return sram_words, list(config_obj.get_interface_bandwidths())
+
+    #
+    @staticmethod
+    def get_features(M=1, N=1, K=1, df='os',
+                     arr_row=1, arr_col=1,
+                     input_part=1, filt_part=1,
+                     sram_words=(1, 1, 1), bandwidths=(0, 0, 0)):
+        compute_cycles = PartitionManager.get_mat_mul_analytical_runtime(M, N, K, df, arr_row, arr_col,
+                                                                         input_part, filt_part)
+        dram_words = PartitionManager.get_part_dram_words(M, N, K, df, arr_row, arr_col,
+                                                          input_part, filt_part, sram_words)
+        memory_cycles = 0
+        for words, bw in zip(dram_words, bandwidths):
+            if bw > 0:
+                memory_cycles = max(memory_cycles, math.ceil(words / bw))
+
+        return [compute_cycles, memory_cycles, max(0, memory_cycles - compute_cycles), 1]
+
+    #
+    def fit(self):
+        assert len(self.samples) >= self.min_samples, \
+            'Need at least ' + str(self.min_samples) + ' samples to fit, got ' + str(len(self.samples))
+
+        features = np.array([self.get_features(*self.get_sample_params(sample)) for sample in self.samples],
+                            dtype=float)
+        total_cycles = np.array([sample[-2] for sample in self.samples], dtype=float)
+        stall_cycles = np.array([sample[-1] for sample in self.samples], dtype=float)
+
+        self.total_coeffs = np.linalg.lstsq(features, total_cycles, rcond=None)[0]
+        self.stall_coeffs = np.linalg.lstsq(features, stall_cycles, rcond=None)[0]
+        self.fitted = True
+
+    #
+    def predict(self, M=1, N=1, K=1, df='os',
+                arr_row=1, arr_col=1,
+                input_part=1, filt_part=1,
+                sram_words=(1, 1, 1), bandwidths=(0, 0, 0)):
+        # Returns the total and stall cycles of one part
+        features = np.array(self.get_features(M, N, K, df, arr_row, arr_col, input_part, filt_part,
+                                              sram_words, bandwidths), dtype=float)
+        total_cycles = max(0.0, float(features @ self.total_coeffs))
+        stall_cycles = min(total_cycles, max(0.0, float(features @ self.stall_coeffs)))
+        return total_cycles, stall_cycles
+
+    #
+    def get_runtime(self, M=1, N=1, K=1, df='os',
+                    arr_row=1, arr_col=1,
+                    input_part=1, filt_part=1,
+                    sram_words=(1, 1, 1), bandwidths=(0, 0, 0)):
+        return self.predict(M, N, K, df, arr_row, arr_col, input_part, filt_part, sram_words, bandwidths)[0]
+
+    #
+    def get_fit_error(self):
+        # Mean relative error of the total cycles over the samples
+        assert len(self.samples) > 0
+
+        errors = []
+        for sample in self.samples:
+            predicted = self.get_runtime(*self.get_sample_params(sample))
+            actual = sample[-2]
+            errors += [abs(predicted - actual) / max(actual, 1)]
+        return sum(errors) / len(errors)
+
+    #
+    def get_num_samples(self):
+        return len(self.samples)
+
+    #
+    def is_fitted(self):
+        return self.fitted
+
+    #
+    def read_samples(self, filename=''):
+        f = open(filename, 'r')
+        first = True
+        for row in f:
+            if first:
+                first = False
+                continue
+
+            elems = [e.strip() for e in row.strip().split(',')]
+            if len(elems) < len(self.sample_cols):
+                continue
+            df = elems[3]
+            numbers = [float(e) for e in elems[:3] + elems[4:len(self.sample_cols)]]
+            shape = [int(x) for x in numbers[:7]]
+            self.add_sample(shape[0], shape[1], shape[2], df, shape[3], shape[4], shape[5], shape[6],
+                            sram_words=numbers[7:10], bandwidths=numbers[10:13],
+                            total_cycles=numbers[13], stall_cycles=numbers[14])
+        f.close()
+
+    #
+    def write_samples(self, filename=''):
+        f = open(filename, 'w')
+        f.write(', '.join(self.sample_cols) + '\n')
+        for sample in self.samples:
+            f.write(', '.join([str(x) for x in sample]) + '\n')
+        f.close()
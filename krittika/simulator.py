@@ -1,4 +1,5 @@
 import os
+import copy
 import statistics
 
 from krittika.workload_manager import WorkloadManager
@@ -8,7 +9,15 @@ from krittika.config.krittika_config import KrittikaConfig
 from krittika.partition_manager import PartitionManager
 from krittika.single_layer_sim import SingleLayerSim
 from krittika.config.network_config import NetworkConfig
+from krittika.config.tenant_config import TenantConfig
 from krittika.noc.noc_factory import NoCFactory
+from krittika.noc.placement_optimizer import PlacementOptimizer
+from krittika.auto_tuner import AutoTuner
+from krittika.runtime_estimator import RuntimeEstimator
+from krittika.compute.scaled_out_compute_unit import ScaledOutComputeUnit
+from krittika.compute.conv_operand_matrix import ConvOperandMatrix
+from krittika.decode_workload import DecodeWorkload
+from krittika.forwarding_buffer import ForwardingBuffer
 
 
 class Simulator:
@@ -16,15 +25,22 @@ class Simulator:
         # Objects
         self.config_obj = KrittikaConfig()
         self.network_config_obj = NetworkConfig()
+        self.tenant_config_obj = TenantConfig()
         self.partition_obj = PartitionManager()
         self.workload_obj = WorkloadManager()
+        self.compute_grid_obj = ScaledOutComputeUnit()
         self.noc = None
+        self.runtime_estimator = None
+        self.decode_workload = None
 
         # State
         self.verbose = True
         self.trace_gen_flag = True
         self.autopartition = False
         self.single_layer_objects_list = []
+        self.fused_layer_ids = []   # Activation layers run as post-ops of the layer before
+        self.reused_layer_ids = []  # Layers of repeated transformer blocks, not simulated again
+        self.forwarding_buffers = []    # LP hand-off between consecutive stages
         self.top_path = "./"
         self.reports_dir_path = "./"
 
@@ -40,6 +56,37 @@ class Simulator:
         self.detailed_report_avg_items = []
         self.detailed_report_ready = False
 
+        # LP throughput results
+        self.lp_num_batches = 1
+        self.lp_fill_latency = 0
+        self.lp_initiation_interval = 0
+        self.lp_total_cycles = 0
+        self.lp_simulated_batches = 0
+        self.lp_steady_state_batch = -1
+
+        # Multi tenant results: Per tenant
+        self.tenant_layer_sims = {}
+        self.tenant_start_time = {}
+        self.tenant_finish_time = {}
+        self.tenant_mac_ops = {}
+
+        # Modes: set before set_params, the partition tuning and the run use them
+        self.enable_ls_partition = False
+        self.enable_lp_partition = True
+        self.enable_ls_partition_tile_based = False
+        # Skip servicing the tiles of a layer once their timing becomes periodic (LP and LS tiled)
+        self.enable_steady_state_extrapolation = False
+        # Keep the demand of sparse tiled parts in CSR form and expand one tile at a time
+        self.enable_compressed_demand = False
+        # Generate the demand of each tile from its fold instead of holding whole layers
+        self.enable_fold_demand = False
+        # Generate the im2col ifmap addresses of conv layers per partition instead of per layer
+        self.enable_implicit_im2col = False
+        # Fuse activation rows into the conv or gemm layer before them (always on in LP)
+        self.enable_operator_fusion = False
+        # LS runs take the results of the layers of a repeated transformer block from the first block
+        self.enable_block_reuse = True
+
         # Flags
         self.params_valid = False
         self.runs_done = False
@@ -55,27 +102,70 @@ class Simulator:
         verbose=True,
         noc_obj= None,
         save_traces=True,
+        num_batches=1,
+        tenant_config_filename="",
+        core_placement="",
+        mapping_output_filename="",
+        tune_time_budget=0,
+        calibration_filename="",
+        fuse_operators=False,
+        decode_tokens=0,
+        decode_samples=8,
     ):
+        self.verbose = verbose
+
         # Read the user input and files and prepare the objects
         self.config_obj.read_config_from_file(filename=config_filename)
         self.network_config_obj.read_network_config(filename=network_config_filename)
-
-        self.workload_obj = WorkloadManager()
-        self.workload_obj.read_topologies(workload_filename=workload_filename)
         self.noc_obj = noc_obj
-
-        # print(self.workload_obj.get_simd_operation(0))
-
-        self.partition_obj.set_params(
-            config_obj=self.config_obj, workload_obj=self.workload_obj
-        )
         self.autopartition = self.config_obj.is_autopartition()
-        if self.autopartition:
-            self.partition_obj.create_partition_table()
+        self.enable_operator_fusion = fuse_operators
+
+        # With a tenant config every tenant brings its own topology and partitions
+        self.enable_multi_tenant = tenant_config_filename != ""
+        if self.enable_multi_tenant:
+            self.tenant_config_obj = TenantConfig()
+            self.tenant_config_obj.read_tenant_config(filename=tenant_config_filename)
         else:
-            self.partition_obj.read_user_partition_table(
-                filename=custom_partition_filename
+            self.workload_obj = WorkloadManager()
+            self.workload_obj.read_topologies(workload_filename=workload_filename)
+
+            # print(self.workload_obj.get_simd_operation(0))
+
+            self.partition_obj.set_params(
+                config_obj=self.config_obj, workload_obj=self.workload_obj
             )
+            self.calibration_filename = calibration_filename
+            if calibration_filename != "":
+                self.load_runtime_estimator(calibration_filename)
+
+            if self.autopartition and tune_time_budget > 0:
+                # The tuned table is refined and run in LS, LP does not use the partitions. The tiled
+                # mode schedules the parts over the NoC, which the LS refine runs do not time.
+                assert not self.enable_ls_partition_tile_based, 'Partition tuning is not supported in the LS tiled mode'
+                if not self.enable_ls_partition:
+                    if self.verbose:
+                        print('Partition tuning runs the LS mode')
+                    self.enable_ls_partition = True
+                    self.enable_lp_partition = False
+                self.tune_partitions(time_budget=tune_time_budget, reports_dir_path=reports_dir_path)
+            elif self.autopartition:
+                self.partition_obj.create_partition_table()
+            else:
+                self.partition_obj.read_user_partition_table(
+                    filename=custom_partition_filename
+                )
+
+            # Decode mode: the topology is the prompt, the run simulates the tokens generated after it
+            if decode_tokens > 0:
+                self.decode_workload = DecodeWorkload()
+                self.decode_workload.set_params(prompt_workload=self.workload_obj,
+                                                num_tokens=decode_tokens, num_samples=decode_samples)
+
+        # Place the cores on the NoC grid instead of using the mapping in the network config
+        self.core_placement = core_placement
+        if core_placement != "":
+            self.place_cores(placement=core_placement)
 
         # This can be changed in the future to support other NoCs
         # For now, directly get an AstraSimANoC
@@ -100,19 +190,119 @@ class Simulator:
             latencies.append(l)
 
         stat_lat = self.noc.get_static_latency(0, 1, 512)
+        self.noc.reset_traffic_matrix()
+
+        # Network config with the optimized core mapping is written here after the run
+        self.mapping_output_filename = mapping_output_filename
 
-        self.verbose = verbose
         self.trace_gen_flag = save_traces
 
         self.reports_dir_path = reports_dir_path
         self.top_path = reports_dir_path
         self.params_valid = True
-        self.enable_ls_partition = False
-        self.enable_lp_partition = True
-        self.enable_ls_partition_tile_based = False
+
+        # LP throughput mode: used when more than one batch is streamed through the pipeline
+        assert num_batches > 0, 'Number of batches should be a positive integer'
+        self.lp_num_batches = num_batches
+        self.lp_steady_state_window = 2     # Number of equal batch intervals that mark steady state
+        self.lp_steady_state_tolerance = 0.01
 
         self.tile_num = {} # Global variable as of now
 
+    #
+    def tune_partitions(self, time_budget=60, reports_dir_path="./"):
+        # Joint search of the partitions and dataflows of all layers, the tuned table is
+        # written next to the reports so that it can be reused in USER mode
+        auto_tuner = AutoTuner()
+        auto_tuner.set_params(config_obj=self.config_obj,
+                              workload_obj=self.workload_obj,
+                              time_budget=time_budget,
+                              refine_fn=self.get_partition_cycles,
+                              runtime_estimator=self.runtime_estimator)
+        auto_tuner.tune()
+
+        self.partition_obj = auto_tuner.get_partition_manager()
+        auto_tuner.write_best_partition_table(reports_dir_path + '/TUNED_PARTITION.csv')
+        if self.verbose:
+            print('Tuned partitions, estimated cycles: ' + str(auto_tuner.get_best_cost()))
+
+    #
+    def load_runtime_estimator(self, calibration_filename=""):
+        # The samples of earlier runs calibrate the partition cost, this run's samples are
+        # appended to the same file once its reports are written
+        self.runtime_estimator = RuntimeEstimator()
+        if os.path.isfile(calibration_filename):
+            self.runtime_estimator.read_samples(calibration_filename)
+
+        if self.runtime_estimator.get_num_samples() >= self.runtime_estimator.min_samples:
+            self.runtime_estimator.fit()
+            self.partition_obj.set_runtime_estimator(self.runtime_estimator)
+            if self.verbose:
+                print('Calibrated the runtime model on ' + str(self.runtime_estimator.get_num_samples())
+                      + ' samples, mean error: ' + str(round(self.runtime_estimator.get_fit_error() * 100, 2)) + ' %')
+
+    #
+    def save_calibration_samples(self):
+        compute_report_name = self.top_path + "/traces/" + "/COMPUTE_REPORT.csv"
+        self.runtime_estimator.add_report_samples(compute_report_filename=compute_report_name,
+                                                  config_obj=self.config_obj,
+                                                  workload_obj=self.workload_obj,
+                                                  partition_obj=self.partition_obj,
+                                                  single_core=not (self.enable_ls_partition
+                                                                   or self.enable_ls_partition_tile_based))
+        self.runtime_estimator.write_samples(self.calibration_filename)
+
+    #
+    def get_partition_cycles(self, partition_obj):
+        # Cycle accurate LS run of every layer with the given partitions, without traces
+        single_arr_config = self.get_single_arr_config()
+        total_cycles = 0
+        for layer_id in range(self.workload_obj.get_num_layers()):
+            if not self.workload_obj.is_matmul_layer(layer_id):
+                continue
+
+            this_layer_op_mat_obj = self.create_layer_operand_matrix(single_arr_config, self.workload_obj, layer_id)
+
+            this_layer_sim = SingleLayerSim()
+            this_layer_sim.set_params(config_obj=self.config_obj,
+                                      op_mat_obj=this_layer_op_mat_obj,
+                                      partitioner_obj=partition_obj,
+                                      layer_id=layer_id, core_id=layer_id,
+                                      verbosity=False)
+            this_layer_sim.run_single_layer_ls()
+            total_cycles += max([memory_system.get_total_compute_cycles()
+                                 for memory_system in this_layer_sim.all_node_mem_objects])
+
+        return total_cycles
+
+    #
+    def place_cores(self, placement='auto'):
+        # 'auto' keeps the placement with the fewest hops between the LP pipeline neighbours,
+        # one core per stage, counted on the topology of the network
+        grid_rows = self.network_config_obj.rows[0]
+        grid_cols = self.network_config_obj.cols[0]
+
+        stage_pairs = [[stage, stage + 1] for stage in range(len(self.get_lp_stage_layers()) - 1)]
+        hop_counter = PlacementOptimizer()
+        hop_counter.set_params(network_config_obj=self.network_config_obj,
+                               traffic_matrix={(src, dest): 1 for src, dest in stage_pairs})
+
+        self.compute_grid_obj = ScaledOutComputeUnit()
+        self.compute_grid_obj.set_params(total_nodes=self.config_obj.get_num_cores(),
+                                         grid_rows=grid_rows, grid_cols=grid_cols,
+                                         compute_node_op='matmul',
+                                         config_obj=self.config_obj,
+                                         hop_count_fn=hop_counter.get_hop_count)
+        if placement == 'auto':
+            placement = self.compute_grid_obj.choose_best_placement(node_pairs=stage_pairs)
+        else:
+            self.compute_grid_obj.set_placement(placement)
+
+        self.network_config_obj.set_logical_to_physical_mapping(self.compute_grid_obj.get_mapping_dict())
+        if self.verbose:
+            print('Placed the cores in ' + placement + ' order, pipeline hops: '
+                  + str(self.compute_grid_obj.get_total_hops(node_pairs=stage_pairs)))
+
     #
 
     def run_ls(self):
@@ -134,13 +324,15 @@ class Simulator:
         for layer_id in range(num_layers):
             if self.verbose:
                 print('Running Layer ' + str(layer_id))
-            this_layer_op_mat_obj = operand_matrix()
             layer_params = self.workload_obj.get_layer_params(layer_id)
-            if (layer_params[0] in ['conv', 'gemm']):
-                this_layer_op_mat_obj.set_params(config_obj=single_arr_config,
-                                             topoutil_obj=self.workload_obj,
-                                             layer_id=layer_id)
-                this_layer_op_mat_obj.create_operand_matrices()
+            reuse_id = self.get_layer_reuse_id(layer_id)
+            if reuse_id != layer_id:
+                if self.verbose:
+                    print('Reusing the results of Layer ' + str(reuse_id))
+                self.single_layer_objects_list += [self.single_layer_objects_list[reuse_id]]
+                self.reused_layer_ids += [layer_id]
+            elif self.workload_obj.is_matmul_layer(layer_id):
+                this_layer_op_mat_obj = self.create_layer_operand_matrix(single_arr_config, self.workload_obj, layer_id)
 
                 this_layer_sim = SingleLayerSim()
                 this_layer_sim.set_params(config_obj=self.config_obj,
@@ -156,28 +348,25 @@ class Simulator:
                     print('SAVING TRACES')
                 this_layer_sim.save_traces(self.enable_ls_partition)
                 this_layer_sim.gather_report_items_across_cores()
+            elif (layer_params[0] in ['activation']) and self.is_fused_activation(layer_id):
+                producer_id = self.workload_obj.get_fusion_producer(layer_id)
+                self.run_fused_activation(layer_id, self.single_layer_objects_list[producer_id])
             elif (layer_params[0] in ['activation']):
-                op_matrix = self.single_layer_objects_list[layer_id-1].get_ofmap_operand_matrix()
+                input_handoff = self.get_input_handoff(layer_id)
 
                 this_layer_sim = SingleLayerSim()
                 this_layer_sim.set_params(config_obj=self.config_obj,
-                                      op_mat_obj=this_layer_op_mat_obj,
                                       partitioner_obj=self.partition_obj,
                                       layer_id=layer_id,
                                       log_top_path=self.top_path,
                                       verbosity=self.verbose)
-                this_layer_sim.run_simd_all_parts(operand_matrix=op_matrix, optype = layer_params[1])
+                this_layer_sim.run_simd_all_parts(input_handoff=input_handoff, optypes=layer_params[2:])
                 self.single_layer_objects_list += [this_layer_sim]
-                
-                this_layer_sim.gather_simd_report_items_across_cores()
         
         self.runs_done = True
         self.generate_all_reports()        
 
-    def run_lp(self):
-
-        num_cores = self.workload_obj.get_num_layers() # self.workload_obj.get_num_cores()
-
+    def get_single_arr_config(self):
         # Update the offsets to generate operand matrices
         single_arr_config = scale_config()
         conf_list = scale_config.get_default_conf_as_list()
@@ -187,47 +376,131 @@ class Simulator:
         conf_list[8] = user_offsets[2]
         conf_list[10] = self.config_obj.get_bandwidth_use_mode()
         conf_list.append(self.config_obj.get_interface_bandwidths()[0])
-        single_arr_config.update_from_list(conf_list=conf_list)   
-        time_scheduled = {}
-        time_current = {}
-        executed_tile = {}
+        single_arr_config.update_from_list(conf_list=conf_list)
+
+        return single_arr_config
+
+    def create_layer_operand_matrix(self, single_arr_config, topoutil_obj, layer_id=0):
+        # Conv layers can keep their im2col ifmap implicit, each partition computes only its own addresses
+        if self.enable_implicit_im2col and topoutil_obj.get_layer_params(layer_id)[0] in ['conv', 'grouped_conv', 'depthwise_conv']:
+            op_mat_obj = ConvOperandMatrix()
+        else:
+            op_mat_obj = operand_matrix()
+        op_mat_obj.set_params(config_obj=single_arr_config, topoutil_obj=topoutil_obj, layer_id=layer_id)
+        op_mat_obj.create_operand_matrices()
+        return op_mat_obj
+
+    def get_input_handoff(self, layer_id=0):
+        # Metadata of the ofmap of the layer before, its operand matrices are not needed again
+        assert layer_id > 0, 'Layer ' + str(layer_id) + ' has no layer before it to take its input from'
+        return self.single_layer_objects_list[layer_id - 1].get_ofmap_handoff()
+
+    def get_layer_reuse_id(self, layer_id=0):
+        # A layer of a repeated transformer block takes the sim of the same layer of the first block,
+        # as long as both are partitioned the same way. Otherwise the layer is simulated itself.
+        reuse_id = self.workload_obj.get_layer_reuse_id(layer_id)
+        if not self.enable_block_reuse or reuse_id == layer_id or self.is_fused_activation(layer_id):
+            return layer_id
+
+        if self.workload_obj.is_matmul_layer(layer_id):
+            for getter in [self.partition_obj.get_layer_partitions, self.partition_obj.get_opt_compute_params,
+                           self.partition_obj.get_layer_instance_parts, self.partition_obj.get_layer_core_type]:
+                if getter(layer_id=reuse_id) != getter(layer_id=layer_id):
+                    return layer_id
+        return reuse_id
+
+    def is_fused_activation(self, layer_id=0):
+        return self.enable_operator_fusion and self.workload_obj.get_fusion_producer(layer_id) >= 0
+
+    def run_fused_activation(self, layer_id, producer_sim):
+        # The activation is timed as a post-op of producer_sim, its ofmap is not read again
+        activation_sim = SingleLayerSim()
+        activation_sim.set_params(config_obj=self.config_obj,
+                                  partitioner_obj=self.partition_obj,
+                                  layer_id=layer_id, core_id=producer_sim.core_id,
+                                  log_top_path=self.top_path,
+                                  verbosity=self.verbose, enable_lp_partition=self.enable_lp_partition)
+        activation_sim.run_simd_fused(producer_sim, optypes=self.workload_obj.get_layer_params(layer_id)[2:])
+        self.single_layer_objects_list += [activation_sim]
+        self.fused_layer_ids += [layer_id]
+
+    def get_lp_stage_layers(self):
+        # LP pipeline stages: one core per conv or gemm layer, activations are fused into the stage before them
+        return [layer_id for layer_id in range(self.workload_obj.get_num_layers())
+                if self.workload_obj.is_matmul_layer(layer_id)]
+
+    def setup_lp_layer_sims(self):
+        single_arr_config = self.get_single_arr_config()
+        stage_layers = self.get_lp_stage_layers()
+        num_cores = len(stage_layers)
         this_layer_op_mat_obj={}
         this_layer_sim ={}
-        for core_id in range(num_cores):
-            time_scheduled[core_id] = 0
-            time_current[core_id] = 0
-            executed_tile[core_id] = -1
-            this_layer_op_mat_obj[core_id] = operand_matrix()
-            layer_params = self.workload_obj.get_layer_params(core_id)   
-            if (layer_params[0] in ['conv', 'gemm']):
-                this_layer_op_mat_obj[core_id].set_params(config_obj=single_arr_config,
-                topoutil_obj=self.workload_obj,
-                layer_id=core_id)
-                this_layer_op_mat_obj[core_id].create_operand_matrices()
+        for layer_id in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(layer_id)   
+            if self.workload_obj.is_matmul_layer(layer_id):
+                core_id = stage_layers.index(layer_id)
+                this_layer_op_mat_obj[core_id] = self.create_layer_operand_matrix(single_arr_config,
+                                                                                  self.workload_obj, layer_id)
     
                 this_layer_sim[core_id] = SingleLayerSim() ### again for now till milestone we can assume one core, hmm maybe have an additional self knob for hyrbvid
                 this_layer_sim[core_id].set_params(config_obj=self.config_obj,
                                       op_mat_obj=this_layer_op_mat_obj[core_id],
                                       partitioner_obj=self.partition_obj,
                                       noc_obj = self.noc,
-                                      layer_id=core_id,core_id= core_id,
+                                      layer_id=layer_id,core_id= core_id,
                                       log_top_path=self.top_path,
-                                      verbosity=self.verbose,skip_dram_reads=self.enable_lp_partition,skip_dram_writes = self.enable_lp_partition,num_cores = num_cores, enable_lp_partition = self.enable_lp_partition )
+                                      verbosity=self.verbose,num_cores = num_cores, enable_lp_partition = self.enable_lp_partition,
+                                      extrapolate_steady_state=self.enable_steady_state_extrapolation,
+                                      compress_demand=self.enable_compressed_demand,
+                                      fold_demand=self.enable_fold_demand)
                 this_layer_sim[core_id].run_single_layer_lp() ## This is run_compute
-                this_layer_sim[core_id].setup_memory()
                 self.single_layer_objects_list += [this_layer_sim[core_id]]
-            #elif (layer_params[0] in ['activation']): ## TODO Need to fix this
-            #    op_matrix = self.single_layer_objects_list[core_id-1].get_ofmap_operand_matrix()
-    
-            #    this_layer_sim = SingleLayerSim()
-            #    this_layer_sim.set_params(config_obj=self.config_obj,
-            #                          op_mat_obj=this_layer_op_mat_obj,
-            #                          partitioner_obj=self.partition_obj,
-            #                          layer_id=core_id,
-            #                          log_top_path=self.top_path,
-            #                          verbosity=self.verbose)
-            #    this_layer_sim.run_simd_all_parts(operand_matrix=op_matrix, optype = layer_params[1])
-            #    self.single_layer_objects_list += [this_layer_sim]
+            elif (layer_params[0] in ['activation']):
+                # Post-op on the ofmap tiles of the stage it is fused into, no stage of its own
+                producer_id = self.workload_obj.get_fusion_producer(layer_id)
+                assert producer_id >= 0, 'Activation layer ' + str(layer_id) + ' has no conv or gemm layer to fuse into'
+                self.run_fused_activation(layer_id, this_layer_sim[stage_layers.index(producer_id)])
+
+        # The ofmap of every stage is forwarded into the ifmap SRAM of the next one
+        self.forwarding_buffers = self.create_forwarding_buffers(this_layer_sim)
+        for core_id in range(num_cores):
+            input_forwarding = self.forwarding_buffers[core_id - 1] if core_id > 0 else None
+            output_forwarding = self.forwarding_buffers[core_id] if core_id < num_cores - 1 else None
+            this_layer_sim[core_id].set_forwarding_buffers(input_forwarding=input_forwarding,
+                                                           output_forwarding=output_forwarding)
+            this_layer_sim[core_id].setup_memory()
+
+        return this_layer_sim
+
+    def create_forwarding_buffers(self, this_layer_sim):
+        # One buffer per pair of consecutive LP stages, sized by the SRAMs of the two cores
+        forwarding_buffers = []
+        for core_id in range(len(this_layer_sim) - 1):
+            producer_sim = this_layer_sim[core_id]
+            consumer_sim = this_layer_sim[core_id + 1]
+            consumer_ifmap_kb = consumer_sim.config_obj.get_per_unit_sram_sizes_kb()[0]
+            producer_ofmap_kb = producer_sim.config_obj.get_per_unit_sram_sizes_kb()[2]
+
+            forwarding_buffer = ForwardingBuffer()
+            forwarding_buffer.set_params(capacity_words=consumer_ifmap_kb * 1024,
+                                         tile_words=producer_sim.get_ofmap_words_per_tile(),
+                                         drain_capacity_words=producer_ofmap_kb * 1024)
+            forwarding_buffers += [forwarding_buffer]
+
+        return forwarding_buffers
+
+    def run_lp(self):
+
+        this_layer_sim = self.setup_lp_layer_sims()
+        num_cores = len(this_layer_sim) # One core per pipeline stage
+
+        time_scheduled = {}
+        time_current = {}
+        executed_tile = {}
+        for core_id in range(num_cores):
+            time_scheduled[core_id] = 0
+            time_current[core_id] = 0
+            executed_tile[core_id] = -1
             
         self.time_overall=0 ## starts the cycles.
         # Need to create dependancy graph.
@@ -256,7 +529,7 @@ class Simulator:
                 completed += completed_per_core 
                 if(this_layer_sim[core_id].tile_number < 0 ):
                     this_layer_sim[core_id].tile_number +=1
-                    time_scheduled[core_id ] = time_current[core_id - 1 ] + extra_noc_cycles #+ this_layer_sim[core_id].this_part_mem.cycles_per_tile
+                    time_scheduled[core_id ] = time_current[core_id - 1 ] + extra_noc_cycles #+ this_layer_sim[core_id].cycles_per_tile
                     if(this_layer_sim[core_id].tile_number == 0):
                         time_start[core_id] = time_scheduled[core_id ]
                     noc_total_time[core_id] +=extra_noc_cycles
@@ -266,13 +539,13 @@ class Simulator:
                     
                     continue # Since we need a prev iteration values for Time across core, they need to be updated correctly once you are done with a core's execution
                 
-                    time_current[core_id] = time_scheduled[core_id] + this_layer_sim[core_id].this_part_mem.cycles_per_tile
+                    time_current[core_id] = time_scheduled[core_id] + this_layer_sim[core_id].cycles_per_tile
                     time_scheduled[core_id] = time_current[core_id - 1] + extra_noc_cycles
                     noc_total_time[core_id] +=extra_noc_cycles
                     #######
                 else:
                     
-                    time_current[core_id] = time_scheduled[core_id] + this_layer_sim[core_id].this_part_mem.cycles_per_tile
+                    time_current[core_id] = time_scheduled[core_id] + this_layer_sim[core_id].cycles_per_tile
                     time_scheduled[core_id] = time_current[core_id] + extra_noc_cycles
                     noc_total_time[core_id] +=extra_noc_cycles
                 if(core_id != num_cores - 1 ):
@@ -334,8 +607,10 @@ class Simulator:
                     completed += completed_per_core 
                     if(this_layer_sim[core_id].tile_number < 0 ):
                         this_layer_sim[core_id].tile_number +=1
-                        time_scheduled[core_id ] = time_current[core_id - 1 ] + extra_noc_cycles #+ this_layer_sim[core_id].this_part_mem.cycles_per_tile
+                        time_scheduled[core_id ] = time_current[core_id - 1 ] + extra_noc_cycles #+ this_layer_sim[core_id].cycles_per_tile
                         if(this_layer_sim[core_id].tile_number == 0):
+                            time_scheduled[core_id] = self.get_forwarded_tile_time(this_layer_sim, core_id, 0,
+                                                                                   time_current[core_id - 1]) + extra_noc_cycles
                             time_start[core_id] = time_scheduled[core_id ]
                         if(core_id == 1):
                             noc_total_time[core_id] +=extra_noc_cycles
@@ -352,18 +627,25 @@ class Simulator:
                     
     
                     if(core_id != 0 ): ### Need to double check this. Getting the per core absolute time using the rpevious core as reference
-                        time_current[core_id] = time_scheduled[core_id] + this_layer_sim[core_id].this_part_mem.cycles_per_tile
-                        time_scheduled[core_id] = time_current[core_id - 1] + extra_noc_cycles
+                        time_current[core_id] = time_scheduled[core_id] + this_layer_sim[core_id].cycles_per_tile
+                        # The tile leaves the ifmap SRAM, the producer can forward the next one into its place
+                        self.forwarding_buffers[core_id - 1].free(this_layer_sim[core_id].tile_number, time_current[core_id])
+                        time_scheduled[core_id] = self.get_forwarded_tile_time(this_layer_sim, core_id,
+                                                                               this_layer_sim[core_id].tile_number + 1,
+                                                                               time_current[core_id - 1]) + extra_noc_cycles
                         if(core_id == 1):
                             noc_total_time[core_id] +=extra_noc_cycles
                        # assert(extra_noc_cycles > 0 or (this_layer_sim[core_id - 1].tile_number == this_layer_sim[core_id - 1].total_tiles_ifmap_layer ))
                     else:
                         #time_across_cores_prev[core_id] = time_across_cores[core_id]
-                        time_current[core_id] = time_scheduled[core_id] + this_layer_sim[core_id].this_part_mem.cycles_per_tile
+                        time_current[core_id] = time_scheduled[core_id] + this_layer_sim[core_id].cycles_per_tile
                         time_scheduled[core_id] = time_current[core_id] + extra_noc_cycles
                         noc_total_time[core_id] +=extra_noc_cycles
 
                     if(core_id != num_cores - 1 ):
+                        # Back-pressure: the ofmap SRAM holds one written tile besides the one being written
+                        time_scheduled[core_id] = max(time_scheduled[core_id],
+                                                      self.forwarding_buffers[core_id].get_held_until(this_layer_sim[core_id].tile_number - 1))
                         extra_noc_cycles = self.noc.get_latency(this_layer_sim[core_id].tracking_id[core_id+1][this_layer_sim[core_id].tile_number])  - this_layer_sim[core_id].pushed_in_time[core_id+1][this_layer_sim[core_id].tile_number]#static_noc_latency[core_id] # 10 #self.noc.get_static_latency(core_id, core_id + 1, this_layer_sim[core_id].per_tile_size)
                         
                     this_layer_sim[core_id].tile_number +=1
@@ -371,20 +653,346 @@ class Simulator:
            
           
         
-        for lid in range(num_cores):
-            
-            layer_params = self.workload_obj.get_layer_params(lid)
-            if layer_params[0] in ["conv", "gemm"]: ## TODO mmanish remove activation    
-                if self.verbose:
-                    print("SAVING TRACES")
-                this_layer_sim[lid].save_traces()
-                
-                this_layer_sim[lid].gather_report_items_across_cores()   
+        for core_id in range(num_cores):
+            if self.verbose:
+                print("SAVING TRACES")
+            this_layer_sim[core_id].save_traces()
+
+            this_layer_sim[core_id].gather_report_items_across_cores()
        
         print("Total Cycles taken for the sim is ", time_current[max(time_current)]) 
+        self.lp_total_cycles = time_current[max(time_current)]
         #print("Noc Cycles for core ",num_cores-1,"is ",noc_total_time[num_cores - 1],"Total cycles for this core is ",time_current[num_cores - 1] - time_start[num_cores -1] , time_start[num_cores - 1])
         self.runs_done = True
         self.generate_all_reports()  
+        if len(self.forwarding_buffers) > 0:
+            self.save_forwarding_report()
+
+    def get_forwarded_tile_time(self, this_layer_sim, core_id=1, tile_id=0, ready_time=0):
+        # Cycle tile_id of the stage before core_id enters the ifmap SRAM of core_id, it was written at ready_time
+        if tile_id >= this_layer_sim[core_id - 1].get_num_tiles():
+            return ready_time
+        return self.forwarding_buffers[core_id - 1].push(tile_id, ready_time)
+
+    def run_lp_throughput(self):
+        # Streams lp_num_batches inputs through the layer pipeline. Core 0 starts batch b+1
+        # as soon as it is done with batch b, so the batches overlap across the cores.
+        # Once the interval between batch completions settles, the remaining batches are
+        # extrapolated using that interval instead of being simulated tile by tile.
+        assert self.params_valid, "Cannot run simulation without inputs"
+
+        this_layer_sim = self.setup_lp_layer_sims()
+        num_cores = len(this_layer_sim)
+        num_batches = self.lp_num_batches
+
+        static_noc_latency = {}
+        for core_id in range(num_cores - 1):
+            static_noc_latency[core_id] = self.noc.get_static_latency(core_id, core_id + 1,
+                                                                      this_layer_sim[core_id].per_tile_size)
+
+        core_free_time = {}
+        tiles_done = {}
+        for core_id in range(num_cores):
+            core_free_time[core_id] = 0
+            tiles_done[core_id] = 0
+
+        batch_done_time = []
+        batch_intervals = []
+        steady_state_batch = -1
+        steady_state_interval = 0
+        last_sim_batch = num_batches - 1
+
+        batch_id = 0
+        while batch_id <= last_sim_batch:
+            prev_core_tile_done = []
+            for core_id in range(num_cores):
+                num_tiles = this_layer_sim[core_id].get_num_tiles()
+                this_core_tile_done = []
+                for tile_id in range(num_tiles):
+                    start_time = core_free_time[core_id]
+                    if core_id != 0:
+                        # Wait for the matching (or the last) tile of this batch from the producer
+                        producer_tile = min(tile_id, len(prev_core_tile_done) - 1)
+                        ready_time = prev_core_tile_done[producer_tile] + static_noc_latency[core_id - 1]
+                        start_time = max(start_time, ready_time)
+
+                    last_tile = (batch_id == last_sim_batch) and (tile_id == num_tiles - 1)
+                    cycles_per_tile = this_layer_sim[core_id].run_mem_sim_tile_lp(core_id=core_id,
+                                                                                  tile_id=tile_id,
+                                                                                  init_time=start_time,
+                                                                                  last_tile=last_tile,
+                                                                                  trace_tile_id=tiles_done[core_id])
+                    tiles_done[core_id] += 1
+                    core_free_time[core_id] = start_time + cycles_per_tile
+                    this_core_tile_done += [core_free_time[core_id]]
+
+                prev_core_tile_done = this_core_tile_done
+
+            batch_done_time += [prev_core_tile_done[-1]]
+            if batch_id > 0:
+                batch_intervals += [batch_done_time[-1] - batch_done_time[-2]]
+
+            if steady_state_batch < 0 and self.is_lp_steady_state(batch_intervals):
+                steady_state_batch = batch_id
+                steady_state_interval = batch_intervals[-1]
+                # Simulate one more batch so that the buffers get drained, extrapolate the rest
+                last_sim_batch = min(last_sim_batch, batch_id + 1)
+
+            if self.verbose:
+                print('LP batch ' + str(batch_id) + ' done at cycle ' + str(batch_done_time[-1]))
+            batch_id += 1
+
+        if steady_state_batch < 0:
+            if len(batch_intervals) > 0:
+                steady_state_interval = batch_intervals[-1]
+            else:
+                steady_state_interval = batch_done_time[0]
+
+        num_sim_batches = len(batch_done_time)
+        total_cycles = batch_done_time[-1] + (num_batches - num_sim_batches) * steady_state_interval
+
+        self.lp_fill_latency = batch_done_time[0]
+        self.lp_initiation_interval = steady_state_interval
+        self.lp_total_cycles = total_cycles
+        self.lp_simulated_batches = num_sim_batches
+        self.lp_steady_state_batch = steady_state_batch
+
+        for core_id in range(num_cores):
+            if self.verbose:
+                print("SAVING TRACES")
+            this_layer_sim[core_id].save_traces()
+
+            this_layer_sim[core_id].gather_report_items_across_cores()
+
+        print("Total Cycles taken for the sim is ", total_cycles)
+        print("Fill latency:", self.lp_fill_latency,
+              "Steady state initiation interval:", self.lp_initiation_interval,
+              "Samples per cycle:", self.get_lp_samples_per_cycle())
+        self.runs_done = True
+        self.generate_all_reports()
+        self.save_throughput_report()
+
+    #
+    def is_lp_steady_state(self, batch_intervals):
+        window = self.lp_steady_state_window
+        if len(batch_intervals) < window:
+            return False
+
+        last_intervals = batch_intervals[-window:]
+        ref = last_intervals[-1]
+        for interval in last_intervals:
+            if abs(interval - ref) > self.lp_steady_state_tolerance * ref:
+                return False
+
+        return True
+
+    #
+    def get_lp_samples_per_cycle(self):
+        if self.lp_initiation_interval == 0:
+            return 0
+        return 1 / self.lp_initiation_interval
+
+    def setup_tenant_layer_sims(self, tenant_id=0, num_cores=1):
+        # Every tenant gets its own workload and partition table, sized to its core quota
+        tenant_workload_obj = WorkloadManager()
+        tenant_workload_obj.read_topologies(
+            workload_filename=self.tenant_config_obj.get_tenant_topology_file(tenant_id)
+        )
+
+        tenant_config_obj = copy.deepcopy(self.config_obj)
+        tenant_config_obj.set_num_cores(num_cores)
+
+        tenant_partition_obj = PartitionManager()
+        tenant_partition_obj.set_params(config_obj=tenant_config_obj, workload_obj=tenant_workload_obj)
+        if self.autopartition:
+            tenant_partition_obj.create_partition_table()
+        else:
+            tenant_partition_obj.read_user_partition_table(
+                filename=self.tenant_config_obj.get_tenant_partition_file(tenant_id)
+            )
+
+        single_arr_config = self.get_single_arr_config()
+        log_top_path = self.top_path + '/tenant' + str(tenant_id)
+        layer_sims = []
+        mac_ops = 0
+        for layer_id in range(tenant_workload_obj.get_num_layers()):
+            if not tenant_workload_obj.is_matmul_layer(layer_id):
+                continue    # SIMD layers are not scheduled on the shared cores yet
+
+            this_layer_op_mat_obj = self.create_layer_operand_matrix(single_arr_config, tenant_workload_obj, layer_id)
+
+            this_layer_sim = SingleLayerSim()
+            this_layer_sim.set_params(config_obj=tenant_config_obj,
+                                      op_mat_obj=this_layer_op_mat_obj,
+                                      partitioner_obj=tenant_partition_obj,
+                                      noc_obj=self.noc,
+                                      layer_id=layer_id, core_id=layer_id,
+                                      log_top_path=log_top_path,
+                                      verbosity=self.verbose,
+                                      compress_demand=self.enable_compressed_demand,
+                                      fold_demand=self.enable_fold_demand)
+            this_layer_sim.run_single_layer_tiled_compute()
+            assert len(this_layer_sim.compute_node_list) <= num_cores, \
+                'Layer ' + str(layer_id) + ' of tenant ' + self.tenant_config_obj.get_tenant_name(tenant_id) \
+                + ' has more parts than the cores of the tenant'
+
+            layer_sims += [this_layer_sim]
+            mac_ops += tenant_workload_obj.get_layer_mac_ops(layer_id)
+
+        self.tenant_mac_ops[tenant_id] = mac_ops
+        return layer_sims
+
+    def run_multi_tenant(self):
+        # Co-schedules the tenants of the tenant config on one chip. The layers of a tenant
+        # run one after the other, each partitioned over the cores of the tenant. Tenants
+        # are walked in priority order, so higher priority tenants claim shared cores first.
+        # Every tile sends its traffic over the NoC to the DRAM node. Like in run_lp, the
+        # first pass uses the static NoC latency and the second pass the delivered latency
+        # of the same transactions, which includes the contention between tenants.
+        assert self.params_valid, "Cannot run simulation without inputs"
+
+        num_tenants = self.tenant_config_obj.get_num_tenants()
+        total_cores = self.config_obj.get_num_cores()
+        core_allocation = self.tenant_config_obj.get_core_allocation(total_cores=total_cores)
+        if self.verbose and self.tenant_config_obj.is_time_shared(total_cores=total_cores):
+            print('Tenants ask for more than ' + str(total_cores) + ' cores, cores will be time shared')
+
+        for tenant_id in range(num_tenants):
+            if self.verbose:
+                print('Setting up tenant ' + self.tenant_config_obj.get_tenant_name(tenant_id)
+                      + ' on cores ' + str(core_allocation[tenant_id]))
+            self.tenant_layer_sims[tenant_id] = self.setup_tenant_layer_sims(tenant_id=tenant_id,
+                                                                             num_cores=len(core_allocation[tenant_id]))
+
+        noc_txns = {}
+        self.schedule_tenant_tiles(core_allocation, noc_txns, first_pass=True)
+
+        self.noc.deliver_all_txns()
+        for tenant_id in range(num_tenants):
+            for this_layer_sim in self.tenant_layer_sims[tenant_id]:
+                this_layer_sim.setup_memory_all_parts()
+
+        self.schedule_tenant_tiles(core_allocation, noc_txns, first_pass=False)
+
+        for tenant_id in range(num_tenants):
+            for this_layer_sim in self.tenant_layer_sims[tenant_id]:
+                if self.verbose:
+                    print("SAVING TRACES")
+                this_layer_sim.save_traces(1)
+                this_layer_sim.gather_report_items_across_cores()
+
+        for tenant_id in self.tenant_config_obj.get_tenant_ids_by_priority():
+            print("Tenant", self.tenant_config_obj.get_tenant_name(tenant_id),
+                  "start:", self.tenant_start_time[tenant_id],
+                  "finish:", self.tenant_finish_time[tenant_id])
+        print("Total Cycles taken for the sim is ", self.get_multi_tenant_makespan())
+        self.runs_done = True
+        self.save_multi_tenant_report()
+
+    def schedule_tenant_tiles(self, core_allocation, noc_txns, first_pass=True):
+        # noc_txns maps (tenant, layer, part, tile) to the (tracking id, post time) of the
+        # DRAM transaction, filled in the first pass and read back in the second
+        dram_node = self.tenant_config_obj.get_dram_node()
+
+        core_free_time = {}
+        for tenant_id in core_allocation:
+            for core_id in core_allocation[tenant_id]:
+                core_free_time[core_id] = 0
+
+        for tenant_id in self.tenant_config_obj.get_tenant_ids_by_priority():
+            tenant_cores = core_allocation[tenant_id]
+            layer_start_time = 0
+            tenant_start_time = -1
+
+            for this_layer_sim in self.tenant_layer_sims[tenant_id]:
+                layer_finish_time = layer_start_time
+                for part_idx in range(len(this_layer_sim.compute_node_list)):
+                    core_id = tenant_cores[this_layer_sim.get_part_core(part_idx)]
+                    per_tile_size = this_layer_sim.compute_node_list[part_idx].per_tile_size
+                    num_tiles = this_layer_sim.get_part_num_tiles(part_idx)
+
+                    time_current = max(core_free_time[core_id], layer_start_time)
+                    if tenant_start_time < 0 or time_current < tenant_start_time:
+                        tenant_start_time = time_current
+
+                    for tile_id in range(num_tiles):
+                        time_current += this_layer_sim.run_mem_sim_tile_part(part_idx=part_idx,
+                                                                             core_id=core_id,
+                                                                             tile_id=tile_id,
+                                                                             init_time=time_current,
+                                                                             last_tile=(tile_id == num_tiles - 1))
+                        if core_id == dram_node:
+                            continue
+
+                        txn_key = (tenant_id, this_layer_sim.layer_id, part_idx, tile_id)
+                        if first_pass:
+                            tracking_id = self.noc.post(time_current, core_id, dram_node, per_tile_size)
+                            noc_txns[txn_key] = (tracking_id, time_current)
+                            noc_cycles = self.noc.get_static_latency(core_id, dram_node, per_tile_size)
+                        else:
+                            tracking_id, pushed_in_time = noc_txns[txn_key]
+                            noc_cycles = self.noc.get_latency(tracking_id) - pushed_in_time
+                        time_current += noc_cycles
+
+                    core_free_time[core_id] = time_current
+                    layer_finish_time = max(layer_finish_time, time_current)
+
+                layer_start_time = layer_finish_time
+
+            self.tenant_start_time[tenant_id] = max(tenant_start_time, 0)
+            self.tenant_finish_time[tenant_id] = layer_start_time
+
+    #
+    def get_multi_tenant_makespan(self):
+        return max(self.tenant_finish_time.values())
+
+    #
+    def save_multi_tenant_report(self):
+        assert self.runs_done
+
+        reports_dir = self.top_path + "/traces"
+        SingleLayerSim.check_and_build(reports_dir)
+
+        multi_tenant_report_name = reports_dir + "/MULTI_TENANT_REPORT.csv"
+        multi_tenant_report = open(multi_tenant_report_name, "w")
+        # All the tenants arrive at cycle 0, so the finish cycle is also the tenant latency
+        header = "Tenant, Priority, Num Cores, Start Cycle, Finish Cycle, MAC Ops, MACs Per Cycle,\n"
+        multi_tenant_report.write(header)
+
+        for tenant_id in self.tenant_config_obj.get_tenant_ids_by_priority():
+            finish_time = self.tenant_finish_time[tenant_id]
+            macs_per_cycle = 0
+            if finish_time:
+                macs_per_cycle = self.tenant_mac_ops[tenant_id] / finish_time
+            log = ", ".join(
+                [
+                    str(x)
+                    for x in [
+                        self.tenant_config_obj.get_tenant_name(tenant_id),
+                        self.tenant_config_obj.get_tenant_priority(tenant_id),
+                        self.tenant_config_obj.get_tenant_num_cores(tenant_id),
+                        self.tenant_start_time[tenant_id],
+                        finish_time,
+                        self.tenant_mac_ops[tenant_id],
+                        macs_per_cycle,
+                    ]
+                ]
+            )
+            log += ",\n"
+            multi_tenant_report.write(log)
+
+        # Aggregate over all the tenants
+        makespan = self.get_multi_tenant_makespan()
+        total_mac_ops = sum(self.tenant_mac_ops.values())
+        macs_per_cycle = 0
+        if makespan:
+            macs_per_cycle = total_mac_ops / makespan
+        log = "ALL, -, " + str(self.config_obj.get_num_cores()) + ", 0, "
+        log += ", ".join([str(x) for x in [makespan, total_mac_ops, macs_per_cycle]])
+        log += ",\n"
+        multi_tenant_report.write(log)
+
+        multi_tenant_report.close()
 
 #############################################
 ##### Tiles based experiment
@@ -407,13 +1015,15 @@ class Simulator:
         for layer_id in range(num_layers):
             if self.verbose:
                 print('Running Layer ' + str(layer_id))
-            this_layer_op_mat_obj = operand_matrix()
             layer_params = self.workload_obj.get_layer_params(layer_id)
-            if (layer_params[0] in ['conv', 'gemm']):
-                this_layer_op_mat_obj.set_params(config_obj=single_arr_config,
-                                             topoutil_obj=self.workload_obj,
-                                             layer_id=layer_id)
-                this_layer_op_mat_obj.create_operand_matrices()
+            reuse_id = self.get_layer_reuse_id(layer_id)
+            if reuse_id != layer_id:
+                if self.verbose:
+                    print('Reusing the results of Layer ' + str(reuse_id))
+                self.single_layer_objects_list += [self.single_layer_objects_list[reuse_id]]
+                self.reused_layer_ids += [layer_id]
+            elif self.workload_obj.is_matmul_layer(layer_id):
+                this_layer_op_mat_obj = self.create_layer_operand_matrix(single_arr_config, self.workload_obj, layer_id)
 
                 this_layer_sim = SingleLayerSim()
                 this_layer_sim.set_params(config_obj=self.config_obj,
@@ -421,7 +1031,10 @@ class Simulator:
                                       partitioner_obj=self.partition_obj,
                                       layer_id=layer_id,core_id= layer_id,
                                       log_top_path=self.top_path,
-                                      verbosity=self.verbose)
+                                      verbosity=self.verbose,
+                                      extrapolate_steady_state=self.enable_steady_state_extrapolation,
+                                      compress_demand=self.enable_compressed_demand,
+                                      fold_demand=self.enable_fold_demand)
                 this_layer_sim.run_single_layer_ls_tiled(self.noc) ## For now running only one layer support . 
                 #Multi layers required time to be passed out of a layer sim and provided for the next one.
                 
@@ -431,33 +1044,102 @@ class Simulator:
                     print('SAVING TRACES',this_layer_sim.all_node_mem_objects[0].traces_valid)
                 this_layer_sim.save_traces(self.enable_ls_partition_tile_based)
                 this_layer_sim.gather_report_items_across_cores()
+            elif (layer_params[0] in ['activation']) and self.is_fused_activation(layer_id):
+                producer_id = self.workload_obj.get_fusion_producer(layer_id)
+                self.run_fused_activation(layer_id, self.single_layer_objects_list[producer_id])
             elif (layer_params[0] in ['activation']):
-                op_matrix = self.single_layer_objects_list[layer_id-1].get_ofmap_operand_matrix()
+                input_handoff = self.get_input_handoff(layer_id)
 
                 this_layer_sim = SingleLayerSim()
                 this_layer_sim.set_params(config_obj=self.config_obj,
-                                      op_mat_obj=this_layer_op_mat_obj,
                                       partitioner_obj=self.partition_obj,
                                       layer_id=layer_id,
                                       log_top_path=self.top_path,
                                       verbosity=self.verbose)
-                this_layer_sim.run_simd_all_parts(operand_matrix=op_matrix, optype = layer_params[1])
+                this_layer_sim.run_simd_all_parts(input_handoff=input_handoff, optypes=layer_params[2:])
                 self.single_layer_objects_list += [this_layer_sim]
-                
-                this_layer_sim.gather_simd_report_items_across_cores()
         
         self.runs_done = True
         self.generate_all_reports()  
         #assert (0) # WTF you cnat come here yet
 
     def run(self):
-        if self.enable_ls_partition:
+        if self.enable_multi_tenant:
+            self.run_multi_tenant()
+        elif self.decode_workload is not None:
+            self.run_decode()
+        elif self.enable_ls_partition:
             self.run_ls()
         elif (self.enable_ls_partition_tile_based):
             self.run_ls_tile_execution()
+        elif self.lp_num_batches > 1:
+            self.run_lp_throughput()
         else:
             self.run_lp()
 
+        if self.mapping_output_filename != "":
+            self.optimize_core_placement()
+
+        if self.runtime_estimator is not None and self.cycles_report_ready:
+            self.save_calibration_samples()
+
+    def run_decode(self):
+        # Every sampled decode step is a workload of its own, run in the selected mode.
+        # The steps in between are interpolated in DECODE_REPORT.csv.
+        for step in self.decode_workload.get_sample_steps():
+            if self.verbose:
+                print('Running decode step ' + str(step))
+            self.workload_obj = self.decode_workload.create_step_workload(step)
+            self.partition_obj.set_params(config_obj=self.config_obj, workload_obj=self.workload_obj)
+            if self.autopartition:
+                self.partition_obj.create_partition_table()
+            self.reset_run_state()
+
+            if self.enable_ls_partition:
+                self.run_ls()
+            elif self.enable_ls_partition_tile_based:
+                self.run_ls_tile_execution()
+            else:
+                self.run_lp()
+            self.decode_workload.set_step_cycles(step, self.get_run_cycles())
+
+        self.save_decode_report()
+
+    def reset_run_state(self):
+        # Layer sims and report items of the previous run
+        self.single_layer_objects_list = []
+        self.fused_layer_ids = []
+        self.reused_layer_ids = []
+        self.forwarding_buffers = []
+        self.cycles_report_avg_items = []
+        self.bandwidth_report_avg_items = []
+        self.detailed_report_avg_items = []
+        self.cycles_report_ready = False
+        self.bandwidth_report_ready = False
+        self.detailed_report_ready = False
+        self.runs_done = False
+
+    def get_run_cycles(self):
+        # Latency of the last run: the pipeline in LP, the sum of the slowest part of every layer otherwise
+        assert self.runs_done
+        if not (self.enable_ls_partition or self.enable_ls_partition_tile_based):
+            return self.lp_total_cycles
+        return sum([max(layer_sim.total_cycles_list) for layer_sim in self.single_layer_objects_list])
+
+    def optimize_core_placement(self):
+        # Remaps the logical cores to cut the traffic weighted hops of this run's NoC posts
+        placement_optimizer = PlacementOptimizer()
+        placement_optimizer.set_params(network_config_obj=self.network_config_obj,
+                                       traffic_matrix=self.noc.get_traffic_matrix())
+        best_mapping = placement_optimizer.optimize()
+
+        self.network_config_obj.set_logical_to_physical_mapping(best_mapping)
+        self.network_config_obj.write_network_config(self.mapping_output_filename)
+
+        print("Placement cost (bytes x hops):", placement_optimizer.get_initial_cost(),
+              "->", placement_optimizer.get_best_cost(),
+              ", mapping written to", self.mapping_output_filename)
+
     def generate_all_reports(self):
         self.create_cycles_report_structures()
         self.create_bandwidth_report_structures()
@@ -465,6 +1147,12 @@ class Simulator:
         self.save_all_cycle_reports()
         self.save_all_bw_reports()
         self.save_all_detailed_reports()
+        if len(self.fused_layer_ids) > 0:
+            self.save_fusion_report()
+        if self.enable_ls_partition_tile_based and self.config_obj.is_shared_dram():
+            self.save_dram_report()
+        if self.config_obj.is_shared_dram():
+            self.save_dram_channel_report()
 
     # Report generation
     def create_cycles_report_structures(self):
@@ -472,7 +1160,7 @@ class Simulator:
 
         for lid in range(self.workload_obj.get_num_layers()):
             layer_params = self.workload_obj.get_layer_params(lid)
-            if layer_params[0] in ["conv", "gemm", "activation"]:
+            if layer_params[0] in self.workload_obj.matmul_layer_types + ["activation"]:
                 this_layer_sim_obj = self.single_layer_objects_list[lid]
                 total_cycles_list = this_layer_sim_obj.total_cycles_list
                 stall_cycles_list = this_layer_sim_obj.stall_cycles_list
@@ -491,8 +1179,7 @@ class Simulator:
         assert self.runs_done
 
         for lid in range(self.workload_obj.get_num_layers()):
-            layer_params = self.workload_obj.get_layer_params(lid)
-            if layer_params[0] in ["conv", "gemm"]:
+            if self.workload_obj.is_matmul_layer(lid):
                 this_layer_sim_obj = self.single_layer_objects_list[lid]
                 avg_ifmap_sram_bw_list = this_layer_sim_obj.avg_ifmap_sram_bw_list
                 avg_ifmap_dram_bw_list = this_layer_sim_obj.avg_ifmap_dram_bw_list
@@ -526,8 +1213,7 @@ class Simulator:
         assert self.runs_done
 
         for lid in range(self.workload_obj.get_num_layers()):
-            layer_params = self.workload_obj.get_layer_params(lid)
-            if layer_params[0] in ["conv", "gemm"]:
+            if self.workload_obj.is_matmul_layer(lid):
                 this_layer_sim_obj = self.single_layer_objects_list[lid]
                 ifmap_sram_start_cycle_list = (
                     this_layer_sim_obj.ifmap_sram_start_cycle_list
@@ -641,7 +1327,7 @@ class Simulator:
 
         for lid in range(self.workload_obj.get_num_layers()):
             layer_params = self.workload_obj.get_layer_params(lid)
-            if layer_params[0] in ["conv", "gemm", "activation"]:
+            if layer_params[0] in self.workload_obj.matmul_layer_types + ["activation"]:
                 log = str(lid) + ", "
                 log += ", ".join(
                     [
@@ -668,8 +1354,7 @@ class Simulator:
         bandwidth_report.write(header)
 
         for lid in range(self.workload_obj.get_num_layers()):
-            layer_params = self.workload_obj.get_layer_params(lid)
-            if layer_params[0] in ["conv", "gemm"]:
+            if self.workload_obj.is_matmul_layer(lid):
                 log = str(lid) + ", "
                 log += ", ".join(
                     [
@@ -701,8 +1386,7 @@ class Simulator:
         detailed_report.write(header)
 
         for lid in range(self.workload_obj.get_num_layers()):
-            layer_params = self.workload_obj.get_layer_params(lid)
-            if layer_params[0] in ["conv", "gemm"]:
+            if self.workload_obj.is_matmul_layer(lid):
                 log = str(lid) + ", "
                 log += ", ".join(
                     [
@@ -716,3 +1400,150 @@ class Simulator:
                 detailed_report.write(log)
 
         detailed_report.close()
+
+    def save_fusion_report(self):
+        # DRAM traffic of the intermediate ofmaps that the fused activations do not re-read and write back
+        assert self.runs_done
+
+        fusion_report_name = self.top_path + "/traces" + "/FUSION_REPORT.csv"
+        fusion_report = open(fusion_report_name, "w")
+        header = "LayerID, Fused Into LayerID, Ops, Intermediate Words, Saved DRAM Words,\n"
+        fusion_report.write(header)
+
+        total_saved_words = 0
+        for lid in self.fused_layer_ids:
+            producer_id = self.workload_obj.get_fusion_producer(lid)
+            saved_words = self.workload_obj.get_fusion_saved_words(lid)
+            total_saved_words += saved_words
+            log = ", ".join(
+                [
+                    str(x)
+                    for x in [
+                        lid,
+                        producer_id,
+                        " ".join(self.workload_obj.get_layer_params(lid)[2:]),
+                        self.workload_obj.get_layer_num_ofmap_px(producer_id),
+                        saved_words,
+                    ]
+                ]
+            )
+            log += ",\n"
+            fusion_report.write(log)
+
+        fusion_report.close()
+        if self.verbose:
+            print("Fused " + str(len(self.fused_layer_ids)) + " activation layers, saved "
+                  + str(total_saved_words) + " DRAM words")
+
+    def save_dram_report(self):
+        # Traffic and contention of the DRAM port shared by the cores, per layer
+        assert self.runs_done
+
+        dram_report_name = self.top_path + "/traces" + "/DRAM_REPORT.csv"
+        dram_report = open(dram_report_name, "w")
+        header = "LayerID, Words, Busy Cycles, Row Hits, Row Misses, Contention Stall Cycles,\n"
+        dram_report.write(header)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            if not self.workload_obj.is_matmul_layer(lid):
+                continue
+            this_layer_sim_obj = self.single_layer_objects_list[lid]
+            log = ", ".join([str(x) for x in [lid] + this_layer_sim_obj.get_dram_report_items()])
+            log += ",\n"
+            dram_report.write(log)
+
+        dram_report.close()
+
+    def save_dram_channel_report(self):
+        # Traffic and utilization of every DRAM channel, per layer, shows the channels the offsets hot-spot
+        assert self.runs_done
+
+        dram_channel_report_name = self.top_path + "/traces" + "/DRAM_CHANNEL_REPORT.csv"
+        dram_channel_report = open(dram_channel_report_name, "w")
+        header = "LayerID, Channel, Words, Busy Cycles, Utilization (%),\n"
+        dram_channel_report.write(header)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            if not self.workload_obj.is_matmul_layer(lid):
+                continue
+            this_layer_sim_obj = self.single_layer_objects_list[lid]
+            layer_cycles = max(this_layer_sim_obj.total_cycles_list)
+            channel_items = this_layer_sim_obj.get_dram_channel_report_items()
+            for channel in range(len(channel_items)):
+                words, busy_cycles = channel_items[channel]
+                utilization = 0
+                if layer_cycles > 0:
+                    utilization = min(100, busy_cycles * 100 / layer_cycles)
+                log = ", ".join([str(x) for x in [lid, channel, words, busy_cycles, utilization]])
+                log += ",\n"
+                dram_channel_report.write(log)
+
+        dram_channel_report.close()
+
+    def save_forwarding_report(self):
+        # SRAM to SRAM hand-off between the LP stages
+        assert self.runs_done
+
+        stage_layers = self.get_lp_stage_layers()
+        forwarding_report_name = self.top_path + "/traces" + "/FORWARDING_REPORT.csv"
+        forwarding_report = open(forwarding_report_name, "w")
+        header = "Producer LayerID, Consumer LayerID, Tile Words, Capacity Words, Depth (Tiles), "
+        header += "Peak Occupancy Words, Avg Occupancy Words, Back Pressure Cycles,\n"
+        forwarding_report.write(header)
+
+        for core_id in range(len(self.forwarding_buffers)):
+            forwarding_buffer = self.forwarding_buffers[core_id]
+            peak_words, avg_words = forwarding_buffer.get_occupancy()
+            log = ", ".join(
+                [
+                    str(x)
+                    for x in [
+                        stage_layers[core_id],
+                        stage_layers[core_id + 1],
+                        forwarding_buffer.tile_words,
+                        forwarding_buffer.capacity_words,
+                        forwarding_buffer.get_depth(),
+                        peak_words,
+                        avg_words,
+                        forwarding_buffer.get_backpressure_cycles(),
+                    ]
+                ]
+            )
+            log += ",\n"
+            forwarding_report.write(log)
+
+        forwarding_report.close()
+
+    def save_decode_report(self):
+        decode_report_name = self.top_path + "/traces" + "/DECODE_REPORT.csv"
+        self.decode_workload.save_decode_report(filename=decode_report_name)
+        if self.verbose:
+            print("Decode steps simulated:", self.decode_workload.get_sample_steps())
+
+    def save_throughput_report(self):
+        assert self.runs_done
+
+        throughput_report_name = self.top_path + "/traces" + "/THROUGHPUT_REPORT.csv"
+        throughput_report = open(throughput_report_name, "w")
+        header = "Batches, Simulated Batches, Steady State Batch, Fill Latency, "
+        header += "Initiation Interval, Total Cycles, Samples Per Cycle,\n"
+        throughput_report.write(header)
+
+        log = ", ".join(
+            [
+                str(x)
+                for x in [
+                    self.lp_num_batches,
+                    self.lp_simulated_batches,
+                    self.lp_steady_state_batch,
+                    self.lp_fill_latency,
+                    self.lp_initiation_interval,
+                    self.lp_total_cycles,
+                    self.get_lp_samples_per_cycle(),
+                ]
+            ]
+        )
+        log += ",\n"
+        throughput_report.write(log)
+
+        throughput_report.close()
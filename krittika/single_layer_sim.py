@@ -7,6 +7,13 @@ from scalesim.memory.double_buffered_scratchpad_mem import double_buffered_scrat
 from krittika.config.krittika_config import KrittikaConfig
 from krittika.partition_manager import PartitionManager
 from krittika.compute.compute_node import ComputeNode
+from krittika.compute.simd.simd_timing import SimdTiming
+from krittika.steady_state_detector import SteadyStateDetector
+from krittika.partition_view import PartitionView
+from krittika.tensor_handoff import TensorHandoff
+from krittika.compute.conv_operand_matrix import Im2colMatrix
+from krittika.static_utilities import StaticUtilities
+from krittika.dram_arbiter import DramArbiter
 
 
 class SingleLayerSim:
@@ -33,6 +40,7 @@ class SingleLayerSim:
         self.num_filter_part = 0
         self.compute_node_list = []
         self.all_node_mem_objects = []
+        self.partition_view = PartitionView()
 
         #
         self.log_top_path = './'
@@ -73,9 +81,26 @@ class SingleLayerSim:
         self.avg_filter_dram_bw_list = []
         self.avg_ofmap_dram_bw_list = []
 
-        self.ifmap_demand_mat =[]
-        self.filter_map_demand_mat = []
-        self.ofmap_demand_mat = []
+        self.lp_compute_node = None     # Node whose demand the LP tiles are cut from
+        self.post_op_cycles_per_tile = 0    # SIMD activations fused into this LP stage, per ofmap tile
+        self.ofmap_handoff = None   # Shape, addresses and parts of the ofmap, for the layers consuming it
+        self.compress_demand = False
+        self.fold_demand = False
+
+        # Batched and grouped layers: the demand of one instance is replayed for every instance
+        # this core runs, with the addresses moved by the words of an instance each time
+        self.num_instances = 1
+        self.instance_words = (0, 0, 0)
+        self.report_instance_scale = 1
+
+        # Shared DRAM port of the tiled runs: the tiles of a round contend for it
+        self.dram_arbiter = None
+        self.dram_stall_cycles = {}     # Per part
+        self.prev_tile_dram_reads = {}  # Per part, the reads of the previous tile still held in the buffers
+
+        # LP hand-off: the ifmap comes from the stage before over the NoC, the ofmap goes to the stage after
+        self.input_forwarding = None
+        self.output_forwarding = None
 
         # Flags
         self.verbose = True
@@ -84,14 +109,22 @@ class SingleLayerSim:
         self.mem_traces_done = False
         self.report_metrics_ready = False
         self.core_id=0
-        self.skip_dram_reads=0
-        self.skip_dram_writes=0
         self.num_cores = 0
         self.tile_number = -1
 
         self.tracking_id = {}
         self.pushed_in_time = {}
 
+        # Steady state extrapolation of uniform tile streams: Per part
+        self.extrapolate_steady_state = False
+        self.steady_state_detectors = {}
+        self.extrapolation_start_tile = {}
+        self.extrapolation_period = {}
+        self.extrapolated_tiles = {}
+        self.extrapolated_cycles = {}
+        self.extrapolated_stall_cycles = {}
+        self.cycles_per_tile = 0
+
     #
     def set_params(self,
                    config_obj=KrittikaConfig(),
@@ -100,7 +133,10 @@ class SingleLayerSim:
                    noc_obj = None,
                    layer_id=0,core_id=0,
                    verbosity=True,
-                   log_top_path='./',skip_dram_reads=False,skip_dram_writes=False, num_cores= 1 , enable_lp_partition = 0 ):
+                   log_top_path='./', num_cores= 1 , enable_lp_partition = 0,
+                   extrapolate_steady_state=False,
+                   compress_demand=False,
+                   fold_demand=False):
 
         self.verbose = verbosity
         self.log_top_path = log_top_path
@@ -110,16 +146,54 @@ class SingleLayerSim:
         self.partitioner_obj = partitioner_obj
         self.noc_obj    = noc_obj
 
+        # On heterogeneous chips the compute and memory of the layer follow its core type.
+        # LP pins the layer to core_id, otherwise the partitioner picks the type.
+        self.core_type = 'default'
+        self.compute_params = None     # Unit and dataflow, from the partition table if not set
+        if config_obj.is_heterogeneous():
+            if enable_lp_partition:
+                # The unit and dataflow of the entry may not exist on the core the stage is pinned to
+                self.core_type = config_obj.get_core_type(core_id)
+                self.compute_params = partitioner_obj.get_core_type_compute_params(layer_id=layer_id,
+                                                                                   type_name=self.core_type)
+            else:
+                self.core_type = partitioner_obj.get_layer_core_type(layer_id)
+            self.config_obj = config_obj.get_core_type_config(self.core_type)
+
         self.layer_id = layer_id
         self.core_id = core_id
         self.params_set = True
-        self.skip_dram_reads = skip_dram_reads
-        self.skip_dram_writes = skip_dram_writes
         self.num_cores = num_cores
         self.enable_lp_partition = enable_lp_partition
         self.per_tile_size = 0
         self.total_tiles_ifmap_layer =0 
         self.total_tiles_filter_map_layer=0
+        self.extrapolate_steady_state = extrapolate_steady_state
+        # Tiles are expanded from CSR demand, for sparse demand of small parts on big arrays
+        self.compress_demand = compress_demand
+        # Tiles are generated from their fold of the operands, only one fold of demand is held
+        self.fold_demand = fold_demand
+
+        workload_obj = partitioner_obj.workload
+        self.num_instances = partitioner_obj.get_layer_instances_per_part(layer_id=layer_id,
+                                                                          single_core=enable_lp_partition)
+        if self.num_instances > 1:
+            self.instance_words = workload_obj.get_layer_instance_words(layer_id)
+
+        self.dram_arbiter = None
+        if self.config_obj.is_shared_dram():
+            burst_words, row_words, row_miss_latency = self.config_obj.get_dram_burst_params()
+            num_channels, interleaving, channel_latency = self.config_obj.get_dram_channel_params()
+            self.dram_arbiter = DramArbiter()
+            self.dram_arbiter.set_params(bandwidth=self.config_obj.get_shared_dram_bandwidth(),
+                                         policy=self.config_obj.get_dram_arbitration_policy(),
+                                         burst_words=burst_words,
+                                         row_words=row_words,
+                                         row_miss_latency=row_miss_latency,
+                                         num_channels=num_channels,
+                                         interleaving=interleaving,
+                                         channel_latency=channel_latency,
+                                         operand_offsets=self.config_obj.get_operand_offsets())
     #
     def run_single_layer_ls(self):
         self.num_input_part, self.num_filter_part = self.partitioner_obj.get_layer_partitions(layer_id=self.layer_id)
@@ -148,112 +222,199 @@ class SingleLayerSim:
         self.run_mem_sim_all_parts_tiled_noc(noc_obj)
 
     def run_compute_all_parts_tiled_noc(self):
-        ifmap_matrix, filter_matrix, ofmap_matrix = self.op_mat_obj.get_all_operand_matrix()
-        compute_unit, opt_dataflow = self.partitioner_obj.get_opt_compute_params(layer_id=self.layer_id)
-        input_rows_per_part = math.ceil(ifmap_matrix.shape[0] / self.num_input_part)
-        filter_cols_per_part = math.ceil(filter_matrix.shape[1] / self.num_filter_part)
-
-        for inp_part in range(self.num_input_part):
-            ifmap_row_start = inp_part * input_rows_per_part
-            ifmap_row_end = min(ifmap_row_start + input_rows_per_part, ifmap_matrix.shape[0])
-            ifmap_part = ifmap_matrix[ifmap_row_start:ifmap_row_end,:]
-            for filt_part in range(self.num_filter_part):
-
-                filt_col_start = filt_part * filter_cols_per_part
-                filt_col_end = min(filt_col_start + filter_cols_per_part, filter_matrix.shape[1])
-
-                filter_part = filter_matrix[:, filt_col_start: filt_col_end]
-                ofmap_part = ofmap_matrix[ifmap_row_start: ifmap_row_end, filt_col_start:filt_col_end]
-
-                this_part_compute_node = ComputeNode()
-                this_part_compute_node.set_params(config=self.config_obj,
-                                                  compute_unit=compute_unit,
-                                                  dataflow=opt_dataflow)
-
-                this_part_compute_node.set_operands(ifmap_opmat=ifmap_part,
-                                                    filter_opmat=filter_part,
-                                                    ofmap_opmat=ofmap_part)
-                this_part_compute_node.calc_demand_matrices()
-                
-                this_part_compute_node.compute_node_total_tiles_ifmap_layer = this_part_compute_node.selected_compute_node.compute_unit.total_tiles_ifmap
-                this_part_compute_node.compute_node_total_tiles_filter_map_layer  = this_part_compute_node.selected_compute_node.compute_unit.total_tiles_filter_map
-                assert this_part_compute_node.compute_node_total_tiles_ifmap_layer == this_part_compute_node.compute_node_total_tiles_filter_map_layer
-                this_part_compute_node.per_tile_size =  this_part_compute_node.selected_compute_node.compute_unit.ifmap_demand_matrix.shape[0]/ this_part_compute_node.compute_node_total_tiles_ifmap_layer
-                self.compute_node_list += [this_part_compute_node]
+        self.setup_partition_view()
+        compute_unit, opt_dataflow = self.get_compute_params()
+
+        for part_idx in range(self.partition_view.get_num_parts()):
+            this_part_compute_node = self.create_part_compute_node(part_idx, compute_unit, opt_dataflow)
+
+            this_part_compute_node.compute_node_total_tiles_ifmap_layer = this_part_compute_node.selected_compute_node.compute_unit.total_tiles_ifmap
+            this_part_compute_node.compute_node_total_tiles_filter_map_layer  = this_part_compute_node.selected_compute_node.compute_unit.total_tiles_filter_map
+            assert this_part_compute_node.compute_node_total_tiles_ifmap_layer == this_part_compute_node.compute_node_total_tiles_filter_map_layer
+            this_part_compute_node.per_tile_size =  this_part_compute_node.selected_compute_node.compute_unit.ifmap_demand_matrix.shape[0]/ this_part_compute_node.compute_node_total_tiles_ifmap_layer
+            this_part_compute_node.tiles_per_instance = this_part_compute_node.compute_node_total_tiles_ifmap_layer
+            this_part_compute_node.compute_node_total_tiles_ifmap_layer *= self.num_instances
+            this_part_compute_node.compute_node_total_tiles_filter_map_layer *= self.num_instances
+            self.compute_node_list += [this_part_compute_node]
 
         self.compute_done = True
 
 
     def run_compute_all_parts(self):
-        ifmap_matrix, filter_matrix, ofmap_matrix = self.op_mat_obj.get_all_operand_matrix()
-        compute_unit, opt_dataflow = self.partitioner_obj.get_opt_compute_params(layer_id=self.layer_id)
-        input_rows_per_part = math.ceil(ifmap_matrix.shape[0] / self.num_input_part)
-        filter_cols_per_part = math.ceil(filter_matrix.shape[1] / self.num_filter_part)
-
-        for inp_part in range(self.num_input_part):
-            ifmap_row_start = inp_part * input_rows_per_part
-            ifmap_row_end = min(ifmap_row_start + input_rows_per_part, ifmap_matrix.shape[0])
-            ifmap_part = ifmap_matrix[ifmap_row_start:ifmap_row_end,:]
-            for filt_part in range(self.num_filter_part):
-
-                filt_col_start = filt_part * filter_cols_per_part
-                filt_col_end = min(filt_col_start + filter_cols_per_part, filter_matrix.shape[1])
-
-                filter_part = filter_matrix[:, filt_col_start: filt_col_end]
-                ofmap_part = ofmap_matrix[ifmap_row_start: ifmap_row_end, filt_col_start:filt_col_end]
-
-                this_part_compute_node = ComputeNode()
-                this_part_compute_node.set_params(config=self.config_obj,
-                                                  compute_unit=compute_unit,
-                                                  dataflow=opt_dataflow)
-
-                this_part_compute_node.set_operands(ifmap_opmat=ifmap_part,
-                                                    filter_opmat=filter_part,
-                                                    ofmap_opmat=ofmap_part)
-                this_part_compute_node.calc_demand_matrices()
-                
-                self.total_tiles_ifmap_layer = this_part_compute_node.selected_compute_node.compute_unit.total_tiles_ifmap
-                self.total_tiles_filter_map_layer  = this_part_compute_node.selected_compute_node.compute_unit.total_tiles_filter_map
-            
+        self.setup_partition_view()
+        compute_unit, opt_dataflow = self.get_compute_params()
+
+        for part_idx in range(self.partition_view.get_num_parts()):
+            this_part_compute_node = self.create_part_compute_node(part_idx, compute_unit, opt_dataflow)
+
+            self.total_tiles_ifmap_layer = this_part_compute_node.selected_compute_node.compute_unit.total_tiles_ifmap
+            self.total_tiles_filter_map_layer  = this_part_compute_node.selected_compute_node.compute_unit.total_tiles_filter_map
+
+
+            assert self.total_tiles_ifmap_layer == self.total_tiles_filter_map_layer
+            if(self.total_tiles_ifmap_layer):
+                self.per_tile_size =  this_part_compute_node.selected_compute_node.compute_unit.ifmap_demand_matrix.shape[0]/ self.total_tiles_ifmap_layer
+            else:
+                self.per_tile_size = this_part_compute_node.selected_compute_node.compute_unit.ifmap_demand_matrix.shape[0]
+            this_part_compute_node.tiles_per_instance = self.total_tiles_ifmap_layer
+            self.total_tiles_ifmap_layer *= self.num_instances
+            self.total_tiles_filter_map_layer *= self.num_instances
             
-                assert self.total_tiles_ifmap_layer == self.total_tiles_filter_map_layer
-                if(self.total_tiles_ifmap_layer):
-                    self.per_tile_size =  this_part_compute_node.selected_compute_node.compute_unit.ifmap_demand_matrix.shape[0]/ self.total_tiles_ifmap_layer
-                else:
-                    self.per_tile_size = this_part_compute_node.selected_compute_node.compute_unit.ifmap_demand_matrix.shape[0]
-                
-                self.compute_node_list += [this_part_compute_node]
+            self.compute_node_list += [this_part_compute_node]
 
         self.compute_done = True
         
     #
-    def run_simd_all_parts(self, operand_matrix, optype = 'relu'):
-        
-        self.num_input_part = 1
-        self.num_filter_part = self.config_obj.get_num_cores()
+    def get_part_core(self, part_idx=0):
+        # Core (NoC node) the part runs on, the cores of the layer's core type in part order
+        layer_cores = self.partitioner_obj.get_layer_cores(layer_id=self.layer_id)
+        assert part_idx < len(layer_cores), 'Layer ' + str(self.layer_id) + ' has more parts than cores of its type'
+        return layer_cores[part_idx]
 
-        input_rows_per_part = math.ceil((operand_matrix.shape[0]) / (self.num_input_part*self.num_filter_part))
+    #
+    def get_compute_params(self):
+        if self.compute_params is not None:
+            return self.compute_params
+        return self.partitioner_obj.get_opt_compute_params(layer_id=self.layer_id)
 
-        for inp_part in range(self.num_input_part):
-            for filt_part in range(self.num_filter_part):
+    #
+    def setup_partition_view(self):
+        # The parts are views of the layer operand matrices, nothing is copied per part.
+        # The addresses are brought to native int32 (int64 for large offsets) once per layer.
+        # An implicit im2col ifmap stays implicit, a part computes its addresses in create_part_compute_node.
+        ifmap_matrix, filter_matrix, ofmap_matrix = self.op_mat_obj.get_all_operand_matrix()
+        self.partition_view = PartitionView()
+        if not isinstance(ifmap_matrix, Im2colMatrix):
+            ifmap_matrix = StaticUtilities.to_address_matrix(ifmap_matrix)
+        self.partition_view.set_params(ifmap_matrix=ifmap_matrix,
+                                       filter_matrix=StaticUtilities.to_address_matrix(filter_matrix),
+                                       ofmap_matrix=StaticUtilities.to_address_matrix(ofmap_matrix),
+                                       num_input_part=self.num_input_part,
+                                       num_filter_part=self.num_filter_part)
+
+        self.ofmap_handoff = TensorHandoff()
+        self.ofmap_handoff.set_from_matrix(producer_id=self.layer_id,
+                                           matrix=self.partition_view.ofmap_matrix,
+                                           part_bounds=[self.partition_view.get_part_bounds(part_idx)
+                                                        for part_idx in range(self.partition_view.get_num_parts())],
+                                           num_instances=self.num_instances,
+                                           instance_stride=self.instance_words[2])
 
-                operand_row_start = (inp_part+filt_part) * input_rows_per_part
-                operand_row_end = operand_row_start + input_rows_per_part
-                if operand_row_end > operand_matrix.shape[0]:
-                    operand_row_end = operand_matrix.shape[0]
+    #
+    def create_part_compute_node(self, part_idx=0, compute_unit='matmul', opt_dataflow='os'):
+        # An implicit im2col part is materialized while its demand and prefetch matrices are built,
+        # then released so that at most one dense part is alive at a time
+        ifmap_part, filter_part, ofmap_part = self.partition_view.get_part_operands(part_idx)
+        implicit_ifmap_part = ifmap_part if isinstance(ifmap_part, Im2colMatrix) else None
+        if implicit_ifmap_part is not None:
+            ifmap_part = implicit_ifmap_part.materialize()
+
+        this_part_compute_node = ComputeNode()
+        this_part_compute_node.set_params(config=self.config_obj,
+                                          compute_unit=compute_unit,
+                                          dataflow=opt_dataflow)
+
+        this_part_compute_node.set_operands(ifmap_opmat=ifmap_part,
+                                            filter_opmat=filter_part,
+                                            ofmap_opmat=ofmap_part)
+        this_part_compute_node.calc_demand_matrices()
+        if implicit_ifmap_part is not None:
+            this_part_compute_node.release_ifmap_operand(implicit_ifmap_part)
+        return this_part_compute_node
 
-                operand_part = operand_matrix[operand_row_start: operand_row_end, :]
+    #
+    def get_instance_demand_rows(self, compute_node, tile_id=0, per_tile_size=1):
+        # Rows of tile tile_id, the instances run one after another. The rows are cut from the
+        # demand of the first instance and moved to the addresses of the instance the tile is in.
+        tiles_per_instance = getattr(compute_node, 'tiles_per_instance', 0)
+        if self.num_instances == 1 or tiles_per_instance == 0:
+            instance_idx, instance_tile = 0, tile_id
+        else:
+            instance_idx, instance_tile = divmod(tile_id, tiles_per_instance)
+
+        row_start = int(instance_tile * per_tile_size)
+        row_end = row_start + int(per_tile_size)
+        demand_rows = compute_node.get_demand_rows(row_start, row_end)
+        if instance_idx == 0:
+            return demand_rows
+
+        shifted_rows = []
+        for demand_mat, words in zip(demand_rows, self.instance_words):
+            shift = instance_idx * words
+            if demand_mat.dtype != numpy.int64 and demand_mat.max(initial=0) + shift > numpy.iinfo(demand_mat.dtype).max:
+                demand_mat = demand_mat.astype(numpy.int64)
+            # Empty slots (-1) stay empty
+            shifted_rows += [numpy.where(demand_mat >= 0, demand_mat + shift, demand_mat)]
+        return tuple(shifted_rows)
 
-                this_part_compute_node = ComputeNode()
-                this_part_compute_node.set_params(config=self.config_obj,
-                                                  compute_unit='simd', optype = optype)
+    #
+    def run_simd_all_parts(self, input_handoff, optypes=()):
+        # Times the activations of this layer on the rows of its input split across the cores.
+        # Only the metadata of the input is needed, the producing layer is not run again.
+        assert len(optypes) > 0, 'No activation to run'
+        self.num_input_part = 1
+        self.num_filter_part = self.config_obj.get_num_cores()
 
-                this_part_compute_node.set_operands(ifmap_opmat=operand_part)
+        part_row_starts, part_row_ends = input_handoff.get_row_parts(self.num_filter_part)
+        _, num_cols = input_handoff.get_shape()
+        part_elems = (part_row_ends - part_row_starts) * num_cols
 
-                self.compute_node_list += [this_part_compute_node]
+        # All the parts are timed in one call, the parts past the end of the input are left out
+        simd_length = self.config_obj.get_simd_length()
+        timing_obj = SimdTiming()
+        timing_obj.set_params(simd_length=simd_length, op_table=self.config_obj.get_simd_op_table())
+        part_cycles = sum([timing_obj.get_cycles(optype, part_elems, 1) for optype in optypes])
+        part_mapping_eff = timing_obj.get_mapping_efficiency(part_elems, 1)
 
+        used_parts = part_elems > 0
+        self.append_simd_report_items(part_cycles[used_parts], part_elems[used_parts],
+                                      part_mapping_eff[used_parts], len(optypes), simd_length)
+
+        self.ofmap_handoff = input_handoff.forward(producer_id=self.layer_id)
         self.compute_done = True
 
+    #
+    def run_simd_fused(self, producer_sim, optypes=()):
+        # Times the activations of this layer as post-ops on the ofmap tiles of every part of
+        # producer_sim, on the SIMD units of the cores that produced them. Only the ofmap sizes
+        # are needed. The parts run in parallel, the slowest one is added to the LP cycles per tile.
+        assert producer_sim.compute_done, 'The producing layer has to be computed first'
+        assert len(optypes) > 0, 'No activation to fuse'
+
+        num_tiles = producer_sim.get_num_tiles()
+        producer_handoff = producer_sim.get_ofmap_handoff()
+        part_elems = producer_handoff.get_part_num_elems()
+        part_elems_per_tile = numpy.ceil(part_elems / num_tiles).astype(numpy.int64)
+
+        simd_length = producer_sim.config_obj.get_simd_length()
+        timing_obj = SimdTiming()
+        timing_obj.set_params(simd_length=simd_length, op_table=producer_sim.config_obj.get_simd_op_table())
+        part_cycles_per_tile = sum([timing_obj.get_cycles(optype, part_elems_per_tile, 1) for optype in optypes])
+        part_mapping_eff = timing_obj.get_mapping_efficiency(part_elems_per_tile, 1)
+        producer_sim.post_op_cycles_per_tile += int(part_cycles_per_tile.max())
+
+        self.append_simd_report_items(part_cycles_per_tile * num_tiles, part_elems,
+                                      part_mapping_eff, len(optypes), simd_length)
+
+        self.ofmap_handoff = producer_handoff.forward(producer_id=self.layer_id)
+        self.compute_done = True
+        return int(part_cycles_per_tile.max())
+
+    #
+    def append_simd_report_items(self, part_cycles, part_elems, part_mapping_eff, num_ops=1, simd_length=1):
+        # One set of report items per part, a SIMD layer does not stall on memory
+        for part_idx in range(len(part_elems)):
+            total_cycles = int(part_cycles[part_idx])
+            if total_cycles:
+                compute_util = part_elems[part_idx] * num_ops / (total_cycles * simd_length)
+            else:
+                compute_util = 0
+
+            self.total_cycles_list += [total_cycles]
+            self.stall_cycles_list += [0]
+            self.overall_util_list += [compute_util * 100]
+            self.mapping_eff_list += [float(part_mapping_eff[part_idx]) * 100]
+            self.compute_util_list += [compute_util * 100]
 
     #
     def run_mem_sim_all_parts(self):
@@ -297,6 +458,8 @@ class SingleLayerSim:
 
             self.all_node_mem_objects += [this_part_mem]
 
+        # The demand of one instance stands for all the instances of this core
+        self.report_instance_scale = self.num_instances
         self.mem_traces_done = True
 ###########################################################
     def setup_again_parameter(self):
@@ -310,18 +473,8 @@ class SingleLayerSim:
 
         per_core_ifmap_bw, per_core_filter_bw, per_core_ofmap_bw\
             = self.config_obj.get_interface_bandwidths()
-        skip_dram_reads = self.skip_dram_reads
-        skip_dram_writes = self.skip_dram_writes
-        rd_buf_active_frac = 0.999
-        wr_buf_active_frac = 0.999## Pass this as a knob TODO
-        
-        if(self.skip_dram_reads and self.layer_id == 0 ): ## In LP, the first core is needs to read from mem and last core neesd to write from mem
-            skip_dram_reads = 0
-            rd_frac = 0.999
-        if(self.skip_dram_writes and self.layer_id == (self.num_cores - 1) ): ## In LP, the first core is needs to read from mem and last core neesd to write from mem
-            skip_dram_writes = 0
-            wr_frac = 0.999
-        # TODO hard coded fix thr avoe
+        skip_dram_reads, skip_dram_writes, rd_buf_active_frac, wr_buf_active_frac \
+            = self.get_forwarding_params(dram_active_frac=0.999)
         for compute_node in self.compute_node_list:
 
             self.this_part_mem.set_params(verbose=self.verbose,
@@ -339,14 +492,42 @@ class SingleLayerSim:
                                      )
 
             # Demand mat
-            self.ifmap_demand_mat, self.filter_demand_mat, self.ofmap_demand_mat \
-                = compute_node.get_demand_matrices()   
+            self.prepare_node_demand(compute_node)
+            self.lp_compute_node = compute_node
             this_node_ifmap_fetch_mat, this_node_filter_fetch_mat = compute_node.get_prefetch_matrices()
             if (self.config_obj.get_bandwidth_use_mode()=="USER"):
                 self.this_part_mem.set_read_buf_prefetch_matrices(ifmap_prefetch_mat=this_node_ifmap_fetch_mat,
                                                          filter_prefetch_mat=this_node_filter_fetch_mat
                                                          )  
-            
+
+        self.reset_steady_state(part_idx=0)
+
+    #
+    def set_forwarding_buffers(self, input_forwarding=None, output_forwarding=None):
+        # LP stages: the hand-off with the stage before and after, None at the ends of the pipeline
+        self.input_forwarding = input_forwarding
+        self.output_forwarding = output_forwarding
+
+    #
+    def get_forwarding_params(self, dram_active_frac=0.99):
+        # The buffers of a forwarded operand skip DRAM, their active fractions leave room for the
+        # tiles in flight. The buffers backed by DRAM keep dram_active_frac.
+        skip_dram_reads = self.input_forwarding is not None
+        skip_dram_writes = self.output_forwarding is not None
+        rd_buf_active_frac = dram_active_frac
+        wr_buf_active_frac = dram_active_frac
+        if skip_dram_reads:
+            rd_buf_active_frac = self.input_forwarding.get_rd_active_frac()
+        if skip_dram_writes:
+            wr_buf_active_frac = self.output_forwarding.get_wr_active_frac()
+
+        return skip_dram_reads, skip_dram_writes, rd_buf_active_frac, wr_buf_active_frac
+
+    #
+    def get_ofmap_words_per_tile(self):
+        # Ofmap words written per tile, what one LP tile forwards to the next stage
+        assert self.compute_done
+        return int(numpy.ceil(self.ofmap_handoff.get_part_num_elems().sum() / self.get_num_tiles()))
 
     def setup_memory(self, skip_adding_mem_objects = 0):  ## TODO can be moved to setup memory itself.
         assert self.compute_done
@@ -359,18 +540,8 @@ class SingleLayerSim:
 
         per_core_ifmap_bw, per_core_filter_bw, per_core_ofmap_bw\
             = self.config_obj.get_interface_bandwidths()
-        skip_dram_reads = self.skip_dram_reads
-        skip_dram_writes = self.skip_dram_writes
-        rd_buf_active_frac = 0.99
-        wr_buf_active_frac = 0.99 ## Pass this as a knob TODO
-        
-        if(self.skip_dram_reads and self.layer_id == 0 ): ## In LP, the first core is needs to read from mem and last core neesd to write from mem
-            skip_dram_reads = 0
-            rd_frac = 0.999
-        if(self.skip_dram_writes and self.layer_id == (self.num_cores - 1) ): ## In LP, the first core is needs to read from mem and last core neesd to write from mem
-            skip_dram_writes = 0
-            wr_frac = 0.999
-        # TODO hard coded fix thr avoe
+        skip_dram_reads, skip_dram_writes, rd_buf_active_frac, wr_buf_active_frac \
+            = self.get_forwarding_params(dram_active_frac=0.99)
         
         for compute_node in self.compute_node_list:
 
@@ -390,8 +561,8 @@ class SingleLayerSim:
                                      )
 
             # Demand mat
-            self.ifmap_demand_mat, self.filter_demand_mat, self.ofmap_demand_mat \
-                = compute_node.get_demand_matrices()   
+            self.prepare_node_demand(compute_node)
+            self.lp_compute_node = compute_node
             this_node_ifmap_fetch_mat, this_node_filter_fetch_mat = compute_node.get_prefetch_matrices()
             if (self.config_obj.get_bandwidth_use_mode()=="USER"):
                 self.this_part_mem.set_read_buf_prefetch_matrices(ifmap_prefetch_mat=this_node_ifmap_fetch_mat,
@@ -400,6 +571,8 @@ class SingleLayerSim:
             
                 
             self.all_node_mem_objects += [self.this_part_mem] ## This is usualyl done for mem requests.
+
+        self.reset_steady_state(part_idx=0)
             
     
 
@@ -414,27 +587,216 @@ class SingleLayerSim:
         if(self.tile_number >= (self.total_tiles_ifmap_layer)): # / 3 + self.total_tiles_ifmap_layer % 3 )): ## asset checks if they iofmap and filter tiles are same always
             return  1 ## This should say you are done for this core id.
         #print("Inside mem sim all parts lp for core id",core_id,",  total tiles",self.total_tiles_ifmap_layer,"Init time",init_time)
-        for compute_node in self.compute_node_list: ## Can remove this. TODO DO we need it tto loop 
-            # Demand mat
-            
-            row_start = int(self.tile_number * 1* self.per_tile_size)
-            row_end = row_start + 1*int(self.per_tile_size)
-            row_end = min(row_end,self.ofmap_demand_mat.shape[0])
-            
+        skip_tile, last_tile = self.plan_tile(part_idx=0, tile_id=self.tile_number,
+                                              num_tiles=self.total_tiles_ifmap_layer)
+        if skip_tile:
+            self.cycles_per_tile = self.extrapolate_tile(part_idx=0, tile_id=self.tile_number)
+            return completed
+
+        prev_stall_cycles = self.get_mem_stall_cycles(self.this_part_mem)
+        self.run_mem_sim_tile_lp(core_id=core_id, tile_id=self.tile_number, init_time=init_time,
+                                 last_tile=last_tile)
+        self.observe_tile(part_idx=0, tile_id=self.tile_number, cycles=self.cycles_per_tile,
+                          stalls=self.get_mem_stall_cycles(self.this_part_mem) - prev_stall_cycles)
 
-            
-            this_tile_ifmap_demand_mat = self.ifmap_demand_mat[ row_start : row_end ]
-            this_tile_filter_demand_mat =  self.filter_demand_mat[ row_start : row_end ]
-            this_tile_ofmap_demand_mat = self.ofmap_demand_mat[ row_start : row_end ]         
+        return completed
 
-            
-            self.this_part_mem.service_memory_requests_multiple_times( this_tile_ifmap_demand_mat,
-            this_tile_filter_demand_mat,this_tile_ofmap_demand_mat,core_id, self.tile_number,init_time, 
-            (self.tile_number == self.total_tiles_ifmap_layer - 1)) ## hopefullt this object wont be destroye when gone out of scope.
+    #
+    def run_mem_sim_tile_lp(self, core_id=0, tile_id=0, init_time=0, last_tile=False, trace_tile_id=None):
+        # Services one tile of the LP demand matrices starting at init_time.
+        # tile_id picks the rows of the demand matrices, trace_tile_id is the running
+        # tile count handed to the scratchpad (differs from tile_id when the layer is replayed)
+        assert self.compute_done
+
+        if trace_tile_id is None:
+            trace_tile_id = tile_id
+
+        this_tile_ifmap_demand_mat, this_tile_filter_demand_mat, this_tile_ofmap_demand_mat \
+            = self.get_instance_demand_rows(self.lp_compute_node, tile_id, self.per_tile_size)
+
+        self.this_part_mem.service_memory_requests_multiple_times(this_tile_ifmap_demand_mat,
+                                                                  this_tile_filter_demand_mat,
+                                                                  this_tile_ofmap_demand_mat,
+                                                                  core_id, trace_tile_id, init_time,
+                                                                  last_tile)
 
         self.mem_traces_done = True ## Wll this be valid? as we need each layer to be done to set this TODO
+        self.cycles_per_tile = self.this_part_mem.cycles_per_tile + self.post_op_cycles_per_tile
 
-        return completed
+        return self.cycles_per_tile
+
+    #
+    def reset_steady_state(self, part_idx=0, keep_cut=False):
+        # keep_cut reuses the tile where the previous pass stopped simulating,
+        # so that passes which replay NoC transactions line up with the first one
+        detector = SteadyStateDetector()
+        detector.set_params()
+        self.steady_state_detectors[part_idx] = detector
+
+        if not keep_cut:
+            self.extrapolation_start_tile[part_idx] = -1
+            self.extrapolation_period[part_idx] = 0
+        self.extrapolated_tiles[part_idx] = 0
+        self.extrapolated_cycles[part_idx] = 0
+        self.extrapolated_stall_cycles[part_idx] = 0
+
+    #
+    def plan_tile(self, part_idx=0, tile_id=0, num_tiles=1):
+        # Returns (skip_tile, last_tile)
+        # skip_tile: the timing of this tile is taken from the steady state pattern
+        # last_tile: the scratchpad should drain after servicing this tile
+        last_tile = (tile_id == num_tiles - 1)
+        if not self.extrapolate_steady_state:
+            return False, last_tile
+
+        detector = self.steady_state_detectors[part_idx]
+        start_tile = self.extrapolation_start_tile[part_idx]
+
+        if start_tile < 0:
+            if detector.is_steady() and not last_tile:
+                self.extrapolation_start_tile[part_idx] = tile_id + 1
+                self.extrapolation_period[part_idx] = detector.get_period()
+                return False, True
+            return False, last_tile
+
+        if tile_id >= start_tile:
+            return True, last_tile
+
+        if tile_id == start_tile - 1:
+            if not detector.is_steady():
+                period = min(self.extrapolation_period[part_idx], len(detector.cycles_history))
+                detector.lock_pattern(period)
+            return False, True
+
+        return False, last_tile
+
+    #
+    def extrapolate_tile(self, part_idx=0, tile_id=0):
+        detector = self.steady_state_detectors[part_idx]
+        tile_offset = tile_id - self.extrapolation_start_tile[part_idx]
+
+        cycles = detector.get_tile_cycles(tile_offset)
+        self.extrapolated_tiles[part_idx] += 1
+        self.extrapolated_cycles[part_idx] += cycles
+        self.extrapolated_stall_cycles[part_idx] += detector.get_tile_stalls(tile_offset)
+
+        return cycles
+
+    #
+    def observe_tile(self, part_idx=0, tile_id=0, cycles=0, stalls=0):
+        if not self.extrapolate_steady_state:
+            return
+
+        # The drain tile before the cut is not part of the periodic pattern
+        start_tile = self.extrapolation_start_tile[part_idx]
+        if start_tile < 0 or tile_id < start_tile - 1:
+            self.steady_state_detectors[part_idx].add_tile(cycles, stalls)
+
+    #
+    def get_mem_stall_cycles(self, memory_system):
+        if not self.extrapolate_steady_state:
+            return 0
+        return memory_system.stall_cycles
+
+    #
+    def get_extrapolation_scale(self, part_idx=0):
+        # Ratio of all tiles to the simulated tiles, used to scale the access counts
+        num_extrapolated = self.extrapolated_tiles.get(part_idx, 0)
+        if num_extrapolated == 0:
+            return 1
+
+        num_tiles = self.compute_node_list[part_idx].compute_node_total_tiles_ifmap_layer
+        if num_tiles == 0:
+            num_tiles = self.total_tiles_ifmap_layer
+        return num_tiles / (num_tiles - num_extrapolated)
+
+    #
+    def get_num_tiles(self):
+        if self.total_tiles_ifmap_layer:
+            return self.total_tiles_ifmap_layer
+        return 1
+
+    #
+    def run_single_layer_tiled_compute(self):
+        # Partitions the layer like run_single_layer_ls_tiled, but the tiles are
+        # scheduled by the caller through run_mem_sim_tile_part
+        self.num_input_part, self.num_filter_part = self.partitioner_obj.get_layer_partitions(layer_id=self.layer_id)
+
+        self.compute_node_list = []
+
+        self.run_compute_all_parts_tiled_noc()
+        self.setup_memory_all_parts()
+
+    #
+    def setup_memory_all_parts(self):
+        # One fresh scratchpad per part, called again to replay the tiles in a later pass
+        assert self.compute_done
+
+        bandwidth_mode = True
+        if (self.config_obj.get_bandwidth_use_mode()=="USER"):
+            bandwidth_mode = False
+        per_core_ifmap_buf_size, per_core_fitler_buf_size, per_core_ofmap_buf_size \
+            = ([i * 1024 for i in self.config_obj.get_per_unit_sram_sizes_kb()])
+
+        per_core_ifmap_bw, per_core_filter_bw, per_core_ofmap_bw\
+            = self.config_obj.get_interface_bandwidths()
+
+        self.all_node_mem_objects = []
+        for part_idx in range(len(self.compute_node_list)):
+            compute_node = self.compute_node_list[part_idx]
+
+            this_part_mem = double_buffered_scratchpad()
+            this_part_mem.set_params(verbose=self.verbose,
+                                     estimate_bandwidth_mode=bandwidth_mode,
+                                     ifmap_buf_size_bytes=per_core_ifmap_buf_size,
+                                     filter_buf_size_bytes=per_core_fitler_buf_size,
+                                     ofmap_buf_size_bytes=per_core_ofmap_buf_size,
+                                     ifmap_backing_buf_bw=per_core_ifmap_bw,
+                                     filter_backing_buf_bw=per_core_filter_bw,
+                                     ofmap_backing_buf_bw=per_core_ofmap_bw,
+                                     )
+
+            # Demand mat
+            self.prepare_node_demand(compute_node)
+
+            this_node_ifmap_fetch_mat, this_node_filter_fetch_mat = compute_node.get_prefetch_matrices()
+            if (self.config_obj.get_bandwidth_use_mode()=="USER"):
+                this_part_mem.set_read_buf_prefetch_matrices(ifmap_prefetch_mat=this_node_ifmap_fetch_mat,
+                                                             filter_prefetch_mat=this_node_filter_fetch_mat
+                                                             )
+            self.all_node_mem_objects += [this_part_mem]
+
+    #
+    def prepare_node_demand(self, compute_node):
+        if compute_node.compute_unit not in ['matmul', 'vector']:
+            return
+        if self.fold_demand and compute_node.enable_fold_demand():
+            return
+        if self.compress_demand:
+            compute_node.compress_demand_matrices()
+
+    #
+    def get_part_num_tiles(self, part_idx=0):
+        return self.compute_node_list[part_idx].compute_node_total_tiles_ifmap_layer
+
+    #
+    def run_mem_sim_tile_part(self, part_idx=0, core_id=0, tile_id=0, init_time=0, last_tile=False):
+        # Services one tile of one part on its own scratchpad starting at init_time
+        assert self.compute_done
+
+        compute_node = self.compute_node_list[part_idx]
+        ifmap_demand_mat, filter_demand_mat, ofmap_demand_mat \
+            = self.get_instance_demand_rows(compute_node, tile_id, compute_node.per_tile_size)
+
+        this_part_mem = self.all_node_mem_objects[part_idx]
+        this_part_mem.service_memory_requests_multiple_times(ifmap_demand_mat,
+                                                             filter_demand_mat,
+                                                             ofmap_demand_mat,
+                                                             core_id, tile_id, init_time,
+                                                             last_tile)
+
+        self.mem_traces_done = True
+        return this_part_mem.cycles_per_tile
 
 
 
@@ -488,11 +850,14 @@ class SingleLayerSim:
         for core_id in range(len(self.compute_node_list)):
             self.compute_node_list[core_id].tile_number = 0
             time_current[core_id] = 0
+            self.reset_steady_state(part_idx=core_id)
+        self.reset_dram_arbitration()
         noc_total_time = 0
 
         while(completed != len(self.compute_node_list)):
             
             completed = 0
+            round_tiles = []
             for core_id in range(len(self.compute_node_list)):
                 
                 
@@ -502,23 +867,40 @@ class SingleLayerSim:
                 completed += completed_per_core
                 if(completed_per_core == 1):
                     continue
+                skip_tile, last_tile = self.plan_tile(part_idx=core_id,
+                                                      tile_id=self.compute_node_list[core_id].tile_number,
+                                                      num_tiles=self.compute_node_list[core_id].compute_node_total_tiles_ifmap_layer)
+                if skip_tile:
+                    time_current[core_id] += self.extrapolate_tile(part_idx=core_id,
+                                                                   tile_id=self.compute_node_list[core_id].tile_number)
+                    self.compute_node_list[core_id].tile_number += 1
+                    continue
                 # Demand mat
                 
-                row_start = int(self.compute_node_list[core_id].tile_number * 1* self.compute_node_list[core_id].per_tile_size)
-                row_end = row_start + 1*int(self.compute_node_list[core_id].per_tile_size)
-                
-                this_tile_ifmap_demand_mat = this_node_ifmap_demand_mat[core_id][ row_start : row_end ]
-                this_tile_filter_demand_mat =  this_node_filter_demand_mat[core_id][ row_start : row_end ]
-                this_tile_ofmap_demand_mat = this_node_ofmap_demand_mat[core_id][ row_start : row_end ]        
+                this_tile_ifmap_demand_mat, this_tile_filter_demand_mat, this_tile_ofmap_demand_mat \
+                    = self.get_instance_demand_rows(self.compute_node_list[core_id],
+                                                    self.compute_node_list[core_id].tile_number,
+                                                    self.compute_node_list[core_id].per_tile_size)
                 
                 
+                prev_stall_cycles = self.get_mem_stall_cycles(this_part_mem[core_id])
                 this_part_mem[core_id].service_memory_requests_multiple_times_ls_tiled( this_tile_ifmap_demand_mat,
-                this_tile_filter_demand_mat,this_tile_ofmap_demand_mat,core_id, self.compute_node_list[core_id].tile_number,time_current[core_id], 
-                (self.compute_node_list[core_id].tile_number == self.compute_node_list[core_id].compute_node_total_tiles_ifmap_layer - 1),noc_obj , 1, self.tracking_id, self.pushed_in_time ) ## hopefullt this object wont be destroye when gone out of scope.
+                this_tile_filter_demand_mat,this_tile_ofmap_demand_mat,self.get_part_core(core_id), self.compute_node_list[core_id].tile_number,time_current[core_id], 
+                last_tile,noc_obj , 1, self.tracking_id, self.pushed_in_time ) ## hopefullt this object wont be destroye when gone out of scope.
                 self.mem_traces_done = True ## IDK if this should be here. IN LP code it was here so/
+                if self.dram_arbiter is not None:
+                    round_tiles += [(core_id, time_current[core_id], this_part_mem[core_id].cycles_per_tile,
+                                     self.get_mem_stall_cycles(this_part_mem[core_id]) - prev_stall_cycles,
+                                     self.get_tile_dram_addrs(core_id, this_tile_ifmap_demand_mat,
+                                                              this_tile_filter_demand_mat, this_tile_ofmap_demand_mat))]
+                    continue
+                self.observe_tile(part_idx=core_id, tile_id=self.compute_node_list[core_id].tile_number,
+                                  cycles=this_part_mem[core_id].cycles_per_tile,
+                                  stalls=self.get_mem_stall_cycles(this_part_mem[core_id]) - prev_stall_cycles)
                 
                 time_current[core_id] = time_current[core_id] + this_part_mem[core_id].cycles_per_tile
                 self.compute_node_list[core_id].tile_number+=1
+            self.arbitrate_dram_round(round_tiles, time_current)
         completed = 0
         noc_total_time = 0
         
@@ -526,6 +908,9 @@ class SingleLayerSim:
             self.compute_node_list[core_id].tile_number = 0
             time_current[core_id] = 0
             self.all_node_mem_objects[core_id].reset_buffer_states()
+            # NoC txns were only posted for the simulated tiles, stop at the same tile again
+            self.reset_steady_state(part_idx=core_id, keep_cut=True)
+            self.reset_dram_arbitration()
             
             self.all_node_mem_objects[core_id].set_params(verbose=self.verbose,
                                     estimate_bandwidth_mode=bandwidth_mode,
@@ -547,6 +932,7 @@ class SingleLayerSim:
         while(completed != len(self.compute_node_list)):
             
             completed = 0
+            round_tiles = []
             for core_id in range(len(self.compute_node_list)):
                 
                 completed_per_core = 0
@@ -555,23 +941,41 @@ class SingleLayerSim:
                 completed += completed_per_core
                 if(completed_per_core == 1):
                     continue
+                skip_tile, last_tile = self.plan_tile(part_idx=core_id,
+                                                      tile_id=self.compute_node_list[core_id].tile_number,
+                                                      num_tiles=self.compute_node_list[core_id].compute_node_total_tiles_ifmap_layer)
+                if skip_tile:
+                    time_current[core_id] += self.extrapolate_tile(part_idx=core_id,
+                                                                   tile_id=self.compute_node_list[core_id].tile_number)
+                    self.compute_node_list[core_id].tile_number += 1
+                    continue
                 # Demand mat
                 
-                row_start = int(self.compute_node_list[core_id].tile_number * 1* self.compute_node_list[core_id].per_tile_size)
-                row_end = row_start + 1*int(self.compute_node_list[core_id].per_tile_size)
-                this_tile_ifmap_demand_mat = this_node_ifmap_demand_mat[core_id][ row_start : row_end ]
-                this_tile_filter_demand_mat =  this_node_filter_demand_mat[core_id][ row_start : row_end ]
-                this_tile_ofmap_demand_mat = this_node_ofmap_demand_mat[core_id][ row_start : row_end ]        
+                this_tile_ifmap_demand_mat, this_tile_filter_demand_mat, this_tile_ofmap_demand_mat \
+                    = self.get_instance_demand_rows(self.compute_node_list[core_id],
+                                                    self.compute_node_list[core_id].tile_number,
+                                                    self.compute_node_list[core_id].per_tile_size)
                
                 
+                prev_stall_cycles = self.get_mem_stall_cycles(self.all_node_mem_objects[core_id])
                 self.all_node_mem_objects[core_id].service_memory_requests_multiple_times_ls_tiled( this_tile_ifmap_demand_mat,
-                this_tile_filter_demand_mat,this_tile_ofmap_demand_mat,core_id, self.compute_node_list[core_id].tile_number,time_current[core_id], 
-                (self.compute_node_list[core_id].tile_number == self.compute_node_list[core_id].compute_node_total_tiles_ifmap_layer - 1),noc_obj , 0, self.tracking_id, self.pushed_in_time ) ## hopefullt this object wont be destroye when gone out of scope.
+                this_tile_filter_demand_mat,this_tile_ofmap_demand_mat,self.get_part_core(core_id), self.compute_node_list[core_id].tile_number,time_current[core_id], 
+                last_tile,noc_obj , 0, self.tracking_id, self.pushed_in_time ) ## hopefullt this object wont be destroye when gone out of scope.
                 self.mem_traces_done = True ## IDK if this should be here. IN LP code it was here so/
+                if self.dram_arbiter is not None:
+                    round_tiles += [(core_id, time_current[core_id], self.all_node_mem_objects[core_id].cycles_per_tile,
+                                     self.get_mem_stall_cycles(self.all_node_mem_objects[core_id]) - prev_stall_cycles,
+                                     self.get_tile_dram_addrs(core_id, this_tile_ifmap_demand_mat,
+                                                              this_tile_filter_demand_mat, this_tile_ofmap_demand_mat))]
+                    continue
+                self.observe_tile(part_idx=core_id, tile_id=self.compute_node_list[core_id].tile_number,
+                                  cycles=self.all_node_mem_objects[core_id].cycles_per_tile,
+                                  stalls=self.get_mem_stall_cycles(self.all_node_mem_objects[core_id]) - prev_stall_cycles)
                 
 
                 time_current[core_id] = time_current[core_id] + self.all_node_mem_objects[core_id].cycles_per_tile
                 self.compute_node_list[core_id].tile_number+=1
+            self.arbitrate_dram_round(round_tiles, time_current)
         
    
         max_time = time_current[0]
@@ -579,32 +983,70 @@ class SingleLayerSim:
             if(max_time < time_current[core_id] ):
                 max_time = time_current[core_id]
         print("Run time",max_time)
-###################################################################################################
-    # 
-    def gather_simd_report_items_across_cores(self):
-        assert self.compute_done
-        for core_id in range(len(self.compute_node_list)):
-            compute_system = self.compute_node_list[core_id]
 
-            # Compute report
-            num_compute = compute_system.get_num_compute()
-            num_unit = compute_system.get_num_units()
-            total_cycles = compute_system.get_total_cycles()
-            
-            stall_cycles = 0
-            if(total_cycles):
-                overall_util = (num_compute * 100) / (total_cycles * num_unit)
-            else:
-                overall_util = 0
-            mapping_eff = compute_system.get_avg_mapping_efficiency() * 100
-            compute_util = compute_system.get_avg_compute_utilization() * 100
+    #
+    def reset_dram_arbitration(self):
+        if self.dram_arbiter is None:
+            return
+        self.dram_arbiter.reset()
+        self.dram_stall_cycles = {}
+        self.prev_tile_dram_reads = {}
 
-            self.total_cycles_list += [total_cycles]
-            self.stall_cycles_list += [stall_cycles]
-            self.overall_util_list += [overall_util]
-            self.mapping_eff_list += [mapping_eff]
-            self.compute_util_list += [compute_util]
+    #
+    def get_tile_dram_addrs(self, part_idx=0, ifmap_demand_mat=None, filter_demand_mat=None, ofmap_demand_mat=None):
+        # Distinct words of the tile, without the reads the previous tile of this part already brought in
+        tile_reads = numpy.concatenate([numpy.asarray(ifmap_demand_mat).ravel(), numpy.asarray(filter_demand_mat).ravel()])
+        tile_reads = numpy.unique(tile_reads[tile_reads >= 0])
+        new_reads = numpy.setdiff1d(tile_reads, self.prev_tile_dram_reads.get(part_idx, []), assume_unique=True)
+        self.prev_tile_dram_reads[part_idx] = tile_reads
+
+        return numpy.concatenate([new_reads, numpy.asarray(ofmap_demand_mat).ravel()])
+
+    #
+    def arbitrate_dram_round(self, round_tiles, time_current):
+        # round_tiles: (part_idx, start cycle, cycles, stalls, DRAM addresses) of the tiles serviced this round.
+        # A tile cannot end before the shared port served its last word, the wait is a stall.
+        if len(round_tiles) == 0:
+            return
+
+        done_times = self.dram_arbiter.arbitrate([tile[1] for tile in round_tiles],
+                                                 [tile[4] for tile in round_tiles])
+        for (part_idx, start_cycle, cycles, stalls, _), done_cycle in zip(round_tiles, done_times):
+            contention_cycles = max(0, done_cycle - start_cycle - cycles)
+            self.dram_stall_cycles[part_idx] = self.dram_stall_cycles.get(part_idx, 0) + contention_cycles
+
+            compute_node = self.compute_node_list[part_idx]
+            self.observe_tile(part_idx=part_idx, tile_id=compute_node.tile_number,
+                              cycles=cycles + contention_cycles, stalls=stalls + contention_cycles)
+            time_current[part_idx] += cycles + contention_cycles
+            compute_node.tile_number += 1
 
+    #
+    def get_dram_report_items(self):
+        # Words, busy cycles, row hits, row misses of the shared port and the cycles the parts waited on it
+        assert self.dram_arbiter is not None
+        return list(self.dram_arbiter.get_stats()) + [sum(self.dram_stall_cycles.values())]
+
+    #
+    def get_dram_channel_report_items(self):
+        # Words and busy cycles of every DRAM channel. Tiled runs report what the channels served,
+        # the other runs map the DRAM traces of the scratchpads to the channels.
+        assert self.dram_arbiter is not None and self.mem_traces_done
+        num_channels = self.dram_arbiter.num_channels
+        if sum(self.dram_arbiter.words_served) > 0:
+            return [list(self.dram_arbiter.get_channel_stats(channel)[:2]) for channel in range(num_channels)]
+
+        channel_words = [0] * num_channels
+        for memory_system in self.all_node_mem_objects:
+            for trace_matrix in memory_system.get_dram_trace_matrices():
+                if trace_matrix is None:
+                    continue
+                trace_words = self.dram_arbiter.get_channel_words(trace_matrix[:, 1:])
+                channel_words = [x + y * self.report_instance_scale for x, y in zip(channel_words, trace_words)]
+
+        return [[channel_words[channel], math.ceil(channel_words[channel] / self.dram_arbiter.bandwidth[channel])]
+                for channel in range(num_channels)]
+###################################################################################################
     #
     def gather_report_items_across_cores(self):
         assert self.compute_done and self.mem_traces_done
@@ -613,7 +1055,7 @@ class SingleLayerSim:
             memory_system = self.all_node_mem_objects[core_id]
             
             # Compute report
-            num_compute = compute_system.get_num_compute()
+            num_compute = compute_system.get_num_compute() * self.num_instances
             print(num_compute)
             num_unit = compute_system.get_num_units()
             if(self.enable_lp_partition == 1):
@@ -621,8 +1063,18 @@ class SingleLayerSim:
                 total_cycles = memory_system.get_total_compute_cycles() ##+ self.noc_obj.get_latency(compute_system.tracking_id) # + DEPENDENCY BUBBLES LOLDBG
             else:
                 total_cycles = memory_system.get_total_compute_cycles() 
-            # Manish SRAM to SRAM may help with adding the dependency cycles
+            # LP hand-off waits on the SRAM to SRAM forwarding are in FORWARDING_REPORT.csv
             stall_cycles = memory_system.get_stall_cycles()
+
+            # Tiles skipped by the steady state extrapolation
+            extrapolated_cycles = self.extrapolated_cycles.get(core_id, 0)
+            extrapolation_scale = self.get_extrapolation_scale(part_idx=core_id)
+            total_cycles += extrapolated_cycles
+            stall_cycles += self.extrapolated_stall_cycles.get(core_id, 0)
+            total_cycles += self.dram_stall_cycles.get(core_id, 0)
+            stall_cycles += self.dram_stall_cycles.get(core_id, 0)
+            total_cycles *= self.report_instance_scale
+            stall_cycles *= self.report_instance_scale
             if(total_cycles):
                 overall_util = (num_compute * 100) / (total_cycles * num_unit)
             else:
@@ -637,9 +1089,9 @@ class SingleLayerSim:
             self.compute_util_list += [compute_util]
 
             # BW report
-            ifmap_sram_reads = compute_system.get_ifmap_requests()
-            filter_sram_reads = compute_system.get_filter_requests()
-            ofmap_sram_writes = compute_system.get_ofmap_requests()
+            ifmap_sram_reads = compute_system.get_ifmap_requests() * self.num_instances
+            filter_sram_reads = compute_system.get_filter_requests() * self.num_instances
+            ofmap_sram_writes = compute_system.get_ofmap_requests() * self.num_instances
             if(total_cycles):
                 avg_ifmap_sram_bw = ifmap_sram_reads / total_cycles
                 avg_filter_sram_bw = filter_sram_reads / total_cycles
@@ -664,6 +1116,28 @@ class SingleLayerSim:
             filter_dram_start_cycle, filter_dram_stop_cycle, filter_dram_reads = memory_system.get_filter_dram_details()
             ofmap_dram_start_cycle, ofmap_dram_stop_cycle, ofmap_dram_writes = memory_system.get_ofmap_dram_details()
 
+            if extrapolated_cycles > 0:
+                ifmap_sram_stop_cycle += extrapolated_cycles
+                filter_sram_stop_cycle += extrapolated_cycles
+                ofmap_sram_stop_cycle += extrapolated_cycles
+                ifmap_dram_stop_cycle += extrapolated_cycles
+                filter_dram_stop_cycle += extrapolated_cycles
+                ofmap_dram_stop_cycle += extrapolated_cycles
+                ifmap_dram_reads = int(ifmap_dram_reads * extrapolation_scale)
+                filter_dram_reads = int(filter_dram_reads * extrapolation_scale)
+                ofmap_dram_writes = int(ofmap_dram_writes * extrapolation_scale)
+
+            if self.report_instance_scale > 1:
+                ifmap_sram_stop_cycle = ifmap_sram_start_cycle + (ifmap_sram_stop_cycle - ifmap_sram_start_cycle) * self.report_instance_scale
+                filter_sram_stop_cycle = filter_sram_start_cycle + (filter_sram_stop_cycle - filter_sram_start_cycle) * self.report_instance_scale
+                ofmap_sram_stop_cycle = ofmap_sram_start_cycle + (ofmap_sram_stop_cycle - ofmap_sram_start_cycle) * self.report_instance_scale
+                ifmap_dram_stop_cycle = ifmap_dram_start_cycle + (ifmap_dram_stop_cycle - ifmap_dram_start_cycle) * self.report_instance_scale
+                filter_dram_stop_cycle = filter_dram_start_cycle + (filter_dram_stop_cycle - filter_dram_start_cycle) * self.report_instance_scale
+                ofmap_dram_stop_cycle = ofmap_dram_start_cycle + (ofmap_dram_stop_cycle - ofmap_dram_start_cycle) * self.report_instance_scale
+                ifmap_dram_reads *= self.report_instance_scale
+                filter_dram_reads *= self.report_instance_scale
+                ofmap_dram_writes *= self.report_instance_scale
+
             self.ifmap_sram_start_cycle_list += [ifmap_sram_start_cycle]
             self.ifmap_sram_stop_cycle_list += [ifmap_sram_stop_cycle]
             self.filter_sram_start_cycle_list += [filter_sram_start_cycle]
@@ -743,13 +1217,9 @@ class SingleLayerSim:
                 this_core_dir = l2_dir + '/core' + str(self.layer_id) ## Change this back to core_id
             self.check_and_build(this_core_dir)
 
-    def get_ofmap_operand_matrix(self):
-        
-        if not self.compute_done:
-            self.run_compute_all_parts()
-
-        _, _, ofmap_matrix = self.op_mat_obj.get_all_operand_matrix()
-        return ofmap_matrix
+    def get_ofmap_handoff(self):
+        assert self.compute_done, 'The layer has to be computed before its ofmap is handed off'
+        return self.ofmap_handoff
 
 
 
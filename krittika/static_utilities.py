@@ -1,28 +1,117 @@
 import math
+import numpy as np
+from functools import lru_cache
 
 
 class StaticUtilities:
     @staticmethod
     def get_factors_as_pairs(num):
-        factor_list = []
-        end = math.floor(math.sqrt(num))
-        for i in range(end):
-            i += 1
-            if num % i == 0:
-                a = int(i)
-                b = int(num / i)
-                factor_list.append([a, b])
-
-        reverse_factor_list = []
-        list_len = len(factor_list)
-
-        # Reverse the list to get all the ordered pairs
-        for i in range(list_len):
-            j = list_len - i - 1
-            val = factor_list[j]
-            new_val = [val[1], val[0]]
-            if not val[0] == val[1]:
-                reverse_factor_list.append(new_val)
-
-        factor_list += reverse_factor_list
-        return factor_list
+        # Ordered pairs [a, b] with a * b == num, ascending in a
+        return [list(pair) for pair in StaticUtilities.get_cached_factor_pairs(num)]
+
+    #
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_cached_factor_pairs(num):
+        assert num > 0, 'Can only factorize positive integers, got ' + str(num)
+
+        small_factors = [i for i in range(1, math.isqrt(num) + 1) if num % i == 0]
+        large_factors = [num // i for i in reversed(small_factors) if i * i != num]
+        factors = small_factors + large_factors
+
+        return tuple((a, num // a) for a in factors)
+
+    #
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_cached_partition_candidates(num_cores, min_cores):
+        # Exact splits first, then the padded ones (some cores left idle) with the most cores in use
+        assert 0 < min_cores <= num_cores, 'Minimum cores should be between 1 and ' + str(num_cores)
+
+        candidates = list(StaticUtilities.get_cached_factor_pairs(num_cores))
+        for used_cores in range(num_cores - 1, min_cores - 1, -1):
+            candidates += list(StaticUtilities.get_cached_factor_pairs(used_cores))
+
+        return tuple(candidates)
+
+    #
+    @staticmethod
+    def get_partition_candidates(num_cores, min_core_util=1.0,
+                                 max_input_part=None, max_filter_part=None):
+        # [input parts, filter parts] pairs using between min_core_util * num_cores and
+        # num_cores cores. Pairs with more parts than the layer can use are dropped before
+        # they are evaluated, unless none would remain.
+        assert 0 < min_core_util <= 1, 'Minimum core utilization should be in (0, 1]'
+
+        min_cores = max(1, math.ceil(min_core_util * num_cores))
+        candidates = StaticUtilities.get_cached_partition_candidates(num_cores, min_cores)
+
+        pruned = StaticUtilities.prune_part_candidates(candidates, max_input_part, max_filter_part)
+        if len(pruned) == 0:
+            pruned = candidates
+        return [list(pair) for pair in pruned]
+
+    #
+    @staticmethod
+    def prune_part_candidates(part_list, max_input_part=None, max_filter_part=None):
+        pruned = []
+        for input_part, filter_part in part_list:
+            if max_input_part is not None and input_part > max_input_part:
+                continue
+            if max_filter_part is not None and filter_part > max_filter_part:
+                continue
+            pruned += [(input_part, filter_part)]
+        return pruned
+
+    #
+    @staticmethod
+    def get_address_dtype(matrix):
+        # Addresses and the -1 of empty requests fit in int32 unless the offsets are beyond 2^31
+        if matrix.size == 0:
+            return np.dtype(np.int32)
+
+        int32_info = np.iinfo(np.int32)
+        if matrix.min() >= int32_info.min and matrix.max() <= int32_info.max:
+            return np.dtype(np.int32)
+        return np.dtype(np.int64)
+
+    #
+    @staticmethod
+    def to_address_matrix(matrix):
+        # Native integer copy of an address matrix, the matrix itself if it already is one
+        dtype = StaticUtilities.get_address_dtype(matrix)
+        if matrix.dtype == dtype:
+            return matrix
+        return matrix.astype(dtype)
+
+    #
+    @staticmethod
+    def compact_address_matrices(compute_unit):
+        # The scalesim compute units pad their demand and prefetch matrices with float -1,
+        # swap them for integer matrices once they have been created. This halves the memory
+        # the matrices keep, the peak while scalesim builds them in float64 stays the same.
+        matrix_names = ['ifmap_demand_matrix', 'filter_demand_matrix', 'ofmap_demand_matrix',
+                        'ifmap_prefetch_matrix', 'filter_prefetch_matrix']
+        for name in matrix_names:
+            if getattr(compute_unit, name, None) is not None:
+                setattr(compute_unit, name, StaticUtilities.to_address_matrix(getattr(compute_unit, name)))
+
+    #
+    @staticmethod
+    def release_demand_matrices(compute_unit):
+        # Drops the dense demand matrices of a scalesim compute unit once they are kept elsewhere,
+        # the ready flag stays set so that the unit does not recreate them
+        for name in ['ifmap_demand_matrix', 'filter_demand_matrix', 'ofmap_demand_matrix']:
+            if hasattr(compute_unit, name):
+                setattr(compute_unit, name, None)
+
+    #
+    @staticmethod
+    def release_operand_matrix(holder, matrix, stand_in):
+        # Points the attributes of holder that keep matrix at stand_in so that matrix can be freed,
+        # views of matrix, like the transposes the scalesim units keep, are dropped
+        for name, value in list(vars(holder).items()):
+            if value is matrix:
+                setattr(holder, name, stand_in)
+            elif isinstance(value, np.ndarray) and value.base is matrix:
+                setattr(holder, name, None)
@@ -0,0 +1,112 @@
+class SteadyStateDetector:
+    '''
+        Watches the per tile cycles and stall counts of a uniform tile stream and
+        reports when they have become periodic. Once steady, the timing of the
+        remaining tiles is read off the detected pattern instead of being simulated.
+    '''
+    def __init__(self):
+        # Params
+        self.min_tiles = 4
+        self.max_period = 4
+        self.num_repeats = 3
+        self.tolerance = 0
+
+        # State
+        self.cycles_history = []
+        self.stalls_history = []
+        self.period = 0
+        self.pattern_cycles = []
+        self.pattern_stalls = []
+
+        # Flags
+        self.params_set = False
+        self.steady = False
+
+    #
+    def set_params(self, min_tiles=4, max_period=4, num_repeats=3, tolerance=0):
+        assert min_tiles > 0, 'Minimum number of tiles should be positive'
+        assert max_period > 0, 'Maximum period should be positive'
+        assert num_repeats > 1, 'The pattern should repeat at least twice'
+        assert tolerance >= 0, 'Tolerance cannot be negative'
+
+        self.min_tiles = min_tiles
+        self.max_period = max_period
+        self.num_repeats = num_repeats
+        self.tolerance = tolerance
+
+        self.params_set = True
+        self.reset()
+
+    #
+    def reset(self):
+        self.cycles_history = []
+        self.stalls_history = []
+        self.period = 0
+        self.pattern_cycles = []
+        self.pattern_stalls = []
+        self.steady = False
+
+    #
+    def add_tile(self, cycles=0, stalls=0):
+        self.cycles_history += [cycles]
+        self.stalls_history += [stalls]
+
+        if not self.steady:
+            self.check_periodic()
+
+    #
+    def check_periodic(self):
+        num_tiles = len(self.cycles_history)
+        if num_tiles < self.min_tiles:
+            return False
+
+        for period in range(1, self.max_period + 1):
+            window = period * self.num_repeats
+            if window > num_tiles:
+                break
+
+            if self.is_periodic(self.cycles_history[-window:], period) and \
+                    self.is_periodic(self.stalls_history[-window:], period):
+                self.lock_pattern(period)
+                return True
+
+        return False
+
+    #
+    def is_periodic(self, samples, period):
+        for idx in range(period, len(samples)):
+            ref = samples[idx - period]
+            if abs(samples[idx] - ref) > self.tolerance * abs(ref):
+                return False
+
+        return True
+
+    #
+    def lock_pattern(self, period=1):
+        # Takes the last period samples as the pattern, whether or not they were found periodic
+        assert 0 < period <= len(self.cycles_history), 'Not enough tiles observed for this period'
+
+        self.period = period
+        self.pattern_cycles = self.cycles_history[-period:]
+        self.pattern_stalls = self.stalls_history[-period:]
+        self.steady = True
+
+    #
+    def is_steady(self):
+        return self.steady
+
+    #
+    def get_period(self):
+        assert self.steady, 'Steady state not reached yet'
+        return self.period
+
+    #
+    def get_tile_cycles(self, tile_offset=0):
+        # tile_offset counts the tiles after the last observed one, starting at 0
+        assert self.steady, 'Steady state not reached yet'
+        return self.pattern_cycles[tile_offset % self.period]
+
+    #
+    def get_tile_stalls(self, tile_offset=0):
+        assert self.steady, 'Steady state not reached yet'
+        return self.pattern_stalls[tile_offset % self.period]
@@ -0,0 +1,116 @@
+import numpy as np
+
+
+class TensorHandoff:
+    '''
+        Metadata of a tensor passed from the layer that produces it to the layers that consume it:
+        the shape, the address range it occupies and the bounds of the parts its producer's cores
+        wrote. Consumers are timed from these alone, without the producer's operand matrices.
+        Part bounds are (row_start, row_end, col_start, col_end), in the order of the producer's cores.
+        A batched or grouped layer produces num_instances such tensors stacked one after another.
+    '''
+    def __init__(self):
+        self.producer_id = -1
+        self.num_rows = 0
+        self.num_cols = 0
+        self.addr_start = 0
+        self.addr_end = 0
+        self.part_bounds = []
+        self.num_instances = 1
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, producer_id=-1, num_rows=0, num_cols=0, addr_start=0, addr_end=0, part_bounds=None,
+                   num_instances=1):
+        assert num_rows > 0 and num_cols > 0, 'The tensor should not be empty'
+        assert num_instances > 0, 'Number of instances should be positive'
+        assert addr_end - addr_start >= num_rows * num_cols * num_instances, \
+            'The address range is too small for the tensor'
+
+        if part_bounds is None:
+            part_bounds = [(0, num_rows, 0, num_cols)]
+        for row_start, row_end, col_start, col_end in part_bounds:
+            assert 0 <= row_start <= row_end <= num_rows and 0 <= col_start <= col_end <= num_cols, \
+                'Part ' + str((row_start, row_end, col_start, col_end)) + ' is outside the tensor'
+
+        self.producer_id = producer_id
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.addr_start = addr_start
+        self.addr_end = addr_end
+        self.part_bounds = [tuple(bounds) for bounds in part_bounds]
+        self.num_instances = num_instances
+
+        self.params_set = True
+
+    #
+    def set_from_matrix(self, producer_id=-1, matrix=np.ones((1, 1)), part_bounds=None,
+                        num_instances=1, instance_stride=0):
+        # Captures the metadata of an address matrix, the matrix itself is not kept.
+        # The other instances follow the first one every instance_stride addresses.
+        self.set_params(producer_id=producer_id,
+                        num_rows=matrix.shape[0], num_cols=matrix.shape[1],
+                        addr_start=int(matrix.min()),
+                        addr_end=int(matrix.max()) + 1 + (num_instances - 1) * instance_stride,
+                        part_bounds=part_bounds, num_instances=num_instances)
+
+    #
+    def get_shape(self):
+        assert self.params_set
+        return self.num_rows, self.num_cols
+
+    #
+    def get_num_elems(self):
+        assert self.params_set
+        return self.num_rows * self.num_cols * self.num_instances
+
+    #
+    def get_num_instances(self):
+        assert self.params_set
+        return self.num_instances
+
+    #
+    def get_address_range(self):
+        assert self.params_set
+        return self.addr_start, self.addr_end
+
+    #
+    def get_num_parts(self):
+        assert self.params_set
+        return len(self.part_bounds)
+
+    #
+    def get_part_bounds(self, part_idx=0):
+        assert self.params_set
+        assert 0 <= part_idx < self.get_num_parts(), 'Invalid part index ' + str(part_idx)
+        return self.part_bounds[part_idx]
+
+    #
+    def get_part_num_elems(self):
+        # A part covers its bounds in every instance
+        assert self.params_set
+        return np.array([(row_end - row_start) * (col_end - col_start) * self.num_instances
+                         for row_start, row_end, col_start, col_end in self.part_bounds], dtype=np.int64)
+
+    #
+    def get_row_parts(self, num_parts=1):
+        # Row ranges of the tensor split across num_parts cores, the parts past the last row are empty.
+        # The rows of all the instances are split as one tensor.
+        assert self.params_set and num_parts > 0
+        num_rows = self.num_rows * self.num_instances
+        rows_per_part = -(-num_rows // num_parts)
+        row_starts = np.arange(num_parts) * rows_per_part
+        row_ends = np.minimum(row_starts + rows_per_part, num_rows)
+        return row_starts, np.maximum(row_ends, row_starts)
+
+    #
+    def forward(self, producer_id=-1):
+        # Same tensor handed on by an element wise layer which writes its result in place
+        assert self.params_set
+        handoff = TensorHandoff()
+        handoff.set_params(producer_id=producer_id, num_rows=self.num_rows, num_cols=self.num_cols,
+                           addr_start=self.addr_start, addr_end=self.addr_end, part_bounds=self.part_bounds,
+                           num_instances=self.num_instances)
+        return handoff
@@ -0,0 +1,108 @@
+import itertools
+import os
+import tempfile
+import time
+import unittest
+from krittika.auto_tuner import AutoTuner
+from krittika.config.krittika_config import KrittikaConfig
+from krittika.partition_manager import PartitionManager
+from krittika.workload_manager import WorkloadManager
+
+CONFIGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'configs')
+
+
+class TestAutoTuner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        # The sample config with the automatic partition strategy
+        with open(os.path.join(CONFIGS_DIR, 'krittika.cfg'), 'r') as cfg_file:
+            cfg_text = cfg_file.read().replace('partition strategy = USER', 'partition strategy = AUTO')
+        config_filename = os.path.join(self.tmp_dir.name, 'auto.cfg')
+        with open(config_filename, 'w') as cfg_file:
+            cfg_file.write(cfg_text)
+        self.config = KrittikaConfig()
+        self.config.read_config_from_file(filename=config_filename)
+
+        workload_filename = os.path.join(self.tmp_dir.name, 'topo.csv')
+        with open(workload_filename, 'w') as topo_file:
+            topo_file.write('gemm, 16,16,16\nactivation, relu\ngemm, 16,8,16\n')
+        self.workload = WorkloadManager()
+        self.workload.read_topologies(workload_filename=workload_filename)
+
+    def create_tuner(self, **kwargs):
+        tuner = AutoTuner()
+        tuner.set_params(config_obj=self.config, workload_obj=self.workload, **kwargs)
+        return tuner
+
+    def test_time_budget(self):
+        # Every refine run outlasts the budget, so only the first one is started
+        refine_calls = []
+
+        def refine_fn(partition_obj):
+            refine_calls.append(partition_obj)
+            time.sleep(1.2)
+            return 100
+
+        tuner = self.create_tuner(time_budget=1, refine_fn=refine_fn)
+        tuner.tune()
+
+        self.assertEqual(len(refine_calls), 1)
+        self.assertEqual(len(tuner.refined_candidates), 1)
+        self.assertEqual(tuner.get_best_cost(), 100)
+        self.assertLess(time.time() - tuner.start_time, 2 * tuner.time_budget)
+
+    def test_beam_matches_exhaustive(self):
+        # A beam as wide as top k keeps the prefixes of the k best tables
+        tuner = self.create_tuner(top_k=3, beam_width=3)
+        tuner.create_layer_choices()
+        self.assertEqual(tuner.layer_ids, [0, 2])
+
+        exhaustive_costs = sorted([first_choice[4] + second_choice[4] for first_choice, second_choice
+                                   in itertools.product(tuner.layer_choices[0], tuner.layer_choices[2])])
+        self.assertGreater(len(exhaustive_costs), tuner.beam_width)
+        beam_costs = [candidate[0] for candidate in tuner.search_layers()[:tuner.top_k]]
+        self.assertEqual(len(beam_costs), 3)
+        for beam_cost, exhaustive_cost in zip(beam_costs, exhaustive_costs[:3]):
+            self.assertAlmostEqual(beam_cost, exhaustive_cost)
+
+    def test_unique_refine_tables(self):
+        # Choices listed twice give the same table from different beams, each table is refined once
+        refined_tables = []
+
+        def refine_fn(partition_obj):
+            refined_tables.append(partition_obj.partition_table)
+            return 100
+
+        tuner = self.create_tuner(top_k=3, refine_fn=refine_fn)
+        create_layer_choices = tuner.create_layer_choices
+
+        def create_duplicate_choices():
+            create_layer_choices()
+            for lid in tuner.layer_ids:
+                tuner.layer_choices[lid] = [choice for choice in tuner.layer_choices[lid] for _ in range(2)]
+
+        tuner.create_layer_choices = create_duplicate_choices
+        tuner.tune()
+
+        self.assertEqual(len(refined_tables), 3)
+        self.assertEqual(len(set([str(table) for table in refined_tables])), 3)
+
+    def test_partition_table_round_trip(self):
+        tuner = self.create_tuner()
+        tuner.tune()
+        table_filename = os.path.join(self.tmp_dir.name, 'TUNED_PARTITION.csv')
+        tuner.write_best_partition_table(table_filename)
+
+        partition_obj = PartitionManager()
+        partition_obj.set_params(config_obj=self.config, workload_obj=self.workload)
+        partition_obj.read_user_partition_table(filename=table_filename)
+        self.assertEqual(partition_obj.partition_table, tuner.best_table)
+        for layer_id in tuner.layer_ids:
+            self.assertEqual(partition_obj.get_layer_partitions(layer_id=layer_id),
+                             tuner.get_partition_manager().get_layer_partitions(layer_id=layer_id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from krittika.decode_workload import DecodeWorkload
+from krittika.workload_manager import WorkloadManager
+
+
+class TestDecodeWorkload(unittest.TestCase):
+    def setUp(self):
+        prompt_workload = WorkloadManager()
+        prompt_workload.read_topology_rows(['transformer_block, 16, 32, 4, 64, 16, 2'])
+        self.decode = DecodeWorkload()
+        self.decode.set_params(prompt_workload=prompt_workload, num_tokens=40, num_samples=5)
+
+    def test_sample_steps(self):
+        self.assertEqual(self.decode.get_sample_steps(), [1, 11, 20, 30, 40])
+
+    def test_step_workload(self):
+        step_workload = self.decode.create_step_workload(step=5)
+        self.assertEqual(step_workload.get_num_blocks(), 2)
+        self.assertEqual(step_workload.get_block_shape(1), (1, 32, 4, 64, 21))
+        # One token: the projections are GEMVs, the scores span the KV cache
+        self.assertEqual(step_workload.get_transformed_mnk_dimensions(0)[2], 32)
+        self.assertEqual(step_workload.get_layer_ofmap_dims(0)[0], 1)
+        self.assertEqual(step_workload.get_layer_num_filters(1), 21)
+        self.assertEqual(step_workload.get_layer_reuse_id(11), 1)
+
+    def test_interpolation(self):
+        self.decode.set_step_cycles(1, 100)
+        self.decode.set_step_cycles(11, 200)
+        token_cycles = self.decode.get_token_cycles()
+        self.assertEqual(len(token_cycles), 40)
+        self.assertAlmostEqual(token_cycles[5], 150)
+        self.assertAlmostEqual(token_cycles[39], 200)
+
+        report_file = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        report_file.close()
+        self.addCleanup(os.remove, report_file.name)
+        self.decode.save_decode_report(filename=report_file.name)
+        with open(report_file.name) as f:
+            rows = f.readlines()
+        self.assertEqual(len(rows), 41)
+        self.assertEqual(rows[11], '11, 27, 200, 1,\n')
+
+    def test_prompt_of_blocks_only(self):
+        prompt_workload = WorkloadManager()
+        prompt_workload.read_topology_rows(['transformer_block, 16, 32, 4, 64', 'gemm, 16,10,32'])
+        with self.assertRaises(AssertionError):
+            DecodeWorkload().set_params(prompt_workload=prompt_workload, num_tokens=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from krittika.dram_arbiter import DramArbiter
+
+
+class TestDramArbiter(unittest.TestCase):
+    def setUp(self):
+        self.arbiter = DramArbiter()
+
+    def test_bursts(self):
+        self.arbiter.set_params(bandwidth=4, burst_words=4, row_words=8)
+        self.assertEqual(self.arbiter.get_bursts([9, 0, 1, -1, 1, 5, 6]), [(0, 0, 2), (0, 0, 2), (0, 1, 1)])
+        self.assertEqual(self.arbiter.get_bursts([-1, -1]), [])
+
+    def test_bandwidth_is_shared(self):
+        # Two requests of 8 words at 4 words/cycle take 4 cycles together
+        self.arbiter.set_params(bandwidth=4, burst_words=4, row_words=64)
+        done_times = self.arbiter.arbitrate([0, 0], [list(range(8)), list(range(8, 16))])
+        self.assertEqual(max(done_times), 4)
+        self.assertEqual(self.arbiter.get_stats(), (16, 4, 3, 1))
+
+        # The port stays busy into the next round
+        self.assertEqual(self.arbiter.arbitrate([2], [list(range(16, 20))]), [5])
+
+    def test_idle_port_waits_for_issue(self):
+        self.arbiter.set_params(bandwidth=1, burst_words=4, row_words=64)
+        self.assertEqual(self.arbiter.arbitrate([10, 0], [[0], []]), [11, 0])
+
+    def test_round_robin_interleaves(self):
+        self.arbiter.set_params(bandwidth=4, policy='ROUND_ROBIN', burst_words=4, row_words=4, row_miss_latency=5)
+        done_times = self.arbiter.arbitrate([0, 0], [[0, 4], [64, 68]])
+        self.assertEqual(done_times, [16, 21])
+        self.assertEqual(self.arbiter.get_stats()[2:], (0, 4))
+
+    def test_fr_fcfs_keeps_open_row(self):
+        self.arbiter.set_params(bandwidth=4, policy='FR_FCFS', burst_words=4, row_words=8, row_miss_latency=5)
+        done_times = self.arbiter.arbitrate([0, 0], [[0, 4], [64, 68]])
+        self.assertEqual(done_times, [6, 11])
+        self.assertEqual(self.arbiter.get_stats()[2:], (2, 2))
+
+    def test_channel_interleaving(self):
+        self.arbiter.set_params(burst_words=4, row_words=8, num_channels=2, interleaving='LINE')
+        channels, local_addrs = self.arbiter.get_channel_addrs([0, 4, 9, 13])
+        self.assertEqual(channels.tolist(), [0, 1, 0, 1])
+        self.assertEqual(local_addrs.tolist(), [0, 0, 5, 5])
+
+        self.arbiter.set_params(burst_words=4, row_words=8, num_channels=2, interleaving='PAGE')
+        channels, local_addrs = self.arbiter.get_channel_addrs([0, 4, 9, 17])
+        self.assertEqual(channels.tolist(), [0, 0, 1, 0])
+        self.assertEqual(local_addrs.tolist(), [0, 4, 1, 9])
+
+        self.arbiter.set_params(burst_words=4, row_words=8, num_channels=4, interleaving='OPERAND',
+                                operand_offsets=(0, 100, 200))
+        channels, _ = self.arbiter.get_channel_addrs([0, 8, 105, 113, 205, 213])
+        self.assertEqual(channels.tolist(), [0, 3, 1, 1, 2, 2])
+        self.assertEqual(self.arbiter.get_channel_words([[0, 8, -1], [105, 105, -1]]), [1, 2, 0, 1])
+
+    def test_channels_serve_in_parallel(self):
+        self.arbiter.set_params(bandwidth=4, burst_words=4, row_words=64, num_channels=2,
+                                channel_latency=[0, 10])
+        self.assertEqual(self.arbiter.arbitrate([0, 0], [[0, 1, 2, 3], [4, 5, 6, 7]]), [1, 11])
+        self.assertEqual(self.arbiter.get_channel_stats(1), (4, 1, 0, 1))
+        self.assertEqual(self.arbiter.get_stats(), (8, 2, 0, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from krittika.forwarding_buffer import ForwardingBuffer
+
+
+class TestForwardingBuffer(unittest.TestCase):
+    def setUp(self):
+        self.buffer = ForwardingBuffer()
+
+    def test_depth(self):
+        self.buffer.set_params(capacity_words=100, tile_words=30, drain_capacity_words=100)
+        self.assertEqual(self.buffer.get_depth(), 3)
+        self.buffer.set_params(capacity_words=100, tile_words=300, drain_capacity_words=100)
+        self.assertEqual(self.buffer.get_depth(), 1)
+
+    def test_backpressure(self):
+        # Two tiles fit, the third waits for the consumer to free the first
+        self.buffer.set_params(capacity_words=64, tile_words=32, drain_capacity_words=64)
+        self.assertEqual(self.buffer.push(0, 10), 10)
+        self.assertEqual(self.buffer.push(1, 20), 20)
+        self.buffer.free(0, 45)
+        self.assertEqual(self.buffer.push(2, 30), 45)
+        self.assertEqual(self.buffer.get_backpressure_cycles(), 15)
+        self.assertEqual(self.buffer.get_held_until(1), 0)
+        self.assertEqual(self.buffer.get_held_until(2), 45)
+
+    def test_occupancy(self):
+        self.buffer.set_params(capacity_words=64, tile_words=32, drain_capacity_words=64)
+        self.buffer.push(0, 0)
+        self.buffer.push(1, 10)
+        self.buffer.free(0, 20)
+        self.buffer.free(1, 40)
+        self.assertEqual(self.buffer.get_occupancy(), (64, 32 * 50 / 40))
+
+    def test_active_fracs(self):
+        self.buffer.set_params(capacity_words=100, tile_words=20, drain_capacity_words=40)
+        self.assertAlmostEqual(self.buffer.get_rd_active_frac(), 0.8)
+        self.assertAlmostEqual(self.buffer.get_wr_active_frac(), 0.5)
+        self.buffer.set_params(capacity_words=1000, tile_words=1, drain_capacity_words=1000)
+        self.assertEqual(self.buffer.get_rd_active_frac(), 0.99)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from krittika.config.krittika_config import KrittikaConfig
+from krittika.partition_manager import PartitionManager
+from krittika.workload_manager import WorkloadManager
+
+CONFIGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'configs')
+
+
+def write_temp_file(test_case, text, suffix='.csv'):
+    temp_file = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False)
+    temp_file.write(text)
+    temp_file.close()
+    test_case.addCleanup(os.remove, temp_file.name)
+    return temp_file.name
+
+
+def create_partition_manager(test_case, topo_rows, partition_strategy='USER'):
+    # The sample config with the given partition strategy
+    with open(os.path.join(CONFIGS_DIR, 'krittika.cfg'), 'r') as cfg_file:
+        cfg_text = cfg_file.read().replace('partition strategy = USER', 'partition strategy = ' + partition_strategy)
+    config = KrittikaConfig()
+    config.read_config_from_file(filename=write_temp_file(test_case, cfg_text, suffix='.cfg'))
+
+    workload = WorkloadManager()
+    workload.read_topologies(workload_filename=write_temp_file(test_case, '\n'.join(topo_rows) + '\n'))
+
+    partition_obj = PartitionManager()
+    partition_obj.set_params(config_obj=config, workload_obj=workload)
+    return partition_obj
+
+
+class TestUserPartitionTable(unittest.TestCase):
+    def test_layer_ids(self):
+        partition_obj = create_partition_manager(self, ['gemm, 8,8,8', 'gemm, 8,8,8', 'gemm, 8,8,8'])
+        partition_obj.read_user_partition_table(filename=write_temp_file(
+            self, 'LayerID, InputParts, FilterParts, ComputeUnit, Dataflow\n'
+                  '2, 1, 1, matmul, is\n0, 2, 1, matmul, os\n1, 1, 2, matmul, ws\n'))
+
+        self.assertEqual(partition_obj.get_layer_partitions(layer_id=0), (2, 1))
+        self.assertEqual(partition_obj.get_opt_compute_params(layer_id=1), ('matmul', 'ws'))
+        self.assertEqual(partition_obj.get_opt_compute_params(layer_id=2), ('matmul', 'is'))
+
+    def test_missing_layer_id(self):
+        # Tables with their own layer ids are not read by position
+        partition_obj = create_partition_manager(self, ['gemm, 8,8,8', 'gemm, 8,8,8', 'gemm, 8,8,8'])
+        partition_obj.read_user_partition_table(filename=write_temp_file(
+            self, 'LayerID, InputParts, FilterParts, ComputeUnit, Dataflow\n'
+                  '0, 2, 1, matmul, os\n2, 1, 1, matmul, is\n5, 1, 2, matmul, ws\n'))
+
+        self.assertEqual(partition_obj.get_layer_partitions(layer_id=2), (1, 1))
+        with self.assertRaises(AssertionError):
+            partition_obj.get_layer_partitions(layer_id=1)
+
+    def test_positional_rows(self):
+        # Rows without matching layer ids, like older user tables, are taken in order
+        partition_obj = create_partition_manager(self, ['gemm, 8,8,8', 'gemm, 8,8,8', 'gemm, 8,8,8'])
+        partition_obj.read_user_partition_table(filename=write_temp_file(
+            self, 'LayerID, InputParts, FilterParts, ComputeUnit, Dataflow\n'
+                  '0, 1, 1, matmul, os\n0, 2, 1, matmul, ws\n0, 1, 2, matmul, is\n'))
+
+        self.assertEqual(partition_obj.get_layer_partitions(layer_id=0), (1, 1))
+        self.assertEqual(partition_obj.get_layer_partitions(layer_id=1), (2, 1))
+        self.assertEqual(partition_obj.get_opt_compute_params(layer_id=2), ('matmul', 'is'))
+        with self.assertRaises(AssertionError):
+            partition_obj.get_layer_partitions(layer_id=3)
+
+
+class TestAutoPartitionTable(unittest.TestCase):
+    def test_activation_rows(self):
+        # Activation rows have no entries, the layers after them are found by id
+        partition_obj = create_partition_manager(self, ['gemm, 16,16,16', 'activation, relu', 'gemm, 16,8,16',
+                                                        'activation, tanh', 'gemm, 8,16,16'],
+                                                 partition_strategy='AUTO')
+        partition_obj.create_partition_table()
+
+        self.assertEqual([entry[0] for entry in partition_obj.partition_table], [0, 2, 4])
+        for layer_id in [0, 2, 4]:
+            input_parts, filter_parts = partition_obj.get_layer_partitions(layer_id=layer_id)
+            self.assertLessEqual(input_parts * filter_parts, 5)
+            self.assertEqual(partition_obj.get_opt_compute_params(layer_id=layer_id),
+                             tuple(partition_obj.partition_table[layer_id // 2][3:5]))
+
+        # An activation layer has no entry of its own, it does not get the entry of another layer
+        for layer_id in [1, 3]:
+            with self.assertRaises(AssertionError):
+                partition_obj.get_layer_partitions(layer_id=layer_id)
+
+
+class TestHeterogeneousPartitionTable(unittest.TestCase):
+    def test_layer_cores(self):
+        config = KrittikaConfig()
+        config.read_config_from_file(filename=os.path.join(CONFIGS_DIR, 'krittika_hetero.cfg'))
+        workload = WorkloadManager()
+        workload.read_topologies(workload_filename=write_temp_file(self, 'gemm, 64,64,64\ngemm, 8,8,8\n'))
+
+        partition_obj = PartitionManager()
+        partition_obj.set_params(config_obj=config, workload_obj=workload)
+        partition_obj.create_partition_table()
+
+        for layer_id in range(2):
+            core_type = partition_obj.get_layer_core_type(layer_id=layer_id)
+            layer_cores = partition_obj.get_layer_cores(layer_id=layer_id)
+            self.assertEqual(layer_cores, config.get_cores_of_type(core_type))
+            input_parts, filter_parts = partition_obj.get_layer_partitions(layer_id=layer_id)
+            self.assertLessEqual(input_parts * filter_parts, len(layer_cores))
+
+        # A stage pinned to the vector core gets a unit that core has
+        self.assertEqual(partition_obj.get_core_type_compute_params(layer_id=1, type_name='vec')[0], 'vector')
+
+
+if __name__ == '__main__':
+    unittest.main()
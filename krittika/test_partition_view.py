@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+from krittika.partition_view import PartitionView
+
+
+class TestPartitionView(unittest.TestCase):
+    def setUp(self):
+        self.ifmap = np.arange(10 * 4).reshape(10, 4)
+        self.filter = np.arange(4 * 6).reshape(4, 6) + 1000
+        self.ofmap = np.arange(10 * 6).reshape(10, 6) + 2000
+
+        self.view = PartitionView()
+        self.view.set_params(ifmap_matrix=self.ifmap, filter_matrix=self.filter, ofmap_matrix=self.ofmap,
+                             num_input_part=3, num_filter_part=2)
+
+    def test_bounds(self):
+        self.assertEqual(self.view.get_num_parts(), 6)
+        self.assertEqual(self.view.get_part_bounds(0), (0, 4, 0, 3))
+        self.assertEqual(self.view.get_part_bounds(3), (4, 8, 3, 6))
+        self.assertEqual(self.view.get_part_bounds(5), (8, 10, 3, 6))
+
+    def test_parts_are_views(self):
+        for part_idx in range(self.view.get_num_parts()):
+            self.assertTrue(self.view.is_zero_copy(part_idx))
+
+        ifmap_part, filter_part, ofmap_part = self.view.get_part_operands(3)
+        np.testing.assert_array_equal(ifmap_part, self.ifmap[4:8])
+        np.testing.assert_array_equal(filter_part, self.filter[:, 3:6])
+        np.testing.assert_array_equal(ofmap_part, self.ofmap[4:8, 3:6])
+
+    def test_layout(self):
+        layout = self.view.get_part_layout(1)
+        self.assertTrue(layout['ifmap_contiguous'])
+        self.assertFalse(layout['filter_contiguous'])
+        self.assertEqual(layout['filter_strides'], self.filter.strides)
+
+    def test_more_parts_than_rows(self):
+        # A GEMV row cannot be split, 5 rows over 4 parts take 3 parts of 2 rows
+        view = PartitionView()
+        view.set_params(ifmap_matrix=self.ifmap[:1], filter_matrix=self.filter, ofmap_matrix=self.ofmap[:1],
+                        num_input_part=4, num_filter_part=1)
+        self.assertEqual(view.get_num_parts(), 1)
+        view.set_params(ifmap_matrix=self.ifmap[:5], filter_matrix=self.filter, ofmap_matrix=self.ofmap[:5],
+                        num_input_part=4, num_filter_part=1)
+        self.assertEqual(view.get_num_parts(), 3)
+        self.assertEqual(view.get_part_bounds(2), (4, 5, 0, 6))
+
+
+if __name__ == '__main__':
+    unittest.main()
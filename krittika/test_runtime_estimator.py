@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from krittika.config.krittika_config import KrittikaConfig
+from krittika.partition_manager import PartitionManager
+from krittika.runtime_estimator import RuntimeEstimator
+from krittika.workload_manager import WorkloadManager
+
+CONFIGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'configs')
+
+
+def add_synthetic_samples(estimator, total_coeffs, stall_coeffs):
+    # Samples whose cycles are exactly linear in the features
+    for M, N, K in [(64, 64, 64), (128, 32, 16), (32, 256, 64), (512, 64, 8), (16, 16, 1024), (256, 256, 32)]:
+        for df in ['os', 'ws', 'is']:
+            for bandwidth in [1, 10]:
+                params = [M, N, K, df, 8, 8, 2, 1, (512, 512, 256), (bandwidth, bandwidth, bandwidth)]
+                features = np.array(RuntimeEstimator.get_features(*params), dtype=float)
+                estimator.add_sample(*params, total_cycles=float(features @ total_coeffs),
+                                     stall_cycles=float(features @ stall_coeffs))
+
+
+class TestRuntimeEstimator(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_fit(self):
+        estimator = RuntimeEstimator()
+        add_synthetic_samples(estimator, np.array([1.5, 0.2, 1.0, 20.0]), np.array([0.0, 0.1, 1.0, 5.0]))
+
+        # The roofline misses the constant and the scaled compute, the fit recovers them
+        self.assertGreater(estimator.get_fit_error(), 0.1)
+        estimator.fit()
+        self.assertTrue(estimator.is_fitted())
+        self.assertLess(estimator.get_fit_error(), 1e-6)
+        np.testing.assert_allclose(estimator.total_coeffs, [1.5, 0.2, 1.0, 20.0], atol=1e-6)
+
+    def test_fit_needs_samples(self):
+        estimator = RuntimeEstimator()
+        estimator.add_sample(64, 64, 64, 'os', 8, 8, total_cycles=100)
+        with self.assertRaises(AssertionError):
+            estimator.fit()
+
+    def test_predict_clamp(self):
+        # A fit whose stall exceeds the total is cut to the total
+        estimator = RuntimeEstimator()
+        estimator.total_coeffs = np.array([1.0, 0.0, 0.0, 0.0])
+        estimator.stall_coeffs = np.array([2.0, 0.0, 0.0, 10.0])
+        total_cycles, stall_cycles = estimator.predict(64, 64, 64, 'os', 8, 8)
+        self.assertGreater(total_cycles, 0)
+        self.assertEqual(stall_cycles, total_cycles)
+
+        # And negative predictions are cut to 0
+        estimator.total_coeffs = np.array([-1.0, 0.0, 0.0, 0.0])
+        self.assertEqual(estimator.predict(64, 64, 64, 'os', 8, 8), (0.0, 0.0))
+
+    def test_samples_round_trip(self):
+        estimator = RuntimeEstimator()
+        add_synthetic_samples(estimator, np.array([1.0, 0.0, 1.0, 0.0]), np.array([0.0, 0.0, 1.0, 0.0]))
+        samples_filename = os.path.join(self.tmp_dir.name, 'samples.csv')
+        estimator.write_samples(samples_filename)
+
+        read_estimator = RuntimeEstimator()
+        read_estimator.read_samples(samples_filename)
+        self.assertEqual(read_estimator.get_num_samples(), estimator.get_num_samples())
+        self.assertEqual(read_estimator.samples, estimator.samples)
+
+    def test_report_samples(self):
+        with open(os.path.join(CONFIGS_DIR, 'krittika.cfg'), 'r') as cfg_file:
+            cfg_text = cfg_file.read().replace('partition strategy = USER', 'partition strategy = AUTO')
+        config_filename = os.path.join(self.tmp_dir.name, 'auto.cfg')
+        with open(config_filename, 'w') as cfg_file:
+            cfg_file.write(cfg_text)
+        config = KrittikaConfig()
+        config.read_config_from_file(filename=config_filename)
+
+        workload_filename = os.path.join(self.tmp_dir.name, 'topo.csv')
+        with open(workload_filename, 'w') as topo_file:
+            topo_file.write('gemm, 16,16,16\nactivation, relu\ngemm, 16,8,16\n')
+        workload = WorkloadManager()
+        workload.read_topologies(workload_filename=workload_filename)
+
+        partition_obj = PartitionManager()
+        partition_obj.set_params(config_obj=config, workload_obj=workload)
+        partition_obj.create_partition_table()
+
+        # Same columns as the COMPUTE_REPORT of the simulator, the activation row is skipped
+        report_filename = os.path.join(self.tmp_dir.name, 'COMPUTE_REPORT.csv')
+        with open(report_filename, 'w') as report_file:
+            report_file.write('LayerID, Total Cycles, Stall Cycles, Overall Util %, Mapping Efficiency %, Compute Util %,\n'
+                              '0, 120, 20, 50.0, 100.0, 50.0,\n'
+                              '1, 30, 0, 10.0, 100.0, 10.0,\n'
+                              '2, 90, 0, 40.0, 100.0, 40.0,\n')
+
+        estimator = RuntimeEstimator()
+        estimator.add_report_samples(compute_report_filename=report_filename, config_obj=config,
+                                     workload_obj=workload, partition_obj=partition_obj)
+        self.assertEqual(estimator.get_num_samples(), 2)
+        for sample, layer_id, cycles in zip(estimator.samples, [0, 2], [(120, 20), (90, 0)]):
+            self.assertEqual(tuple(sample[:3]), tuple(workload.get_transformed_mnk_dimensions(layer_id)))
+            self.assertEqual(sample[3], partition_obj.get_opt_compute_params(layer_id=layer_id)[1])
+            self.assertEqual(tuple(sample[6:8]), partition_obj.get_layer_partitions(layer_id=layer_id))
+            self.assertEqual(tuple(sample[-2:]), cycles)
+
+
+if __name__ == '__main__':
+    unittest.main()
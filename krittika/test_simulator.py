@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from krittika.simulator import Simulator
+
+CONFIGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'configs')
+
+
+class TestTuneSetParams(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        # The sample config with the automatic partition strategy
+        with open(os.path.join(CONFIGS_DIR, 'krittika.cfg'), 'r') as cfg_file:
+            cfg_text = cfg_file.read().replace('partition strategy = USER', 'partition strategy = AUTO')
+        self.config_filename = os.path.join(self.tmp_dir.name, 'auto.cfg')
+        with open(self.config_filename, 'w') as cfg_file:
+            cfg_file.write(cfg_text)
+
+        self.workload_filename = os.path.join(self.tmp_dir.name, 'topo.csv')
+        with open(self.workload_filename, 'w') as topo_file:
+            topo_file.write('gemm, 8,8,8\nactivation, relu\ngemm, 8,8,8\n')
+
+    def tune_set_params(self, sim):
+        sim.set_params(config_filename=self.config_filename,
+                       network_config_filename=os.path.join(CONFIGS_DIR, 'network.cfg'),
+                       workload_filename=self.workload_filename,
+                       reports_dir_path=self.tmp_dir.name,
+                       verbose=False,
+                       tune_time_budget=30)
+
+    def test_tune_in_set_params(self):
+        sim = Simulator()
+        sim.enable_lp_partition = False
+        sim.enable_ls_partition = True
+        self.tune_set_params(sim)
+
+        self.assertTrue(sim.params_valid)
+        self.assertTrue(os.path.isfile(os.path.join(self.tmp_dir.name, 'TUNED_PARTITION.csv')))
+        for layer_id in [0, 2]:
+            input_parts, filter_parts = sim.partition_obj.get_layer_partitions(layer_id=layer_id)
+            self.assertLessEqual(input_parts * filter_parts, sim.config_obj.get_num_cores())
+
+    def test_tune_selects_ls_mode(self):
+        # The default LP mode does not use the partitions the tuner refines
+        sim = Simulator()
+        self.tune_set_params(sim)
+        self.assertTrue(sim.enable_ls_partition)
+        self.assertFalse(sim.enable_lp_partition)
+
+    def test_tune_not_in_tiled_mode(self):
+        sim = Simulator()
+        sim.enable_lp_partition = False
+        sim.enable_ls_partition_tile_based = True
+        with self.assertRaises(AssertionError):
+            self.tune_set_params(sim)
+
+
+class TestPlaceCores(unittest.TestCase):
+    def test_switch_hops(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        workload_filename = os.path.join(tmp_dir.name, 'topo.csv')
+        with open(workload_filename, 'w') as topo_file:
+            topo_file.write('gemm, 8,8,8\nactivation, relu\ngemm, 8,8,8\n')
+
+        # Every hop goes up to the switch and back, the chain has one link per pair of LP stages
+        sim = Simulator()
+        sim.set_params(config_filename=os.path.join(CONFIGS_DIR, 'krittika_hetero.cfg'),
+                       network_config_filename=os.path.join(CONFIGS_DIR, 'network.cfg'),
+                       workload_filename=workload_filename,
+                       reports_dir_path=tmp_dir.name,
+                       verbose=False,
+                       core_placement='auto')
+
+        self.assertEqual(len(sim.get_lp_stage_layers()), 2)
+        self.assertEqual(sim.compute_grid_obj.get_total_hops(node_pairs=[[0, 1]]), 2)
+        self.assertEqual(sim.compute_grid_obj.get_hop_count(0, 1), 2)
+
+
+class TestHeterogeneousLP(unittest.TestCase):
+    def test_stages_follow_core_types(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        workload_filename = os.path.join(tmp_dir.name, 'topo.csv')
+        with open(workload_filename, 'w') as topo_file:
+            topo_file.write('gemm, 8,8,8\n' * 5)
+
+        sim = Simulator()
+        sim.set_params(config_filename=os.path.join(CONFIGS_DIR, 'krittika_hetero.cfg'),
+                       network_config_filename=os.path.join(CONFIGS_DIR, 'network.cfg'),
+                       workload_filename=workload_filename,
+                       reports_dir_path=tmp_dir.name,
+                       verbose=False)
+        sim.run()
+
+        # Stage 4 is pinned to the 'vec' core, which has no matmul unit
+        self.assertTrue(sim.runs_done)
+        core_types = [layer_sim.core_type for layer_sim in sim.single_layer_objects_list]
+        self.assertEqual(core_types, ['big', 'big', 'default', 'default', 'vec'])
+        self.assertEqual(sim.single_layer_objects_list[4].get_compute_params()[0], 'vector')
+
+
+if __name__ == '__main__':
+    unittest.main()
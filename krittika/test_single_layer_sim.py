@@ -0,0 +1,94 @@
+import gc
+import os
+import tempfile
+import tracemalloc
+import unittest
+import numpy as np
+from scalesim.scale_config import scale_config
+from scalesim.compute.operand_matrix import operand_matrix
+from krittika.compute.conv_operand_matrix import ConvOperandMatrix, Im2colMatrix
+from krittika.config.krittika_config import KrittikaConfig
+from krittika.partition_manager import PartitionManager
+from krittika.single_layer_sim import SingleLayerSim
+from krittika.workload_manager import WorkloadManager
+
+CONFIGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'configs')
+
+
+class TestImplicitIm2colParts(unittest.TestCase):
+    def setUp(self):
+        # A conv layer whose im2col ifmap is much larger than its ifmap
+        topo_file = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        topo_file.write('conv, 34, 34, 3, 3, 32, 16, 1\n')
+        topo_file.close()
+        self.addCleanup(os.remove, topo_file.name)
+
+        self.config = KrittikaConfig()
+        self.config.read_config_from_file(filename=os.path.join(CONFIGS_DIR, 'krittika.cfg'))
+        self.workload = WorkloadManager()
+        self.workload.read_topologies(workload_filename=topo_file.name)
+        self.partition_obj = PartitionManager()
+        self.partition_obj.set_params(config_obj=self.config, workload_obj=self.workload)
+
+    def create_operand_matrix(self, op_mat_class):
+        # Same config the simulator builds the operand matrices with
+        conf_list = scale_config.get_default_conf_as_list()
+        conf_list[10] = 'CALC'
+        conf_list.append(10)
+        single_arr_config = scale_config()
+        single_arr_config.update_from_list(conf_list=conf_list)
+
+        op_mat_obj = op_mat_class()
+        op_mat_obj.set_params(config_obj=single_arr_config, topoutil_obj=self.workload, layer_id=0)
+        op_mat_obj.create_operand_matrices()
+        return op_mat_obj
+
+    def create_part_compute_nodes(self, op_mat_class, num_input_part=4):
+        layer_sim = SingleLayerSim()
+        layer_sim.set_params(config_obj=self.config, op_mat_obj=self.create_operand_matrix(op_mat_class),
+                             partitioner_obj=self.partition_obj, layer_id=0, verbosity=False,
+                             num_cores=num_input_part)
+        layer_sim.num_input_part, layer_sim.num_filter_part = num_input_part, 1
+        layer_sim.setup_partition_view()
+        return [layer_sim.create_part_compute_node(part_idx, 'matmul', 'os') for part_idx in range(num_input_part)]
+
+    def test_dense_part_released(self):
+        compute_nodes = self.create_part_compute_nodes(ConvOperandMatrix)
+        ref_nodes = self.create_part_compute_nodes(operand_matrix)
+
+        for compute_node, ref_node in zip(compute_nodes, ref_nodes):
+            # Only the implicit block is kept, the demand and prefetch match the dense part
+            self.assertIsInstance(compute_node.ifmap_matrix, Im2colMatrix)
+            self.assertIs(compute_node.selected_compute_node.compute_unit.ifmap_op_mat, compute_node.ifmap_matrix)
+            for matrix, ref_matrix in zip(compute_node.get_demand_matrices() + compute_node.get_prefetch_matrices(),
+                                          ref_node.get_demand_matrices() + ref_node.get_prefetch_matrices()):
+                np.testing.assert_array_equal(matrix, ref_matrix)
+            # Folds materialize their rows of the implicit block
+            self.assertTrue(compute_node.enable_fold_demand())
+
+    def get_traced_memory(self, op_mat_class):
+        # Memory held by the parts once built, and the peak while building them
+        gc.collect()
+        tracemalloc.start()
+        compute_nodes = self.create_part_compute_nodes(op_mat_class)
+        for compute_node in compute_nodes:
+            compute_node.get_prefetch_matrices()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return current, peak
+
+    def test_peak_memory(self):
+        ifmap_matrix = self.create_operand_matrix(ConvOperandMatrix).get_all_operand_matrix()[0]
+        dense_im2col_bytes = np.asarray(ifmap_matrix).nbytes
+
+        implicit_current, implicit_peak = self.get_traced_memory(ConvOperandMatrix)
+        dense_current, dense_peak = self.get_traced_memory(operand_matrix)
+
+        # The dense path keeps the layer im2col alive with its parts, the implicit path never holds it
+        self.assertGreater(dense_current - implicit_current, 0.9 * dense_im2col_bytes)
+        self.assertLess(implicit_peak, dense_peak - dense_im2col_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+from krittika.static_utilities import StaticUtilities
+
+
+class TestStaticUtilities(unittest.TestCase):
+    def test_factor_pairs(self):
+        self.assertEqual(StaticUtilities.get_factors_as_pairs(12),
+                         [[1, 12], [2, 6], [3, 4], [4, 3], [6, 2], [12, 1]])
+        self.assertEqual(StaticUtilities.get_factors_as_pairs(16),
+                         [[1, 16], [2, 8], [4, 4], [8, 2], [16, 1]])
+        self.assertEqual(StaticUtilities.get_factors_as_pairs(1), [[1, 1]])
+
+    def test_factor_pairs_are_copies(self):
+        pairs = StaticUtilities.get_factors_as_pairs(6)
+        pairs[0][0] = 100
+        self.assertEqual(StaticUtilities.get_factors_as_pairs(6)[0], [1, 6])
+
+    def test_large_core_counts(self):
+        pairs = StaticUtilities.get_factors_as_pairs(1024)
+        self.assertEqual(len(pairs), 11)
+        self.assertTrue(all(a * b == 1024 for a, b in pairs))
+
+    def test_padded_candidates(self):
+        # 7 cores only split as 1x7 and 7x1, padding adds the 6 core splits
+        exact = StaticUtilities.get_partition_candidates(7)
+        padded = StaticUtilities.get_partition_candidates(7, min_core_util=0.8)
+        self.assertEqual(exact, [[1, 7], [7, 1]])
+        self.assertEqual(padded[:2], exact)
+        self.assertIn([2, 3], padded)
+        self.assertNotIn([5, 1], padded)
+
+    def test_pruning(self):
+        candidates = StaticUtilities.get_partition_candidates(16, max_input_part=4, max_filter_part=8)
+        self.assertEqual(candidates, [[2, 8], [4, 4]])
+
+        # Nothing fits, all the splits are kept
+        candidates = StaticUtilities.get_partition_candidates(16, max_input_part=1, max_filter_part=1)
+        self.assertEqual(len(candidates), 5)
+
+    def test_address_dtype(self):
+        demand = np.ones((4, 2)) * -1
+        demand[0, 0] = 2 * 10 ** 7
+        compact = StaticUtilities.to_address_matrix(demand)
+        self.assertEqual(compact.dtype, np.int32)
+        np.testing.assert_array_equal(compact, demand)
+
+        large = np.array([[-1, 2 ** 33]])
+        self.assertEqual(StaticUtilities.to_address_matrix(large).dtype, np.int64)
+
+        # Big endian scalesim operands become native, native int32 is not copied
+        operands = np.ones((2, 2), dtype='>i4')
+        self.assertTrue(StaticUtilities.to_address_matrix(operands).dtype.isnative)
+        native = np.ones((2, 2), dtype=np.int32)
+        self.assertIs(StaticUtilities.to_address_matrix(native), native)
+
+
+if __name__ == '__main__':
+    unittest.main()
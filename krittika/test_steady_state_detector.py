@@ -0,0 +1,49 @@
+import unittest
+from krittika.steady_state_detector import SteadyStateDetector
+
+
+class TestSteadyStateDetector(unittest.TestCase):
+    def setUp(self):
+        self.detector = SteadyStateDetector()
+        self.detector.set_params(min_tiles=4, max_period=3, num_repeats=3)
+
+    def test_constant_stream(self):
+        for cycles in [40, 35, 30, 30, 30]:
+            self.detector.add_tile(cycles, 2)
+        self.assertTrue(self.detector.is_steady())
+        self.assertEqual(self.detector.get_period(), 1)
+        self.assertEqual(self.detector.get_tile_cycles(5), 30)
+
+    def test_periodic_stream(self):
+        for cycles in [50, 20, 30, 20, 30, 20, 30]:
+            self.detector.add_tile(cycles, cycles // 10)
+        self.assertTrue(self.detector.is_steady())
+        self.assertEqual(self.detector.get_period(), 2)
+        self.assertEqual(self.detector.get_tile_cycles(0), 20)
+        self.assertEqual(self.detector.get_tile_cycles(1), 30)
+
+    def test_not_steady(self):
+        for cycles in [10, 20, 30, 40, 50, 60]:
+            self.detector.add_tile(cycles, 0)
+        self.assertFalse(self.detector.is_steady())
+
+    def test_stalls_break_periodicity(self):
+        for stalls in [0, 1, 2, 3, 4]:
+            self.detector.add_tile(30, stalls)
+        self.assertFalse(self.detector.is_steady())
+
+    def test_tolerance(self):
+        self.detector.set_params(min_tiles=3, max_period=1, num_repeats=3, tolerance=0.05)
+        for cycles in [100, 102, 99]:
+            self.detector.add_tile(cycles, 0)
+        self.assertTrue(self.detector.is_steady())
+
+    def test_lock_pattern(self):
+        for cycles in [10, 20, 30]:
+            self.detector.add_tile(cycles, 0)
+        self.detector.lock_pattern(2)
+        self.assertEqual([self.detector.get_tile_cycles(offset) for offset in range(3)], [20, 30, 20])
+
+
+if __name__ == '__main__':
+    unittest.main()
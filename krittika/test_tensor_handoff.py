@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+from krittika.tensor_handoff import TensorHandoff
+
+
+class TestTensorHandoff(unittest.TestCase):
+    def setUp(self):
+        self.handoff = TensorHandoff()
+        self.handoff.set_from_matrix(producer_id=2, matrix=np.arange(10 * 6).reshape(10, 6) + 2000,
+                                     part_bounds=[(0, 4, 0, 3), (0, 4, 3, 6), (4, 8, 0, 3), (4, 8, 3, 6), (8, 10, 0, 3)])
+
+    def test_metadata(self):
+        self.assertEqual(self.handoff.get_shape(), (10, 6))
+        self.assertEqual(self.handoff.get_address_range(), (2000, 2060))
+        np.testing.assert_array_equal(self.handoff.get_part_num_elems(), [12, 12, 12, 12, 6])
+
+    def test_row_parts(self):
+        row_starts, row_ends = self.handoff.get_row_parts(4)
+        np.testing.assert_array_equal(row_ends - row_starts, [3, 3, 3, 1])
+        row_starts, row_ends = self.handoff.get_row_parts(12)
+        self.assertEqual((row_ends - row_starts).sum(), 10)
+        self.assertTrue(np.all(row_ends >= row_starts))
+
+    def test_forward(self):
+        forwarded = self.handoff.forward(producer_id=3)
+        self.assertEqual(forwarded.producer_id, 3)
+        self.assertEqual(forwarded.get_address_range(), self.handoff.get_address_range())
+        self.assertEqual(forwarded.get_part_bounds(4), (8, 10, 0, 3))
+
+    def test_instances(self):
+        handoff = TensorHandoff()
+        handoff.set_from_matrix(producer_id=0, matrix=np.arange(4 * 3).reshape(4, 3),
+                                part_bounds=[(0, 2, 0, 3), (2, 4, 0, 3)],
+                                num_instances=3, instance_stride=12)
+        self.assertEqual(handoff.get_num_elems(), 36)
+        self.assertEqual(handoff.get_address_range(), (0, 36))
+        np.testing.assert_array_equal(handoff.get_part_num_elems(), [18, 18])
+        row_starts, row_ends = handoff.get_row_parts(4)
+        np.testing.assert_array_equal(row_ends - row_starts, [3, 3, 3, 3])
+        self.assertEqual(handoff.forward(producer_id=1).get_num_instances(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from krittika.workload_manager import WorkloadManager
+
+
+def read_workload(test_case, rows):
+    topo_file = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+    topo_file.write('\n'.join(rows) + '\n')
+    topo_file.close()
+    test_case.addCleanup(os.remove, topo_file.name)
+
+    workload = WorkloadManager()
+    workload.read_topologies(workload_filename=topo_file.name)
+    return workload
+
+
+class TestOperatorFusion(unittest.TestCase):
+    def test_activation_chain(self):
+        workload = read_workload(self, ['gemm, 40,30,20', 'activation, relu', 'activation, softmax, tanh',
+                                        'gemm, 40,20,30', 'gemm, 40,30,10', 'activation, tanh'])
+        self.assertEqual(workload.get_fused_layers(0), [1, 2])
+        self.assertEqual(workload.get_fused_layers(3), [])
+        self.assertEqual(workload.get_fusion_producer(2), 0)
+        self.assertEqual(workload.get_fusion_producer(5), 4)
+        self.assertEqual(workload.get_fusion_producer(3), -1)
+        self.assertEqual(workload.get_fusion_saved_words(1), 2 * workload.get_layer_num_ofmap_px(0))
+
+    def test_leading_activation(self):
+        workload = read_workload(self, ['activation, relu', 'gemm, 40,30,20', 'activation, relu'])
+        self.assertEqual(workload.get_fusion_producer(0), -1)
+        self.assertEqual(workload.get_fusion_saved_words(0), 0)
+        self.assertEqual(workload.get_fusion_producer(2), 1)
+
+
+class TestMatmulLayerTypes(unittest.TestCase):
+    def setUp(self):
+        self.workload = read_workload(self, ['batched_gemm, 3, 20,12,10', 'grouped_conv, 10,10,3,3,8,8,2,1',
+                                             'depthwise_conv, 10,10,3,3,6,2', 'activation, relu', 'gemm, 20,12,10'])
+
+    def test_instances(self):
+        self.assertEqual([self.workload.get_layer_num_instances(lid) for lid in range(5)], [3, 2, 6, 1, 1])
+        self.assertEqual([self.workload.is_matmul_layer(lid) for lid in range(5)], [True, True, True, False, True])
+
+    def test_instance_shapes(self):
+        # Every instance is a gemm or conv of its own share of the channels and filters
+        self.assertEqual(self.workload.get_transformed_mnk_dimensions(0),
+                         self.workload.get_transformed_mnk_dimensions(4))
+        self.assertEqual(self.workload.get_layer_num_channels(1), 4)
+        self.assertEqual(self.workload.get_layer_num_filters(1), 4)
+        self.assertEqual(self.workload.get_layer_num_channels(2), 1)
+        self.assertEqual(self.workload.get_layer_num_filters(2), 1)
+        self.assertEqual(list(self.workload.get_layer_strides(2)), [2, 2])
+
+    def test_mac_ops(self):
+        self.assertEqual(self.workload.get_layer_mac_ops(0), 3 * self.workload.get_layer_mac_ops(4))
+        self.assertEqual(self.workload.get_layer_instance_words(1), (10 * 10 * 4, 3 * 3 * 4 * 4, 8 * 8 * 4))
+        self.assertEqual(self.workload.get_fusion_saved_words(3), 2 * 6 * self.workload.get_layer_num_ofmap_px(2))
+
+
+class TestTransformerBlock(unittest.TestCase):
+    def setUp(self):
+        self.workload = read_workload(self, ['transformer_block, 16, 32, 4, 64, 24, 2', 'gemm, 16,10,32',
+                                             'transformer_block, 16, 32, 4, 64, 24'])
+
+    def test_expansion(self):
+        self.assertEqual(self.workload.get_num_layers(), 31)
+        self.assertEqual(self.workload.get_num_blocks(), 3)
+        self.assertEqual(self.workload.get_block_layer_ids(2), list(range(21, 31)))
+        # Scores over the kv cache, one matmul per head
+        self.assertEqual(self.workload.get_layer_num_instances(1), 4)
+        self.assertEqual(self.workload.get_transformed_mnk_dimensions(1),
+                         self.workload.get_transformed_mnk_dimensions(11))
+        self.assertEqual(self.workload.get_layer_mac_ops(1), 4 * 16 * 24 * 8)
+        self.assertEqual(self.workload.get_layer_params(2)[2:], ['softmax'])
+        self.assertEqual(self.workload.get_fused_layers(6), [7])
+
+    def test_repeated_blocks(self):
+        self.assertEqual(self.workload.get_layer_reuse_id(3), 3)
+        self.assertEqual(self.workload.get_layer_reuse_id(13), 3)
+        self.assertEqual(self.workload.get_layer_reuse_id(20), 20)
+        self.assertEqual(self.workload.get_layer_reuse_id(29), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
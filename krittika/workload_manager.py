@@ -9,33 +9,115 @@ class WorkloadManager:
         self.topo_list = []
         self.spatio_temp_dim_arrays = []
         self.layers_calculated_hyperparams = []
+        # Layers made of identical matmuls (batches or groups) keep the conv form entry of one
+        # instance, with the number of instances here
+        self.matmul_layer_types = ['conv', 'gemm', 'batched_gemm', 'grouped_conv', 'depthwise_conv']
+        self.layer_num_instances = {}
+        # Transformer blocks: the layer ids of every block, and for the layers of a repeated block
+        # the matching layer of the first block with the same shape
+        self.block_layer_ids = []
+        self.block_shapes = []
+        self.layer_reuse_ids = {}
+        # [producer layer id, [activation layer ids fused into it]] per conv and gemm layer
+        self.fusion_groups = []
         self.topo_valid = False
         self.topo_hyper_param_valid = False
         self.topo_spatiotemp_params_valid = False
+        self.fusion_valid = False
         
     #
     def read_topologies(self, workload_filename=''):
         self.topo_file_name = workload_filename
         f = open(workload_filename)
-        format = 'conv'
+        rows = f.readlines()
+        f.close()
 
-        for index, row in enumerate(f):
-                format = str(row.strip().split(',')[0].strip())
-                assert format in ['gemm', 'conv', 'activation']
-                
-                if format == "conv":
-                    self.load_arrays_conv(row, index)
-                elif format == "gemm":
-                    self.load_arrays_gemm(row, index)
-                elif format == "activation":
-                    self.load_arrays_activation(row, index)
+        self.read_topology_rows(rows)
 
-                self.num_layers += 1
+    #
+    def read_topology_rows(self, rows=()):
+        # Rows in the format of the topology file, for workloads generated without a file
+        for row in rows:
+            format = str(row.strip().split(',')[0].strip())
+            if format == "transformer_block":
+                self.load_transformer_blocks(row)
+            else:
+                self.load_layer(row)
 
         # There should be atleast one layer in topology file
         if self.num_layers > 0:
             self.topo_valid = True
-    
+
+    #
+    def load_layer(self, row):
+        # Adds the layer of one topology row, the layer id is its position in the topology
+        format = str(row.strip().split(',')[0].strip())
+        assert format in self.matmul_layer_types + ['activation'], 'Unsupported layer type ' + format
+        index = self.num_layers
+
+        if format == "conv":
+            self.load_arrays_conv(row, index)
+        elif format == "gemm":
+            self.load_arrays_gemm(row, index)
+        elif format == "batched_gemm":
+            self.load_arrays_batched_gemm(row, index)
+        elif format in ["grouped_conv", "depthwise_conv"]:
+            self.load_arrays_grouped_conv(row, index)
+        elif format == "activation":
+            self.load_arrays_activation(row, index)
+
+        self.num_layers += 1
+        return index
+
+    #
+    def load_transformer_blocks(self, row):
+        # transformer_block, seq len, d model, heads, d ff (, kv len) (, num blocks)
+        # The kv len defaults to the seq len (self attention over the prompt)
+        elems = [int(e.strip()) for e in row.strip().split(',')[1:]]
+        assert 4 <= len(elems) <= 6, 'transformer_block takes seq len, d model, heads, d ff, kv len, num blocks'
+        seq_len, d_model, heads, d_ff = elems[:4]
+        kv_len = elems[4] if len(elems) > 4 else seq_len
+        num_blocks = elems[5] if len(elems) > 5 else 1
+        assert num_blocks > 0, 'Number of blocks should be positive'
+
+        for _ in range(num_blocks):
+            self.load_transformer_block(seq_len, d_model, heads, d_ff, kv_len)
+
+    #
+    def load_transformer_block(self, seq_len=1, d_model=1, heads=1, d_ff=1, kv_len=1):
+        # One block as gemm and activation rows, the layers of a block of the same shape as an
+        # earlier one are tagged with the matching layers of the first such block
+        block_shape = (seq_len, d_model, heads, d_ff, kv_len)
+        block_rows = self.get_transformer_block_rows(*block_shape)
+        layer_ids = [self.load_layer(block_row) for block_row in block_rows]
+
+        if block_shape in self.block_shapes:
+            first_block = self.block_shapes.index(block_shape)
+            for layer_id, reuse_id in zip(layer_ids, self.block_layer_ids[first_block]):
+                self.layer_reuse_ids[layer_id] = reuse_id
+        self.block_layer_ids += [layer_ids]
+        self.block_shapes += [block_shape]
+
+    #
+    @staticmethod
+    def get_transformer_block_rows(seq_len=1, d_model=1, heads=1, d_ff=1, kv_len=1):
+        # QKV projection, per head scores and context, output projection and the FFN.
+        # Softmax follows the scores, GELU the first FFN gemm and a norm every residual add.
+        assert min(seq_len, d_model, heads, d_ff, kv_len) > 0, 'Transformer block dimensions should be positive'
+        assert d_model % heads == 0, 'd model should divide into ' + str(heads) + ' heads'
+        d_head = d_model // heads
+
+        return ['gemm, ' + ', '.join([str(seq_len), str(3 * d_model), str(d_model)]),
+                'batched_gemm, ' + ', '.join([str(heads), str(seq_len), str(kv_len), str(d_head)]),
+                'activation, softmax',
+                'batched_gemm, ' + ', '.join([str(heads), str(seq_len), str(d_head), str(kv_len)]),
+                'gemm, ' + ', '.join([str(seq_len), str(d_model), str(d_model)]),
+                'activation, batch_norm',
+                'gemm, ' + ', '.join([str(seq_len), str(d_ff), str(d_model)]),
+                'activation, gelu',
+                'gemm, ' + ', '.join([str(seq_len), str(d_model), str(d_ff)]),
+                'activation, batch_norm']
+
     #
     def load_arrays_conv(self, row, layer_id):
         row = row.strip()
@@ -64,6 +146,41 @@ class WorkloadManager:
 
         self.topo_list.append(entry)
     
+    #
+    def load_arrays_batched_gemm(self, row, layer_id):
+        # batched_gemm, B, M, N, K: B independent M x K by K x N matmuls
+        row = row.strip()
+        elems = row.split(',')[:]
+        b, m, n, k = [int(elems[i].strip()) for i in range(1, 5)]
+        assert b > 0, 'Batch size should be positive'
+        entry = ['batched_gemm', layer_id, m, k, 1, k, 1, n, 1, 1]
+
+        self.layer_num_instances[layer_id] = b
+        self.topo_list.append(entry)
+
+    #
+    def load_arrays_grouped_conv(self, row, layer_id):
+        # grouped_conv, ifmap h, ifmap w, filter h, filter w, channels, filters, groups, stride (, col stride)
+        # depthwise_conv, ifmap h, ifmap w, filter h, filter w, channels, stride (, col stride)
+        row = row.strip()
+        layer_type = row.split(',')[0].strip()
+        elems = [int(e.strip()) for e in row.split(',')[1:]]
+        if layer_type == 'depthwise_conv':
+            elems = elems[:5] + [elems[4], elems[4]] + elems[5:]
+
+        ifmap_h, ifmap_w, filt_h, filt_w, num_ch, num_filt, groups, stride_h = elems[:8]
+        stride_w = elems[8] if len(elems) > 8 else stride_h
+        assert groups > 0 and num_ch % groups == 0 and num_filt % groups == 0, \
+            'Channels and filters should divide into ' + str(groups) + ' groups'
+        assert filt_h <= ifmap_h, 'Filter height cannot be larger than IFMAP height'
+        assert filt_w <= ifmap_w, 'Filter width cannot be larger than IFMAP width'
+
+        entry = [layer_type, layer_id, ifmap_h, ifmap_w, filt_h, filt_w,
+                 num_ch // groups, num_filt // groups, stride_h, stride_w]
+
+        self.layer_num_instances[layer_id] = groups
+        self.topo_list.append(entry)
+
     #
     def load_arrays_activation(self, row, layer_id):
         row = row.strip()
@@ -71,8 +188,8 @@ class WorkloadManager:
         entry = ['activation', layer_id]
         for i in range(1, len(elems)):
             func = str(elems[i].strip())
-            assert func in ['relu', 'batch_norm', 'tanh', 'softmax'], \
-                'Unsupported activation, choose from relu, batch_norm, tanh, softmax'
+            assert func in ['relu', 'batch_norm', 'tanh', 'softmax', 'gelu'], \
+                'Unsupported activation, choose from relu, batch_norm, tanh, softmax, gelu'
             entry.append(func)
 
         self.topo_list.append(entry)
@@ -90,7 +207,7 @@ class WorkloadManager:
             self.read_topologies(topofilename)
         self.layers_calculated_hyperparams = []
         for array in self.topo_list:
-            if array[0] in ['conv', 'gemm']:
+            if array[0] in self.matmul_layer_types:
                 layer_id = array[1]
                 ifmap_h = array[2]
                 ifmap_w = array[3]
@@ -103,6 +220,7 @@ class WorkloadManager:
                 ofmap_h = int(math.ceil((ifmap_h - filt_h + stride_h) / stride_h))
                 ofmap_w = int(math.ceil((ifmap_w - filt_w + stride_w) / stride_w))
                 num_mac = ofmap_h * ofmap_w * filt_h * filt_w * num_ch * num_filt
+                num_mac *= self.layer_num_instances.get(layer_id, 1)
                 window_size = filt_h * filt_w * num_ch
                 entry = [layer_id, ofmap_h, ofmap_w, num_mac, window_size]
                 self.layers_calculated_hyperparams.append(entry)
@@ -115,7 +233,7 @@ class WorkloadManager:
             print("ERROR: topologies.get_layer_ifmap_dims: Invalid layer id")
         
         layer_params = self.topo_list[layer_id]
-        assert layer_params[0] in ['conv', 'gemm'], 'It should be a conv/gemm layer'
+        assert layer_params[0] in self.matmul_layer_types, 'It should be a conv/gemm layer'
         
         return layer_params[2:4]    # Idx = 2, 3
 
@@ -133,7 +251,7 @@ class WorkloadManager:
             print("ERROR: topologies.get_layer_num_filter: Invalid layer id")
 
         layer_params = self.topo_list[layer_id]
-        assert layer_params[0] in ['conv', 'gemm'], 'It should be a conv/gemm layer'
+        assert layer_params[0] in self.matmul_layer_types, 'It should be a conv/gemm layer'
         
         return layer_params[6]
 
@@ -143,7 +261,7 @@ class WorkloadManager:
             print("ERROR: topologies.get_layer_num_filter: Invalid layer id")
         
         layer_params = self.topo_list[layer_id]
-        assert layer_params[0] in ['conv', 'gemm'], 'It should be a conv/gemm layer'
+        assert layer_params[0] in self.matmul_layer_types, 'It should be a conv/gemm layer'
 
         return layer_params[7]
 
@@ -154,7 +272,7 @@ class WorkloadManager:
             print("ERROR: topologies.get_layer_strides: Invalid layer id")
 
         layer_params = self.topo_list[layer_id]
-        assert layer_params[0] in ['conv', 'gemm'], 'It should be a conv/gemm layer'
+        assert layer_params[0] in self.matmul_layer_types, 'It should be a conv/gemm layer'
 
         return layer_params[8:10]
 
@@ -166,7 +284,7 @@ class WorkloadManager:
             self.topo_calc_hyperparams()
 
         layer_params = self.topo_list[layer_id]
-        assert layer_params[0] in ['conv', 'gemm'], 'It should be a conv/gemm layer'
+        assert layer_params[0] in self.matmul_layer_types, 'It should be a conv/gemm layer'
 
         layer_hyperparams = self.get_layer_hyperparams(layer_id)
 
@@ -180,7 +298,7 @@ class WorkloadManager:
             self.topo_calc_hyperparams()
 
         layer_params = self.topo_list[layer_id]
-        assert layer_params[0] in ['conv', 'gemm'], 'It should be a conv/gemm layer'
+        assert layer_params[0] in self.matmul_layer_types, 'It should be a conv/gemm layer'
 
         layer_hyperparams = self.get_layer_hyperparams(layer_id)
 
@@ -196,13 +314,54 @@ class WorkloadManager:
             self.topo_calc_hyperparams()
 
         layer_params = self.topo_list[layer_id]
-        assert layer_params[0] in ['conv', 'gemm'], 'It should be a conv/gemm layer'
+        assert layer_params[0] in self.matmul_layer_types, 'It should be a conv/gemm layer'
 
         layer_hyperparams = self.get_layer_hyperparams(layer_id)
 
         ofmap_dims = layer_hyperparams[1:3]
         return ofmap_dims
 
+    #
+    def is_matmul_layer(self, layer_id=0):
+        return self.topo_list[layer_id][0] in self.matmul_layer_types
+
+    #
+    def get_layer_num_instances(self, layer_id=0):
+        # Identical matmuls of a batched or grouped layer, 1 for conv and gemm
+        return self.layer_num_instances.get(layer_id, 1)
+
+    #
+    def get_num_blocks(self):
+        return len(self.block_layer_ids)
+
+    #
+    def get_block_layer_ids(self, block_id=0):
+        assert 0 <= block_id < len(self.block_layer_ids), 'Invalid block id ' + str(block_id)
+        return self.block_layer_ids[block_id]
+
+    #
+    def get_block_shape(self, block_id=0):
+        # seq len, d model, heads, d ff, kv len
+        assert 0 <= block_id < len(self.block_shapes), 'Invalid block id ' + str(block_id)
+        return self.block_shapes[block_id]
+
+    #
+    def get_layer_reuse_id(self, layer_id=0):
+        # The same layer of the first identical transformer block, the layer itself if there is none
+        return self.layer_reuse_ids.get(layer_id, layer_id)
+
+    #
+    def get_layer_instance_words(self, layer_id=0):
+        # Ifmap, filter and ofmap words of one instance, the instances are laid out one after another
+        ifmap_h, ifmap_w = self.get_layer_ifmap_dims(layer_id)
+        filt_h, filt_w = self.get_layer_filter_dims(layer_id)
+        num_ch = self.get_layer_num_channels(layer_id)
+
+        ifmap_words = ifmap_h * ifmap_w * num_ch
+        filter_words = filt_h * filt_w * num_ch * self.get_layer_num_filters(layer_id)
+        ofmap_words = self.get_layer_num_ofmap_px(layer_id)
+        return ifmap_words, filter_words, ofmap_words
+
     #
     def get_layer_params(self, layer_id=0):
         if not (self.topo_valid or self.num_layers - 1 < layer_id):
@@ -244,7 +403,7 @@ class WorkloadManager:
         if not self.topo_hyper_param_valid:
             self.topo_calc_hyperparams(self.topo_file_name)
         for i  in range(self.num_layers):
-            if self.topo_list[i][0] in ['conv', 'gemm']:
+            if self.topo_list[i][0] in self.matmul_layer_types:
                 this_layer_params_arr = [i]
                 for df in ['os', 'ws', 'is']:
                     sr, sc, tt = self.calc_spatio_temporal_params(df=df, layer_id=i)
@@ -260,7 +419,7 @@ class WorkloadManager:
         M = 0
         N = 0
         K = 0
-        if self.topo_list[layer_id][0] in ['conv', 'gemm']:
+        if self.topo_list[layer_id][0] in self.matmul_layer_types:
             M = self.get_layer_num_ofmap_px(layer_id)
             N = self.get_layer_num_filters(layer_id)
             K = self.get_layer_window_size(layer_id)
@@ -309,6 +468,48 @@ class WorkloadManager:
 
         return layer_hyperparams
 
+    # fusion pass: chains of activation rows right after a conv or gemm layer become its post-ops
+    def create_fusion_groups(self):
+        self.fusion_groups = []
+        for layer_id in range(self.num_layers):
+            layer_type = self.topo_list[layer_id][0]
+            if layer_type in self.matmul_layer_types:
+                self.fusion_groups.append([layer_id, []])
+            elif layer_type == 'activation' and len(self.fusion_groups) > 0:
+                last_group = self.fusion_groups[-1]
+                if layer_id - 1 == last_group[0] or layer_id - 1 in last_group[1]:
+                    last_group[1].append(layer_id)
+        self.fusion_valid = True
+
+    #
+    def get_fusion_producer(self, layer_id=0):
+        # Layer the activation is fused into, -1 if it is not fused
+        if not self.fusion_valid:
+            self.create_fusion_groups()
+
+        for producer_id, fused_layers in self.fusion_groups:
+            if layer_id in fused_layers:
+                return producer_id
+        return -1
+
+    #
+    def get_fused_layers(self, layer_id=0):
+        if not self.fusion_valid:
+            self.create_fusion_groups()
+
+        for producer_id, fused_layers in self.fusion_groups:
+            if producer_id == layer_id:
+                return fused_layers
+        return []
+
+    #
+    def get_fusion_saved_words(self, layer_id=0):
+        # A fused activation neither re-reads the ofmap of its producer nor writes it back
+        producer_id = self.get_fusion_producer(layer_id)
+        if producer_id < 0:
+            return 0
+        return 2 * self.get_layer_num_ofmap_px(producer_id) * self.get_layer_num_instances(producer_id)
+
     #
     def get_layer_spatio_temp_dim_arrays(self, layer_id=0):
         if not self.topo_spatiotemp_params_valid: